@@ -1,11 +1,14 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import logging
+from contextlib import ExitStack
 
+from config.config_loader import load_config
 from db.init_db import init_db
-from db.connection import connect_to_db
+from db.connection import configure_db, close_pool
+from db.export import FrameWriter, OneHotWriter, export_path, one_hot, resolve_format
+from db.frames import DEFAULT_CHUNK_ROWS, iter_query, read_frame
 
 from warnings import filterwarnings
 
@@ -17,16 +20,6 @@ filterwarnings(
     message=".*pandas only supports SQLAlchemy connectable.*",
 )
 
-def get_season(month):
-    if month in [12, 1, 2]:
-        return 1  # Winter
-    elif month in [6, 7, 8]:
-        return 2  # Summer
-    elif month in [9, 10, 11]:
-        return 3  # Fall
-    else:
-        return 4  # Spring
-
 def setup_logging(log_level: str = "INFO") -> None:
     os.makedirs("logs", exist_ok=True)
 
@@ -40,51 +33,37 @@ def setup_logging(log_level: str = "INFO") -> None:
 def main() -> None:
     setup_logging("INFO")
     logging.info("Starting analysis")
-    init_db(reset=False) 
-    conn = connect_to_db()
-    cur = conn.cursor()
+    cfg = load_config("config/ingestion.yaml")
+    configure_db(cfg.get("database"))
+    init_db(reset=False)
+
     try:
         # TODO: two feature engineering examples //  two more visualizations
-        
-        df = pd.read_sql("SELECT * FROM measurements;", conn)
-        pm_query ="""
-        SELECT 
-    m.unique_id,
-    m.indicator_id,
-    m.geo_join_id,
-    g.geo_place_name,
-    m.start_date,
-    m.data_value
-FROM measurements m
-LEFT JOIN geographic g
-ON m.geo_join_id = g.geo_join_id
-WHERE m.indicator_id = 365;
-"""
-        print("pm_query type:", type(pm_query))
-        df_pm = pd.read_sql_query(pm_query, conn)
-        df_pm["start_date"] = pd.to_datetime(df_pm["start_date"], errors="coerce")
-        df_pm["data_value"] = pd.to_numeric(df_pm["data_value"], errors="coerce")
-        df_pm = df_pm.dropna(subset=["start_date", "data_value", "geo_place_name"]) 
-        logging.info(f"Loaded DataFrame with shape {df_pm.shape}")
 
+        # Season, location baseline and deviation come from the
+        # measurement_features view (db.schema); only the PM2.5 rows and the
+        # columns used here are fetched
+        pm_query = """
+            SELECT
+                unique_id,
+                indicator_id,
+                geo_join_id,
+                geo_place_name,
+                start_date,
+                data_value,
+                season_idx,
+                location_avg_pollution,
+                pollution_deviation
+            FROM measurement_features
+            WHERE indicator_id = %s;
+        """
         # correlate season with data_value where indicator id = 365 (pm2.5)
-        df = df[df['indicator_id'] == 365]
-        # Convert start_date to datetime and extract the month
-        df["start_date"] = pd.to_datetime(df["start_date"])
-        df["month"] = df["start_date"].dt.month
+        df = read_frame(pm_query, (365,))
 
-        # Create a numeric 'season_idx' column for correlation
-        df["season_idx"] = df["month"].apply(get_season)
         #GEO LOCATION
-        df_pm["month"] = df["start_date"].dt.month
-        df_pm["season_idx"] = df["month"].apply(get_season)
-        location_avg = df_pm.groupby("geo_place_name")["data_value"].mean()
-
-        df_pm["location_avg_pollution"] = df_pm["geo_place_name"].map(location_avg)
+        df_pm = df.dropna(subset=["start_date", "data_value", "geo_place_name"])
+        logging.info(f"Loaded DataFrame with shape {df_pm.shape}")
 
-        df_pm["pollution_deviation"] = (
-        df_pm["data_value"] - df_pm["location_avg_pollution"]
-)
         # Calculate correlation
         season_corr = df['season_idx'].corr(df['data_value'])
         print(f"Correlation between Season and Air Quality: {season_corr:.2f}")
@@ -102,38 +81,61 @@ WHERE m.indicator_id = 365;
         # FEATURE ENGINEERING: ONE-HOT ENCODING
         # converts categorical variables, in this case the indicator name (PM2.5, Ozone, NOx, etc.) into a format that can be provided to ML algorithms to do a better job in prediction.
 
-        # join our measurements table with the indicators table
+        # Both exports stream the same join in chunks (db.export); the
+        # indicator names are read first so every chunk gets the same dummies
+        export_cfg = cfg.get("analysis", {}).get("export", {})
+        fmt = resolve_format(export_cfg.get("format"))
+        names = read_frame(
+            """
+            SELECT DISTINCT i.name
+            FROM indicators i
+            WHERE EXISTS (SELECT 1 FROM measurements m WHERE m.indicator_id = i.indicator_id);
+            """
+        )
+        names = sorted(names["name"].dropna().astype(str))
+
+        # join our measurements table with the indicators table; the date
+        # parts for the feature split are computed in the same query
         query = """
-            SELECT 
-                m.*, 
-                i.name 
+            SELECT
+                m.*,
+                i.name,
+                EXTRACT(YEAR FROM m.start_date)::int AS year,
+                EXTRACT(MONTH FROM m.start_date)::int AS month,
+                EXTRACT(DAY FROM m.start_date)::int AS day
             FROM measurements m
             JOIN indicators i ON m.indicator_id = i.indicator_id;
         """
+        date_parts = ["year", "month", "day"]
+
+        with ExitStack() as stack:
+            encoded = stack.enter_context(
+                FrameWriter(export_path("logs", "encoded_measurements", fmt), fmt)
+            )
+            split = stack.enter_context(FrameWriter(export_path("logs", "split_measurements", fmt), fmt))
+            sparse = None
+            if export_cfg.get("sparse_one_hot", False):
+                sparse = stack.enter_context(
+                    OneHotWriter("logs/encoded_measurements_onehot.npz", "name", names)
+                )
+
+            chunk_rows = export_cfg.get("chunk_rows") or DEFAULT_CHUNK_ROWS
+            for chunk in iter_query(query, chunk_rows=chunk_rows):
+                # one-hot encode the indicator name
+                encoded.write(one_hot(chunk.drop(columns=date_parts), "name", names, drop_first=True))
+                # FEATURE ENGINEERING: FEATURE SPLITTING
+                # split the start_date column into three separate columns: year, month, and day.
+                split.write(chunk.drop(columns=["name"]))
+                if sparse is not None:
+                    sparse.write(chunk)
+
+        print(f"Data successfully exported to {encoded.path}")
+        print(f"Data successfully exported to {split.path}")
 
-        # read joined data into a df and one-hot encode the indicator name
-        df = pd.read_sql(query, conn)
-        df_encoded = pd.get_dummies(df, columns=["name"], drop_first=True, dtype=int)
-        df_encoded.to_csv("logs/encoded_measurements.csv", index=False)
-
-        print("Data successfully exported to encoded_measurements.csv")
-
-        # FEATURE ENGINEERING: FEATURE SPLITTING
-        # split the start_date column into three separate columns: year, month, and day.
-        df = pd.read_sql("SELECT * FROM measurements;", conn)
-        df["start_date"] = pd.to_datetime(df["start_date"])
-        df["year"] = df["start_date"].dt.year
-        df["month"] = df["start_date"].dt.month
-        df["day"] = df["start_date"].dt.day
-        df.to_csv("logs/split_measurements.csv", index=False)
-        print("Data successfully exported to split_measurements.csv")
-
-
-        
         # plot avg pollution plot
         top_n = 10
         top_locations = (
-        df_pm.groupby("geo_place_name")["location_avg_pollution"]
+        df_pm.groupby("geo_place_name", observed=True)["location_avg_pollution"]
         .mean()
         .sort_values(ascending=False)
         .head(top_n)
@@ -159,14 +161,12 @@ WHERE m.indicator_id = 365;
         plt.show()
 
     except Exception as e:
-        conn.rollback()
         logging.error(f"Database connection failed during analysis: {e}")
         raise
 
-    # close connections
+    # connections went back to the pool after each read
     finally:
-        cur.close()
-        conn.close()
+        close_pool()
 
 
 if __name__ == "__main__":
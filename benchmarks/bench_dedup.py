@@ -0,0 +1,66 @@
+"""
+Compare per-record deduplicate_records against DataFrame deduplicate_frame.
+
+The validated input is tiled up to the requested row count; every other
+copy keeps its original unique_id, so roughly half the rows are duplicates.
+
+Usage:
+    python -m benchmarks.bench_dedup [path/to/file.csv] [rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.config_loader import load_config
+from ingestion.deduplicator import CompactDeduplicator, deduplicate_frame, deduplicate_records
+from ingestion.read import read_csv_frame
+from ingestion.validate import frame_to_records, validate_dataframe
+
+
+def build_frame(path: str, rows: int) -> pd.DataFrame:
+    cfg = load_config("config/ingestion.yaml")["validation"]
+    valid_df, _ = validate_dataframe(
+        read_csv_frame(path),
+        cfg["required_fields"],
+        cfg["numeric_fields"],
+        cfg["date_fields"],
+    )
+    copies = -(-rows // len(valid_df))
+    df = pd.concat([valid_df] * copies, ignore_index=True).iloc[:rows].copy()
+    copy_no = np.arange(len(df)) // len(valid_df)
+    df["unique_id"] = df["unique_id"] + (copy_no // 2) * 10_000_000
+    return df
+
+
+def main(path: str = "data/Air_Quality.csv", rows: str = "1000000") -> None:
+    keys = load_config("config/ingestion.yaml")["deduplication"]["keys"]
+    df = build_frame(path, int(rows))
+    records = frame_to_records(df)
+    n = len(df)
+
+    start = time.perf_counter()
+    unique_records = deduplicate_records(records, keys)
+    record_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    unique_df, duplicates = deduplicate_frame(df, keys)
+    frame_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with CompactDeduplicator() as compact:
+        compact_df, _ = deduplicate_frame(df, keys, seen=compact)
+    compact_secs = time.perf_counter() - start
+
+    assert len(unique_records) == len(unique_df) == len(compact_df)
+
+    print(f"rows: {n}  duplicates: {duplicates}")
+    print(f"deduplicate_records:          {record_secs:8.3f}s  {n / record_secs:12,.0f} rows/s")
+    print(f"deduplicate_frame:            {frame_secs:8.3f}s  {n / frame_secs:12,.0f} rows/s")
+    print(f"deduplicate_frame (compact):  {compact_secs:8.3f}s  {n / compact_secs:12,.0f} rows/s")
+    print(f"speedup: {record_secs / frame_secs:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,60 @@
+"""
+Compare sequential read -> validate -> load against the pipelined stages.
+
+The load stage is simulated by sleeping load_us microseconds per valid row,
+which stands in for waiting on Postgres (the GIL is released, as it is
+during a real COPY or execute_batch round trip).
+
+Usage:
+    python -m benchmarks.bench_pipeline path/to/large.csv [chunk_size] [load_us] [validate_workers]
+"""
+import sys
+import time
+
+from ingestion.parallel import iter_validated_chunks
+from ingestion.pipeline import iter_pipelined_chunks
+
+VALIDATION = {
+    "required_fields": [
+        "unique_id", "indicator_id", "name", "geo_type_name", "geo_place_name", "start_date",
+    ],
+    "numeric_fields": ["data_value"],
+    "date_fields": ["start_date"],
+}
+
+
+def consume(chunks, load_us: float) -> tuple:
+    rows = 0
+    load_secs = 0.0
+    for _, valid_df, _ in chunks:
+        start = time.perf_counter()
+        time.sleep(len(valid_df) * load_us / 1e6)
+        load_secs += time.perf_counter() - start
+        rows += len(valid_df)
+    return rows, load_secs
+
+
+def main(path: str, chunk_size: str = "50000", load_us: str = "5", validate_workers: str = "2") -> None:
+    size, per_row = int(chunk_size), float(load_us)
+
+    start = time.perf_counter()
+    serial_rows, load_secs = consume(iter_validated_chunks(path, VALIDATION, size), per_row)
+    serial_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    piped_rows, _ = consume(
+        iter_pipelined_chunks(path, VALIDATION, size, validate_workers=int(validate_workers)), per_row
+    )
+    piped_secs = time.perf_counter() - start
+
+    assert piped_rows == serial_rows
+
+    print(f"rows: {serial_rows}  chunk_size: {size}  simulated load: {load_secs:.3f}s")
+    print(f"read+validate:  {serial_secs - load_secs:8.3f}s")
+    print(f"sequential:     {serial_secs:8.3f}s")
+    print(f"pipelined:      {piped_secs:8.3f}s")
+    print(f"speedup: {serial_secs / piped_secs:.2f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
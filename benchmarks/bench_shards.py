@@ -0,0 +1,47 @@
+"""
+Compare single-process parse+validate against byte-range sharded workers.
+
+Usage:
+    python -m benchmarks.bench_shards path/to/large.csv [shard_size_mb] [workers]
+"""
+import sys
+import time
+
+from ingestion.parallel import iter_sharded_chunks, resolve_workers
+from ingestion.read import read_csv_frame
+from ingestion.validate import validate_dataframe
+
+VALIDATION = {
+    "required_fields": [
+        "unique_id", "indicator_id", "name", "geo_type_name", "geo_place_name", "start_date",
+    ],
+    "numeric_fields": ["data_value"],
+    "date_fields": ["start_date"],
+}
+
+
+def main(path: str, shard_size_mb: str = "16", workers: str = "0") -> None:
+    n_workers = resolve_workers(int(workers))
+
+    start = time.perf_counter()
+    valid_df, _ = validate_dataframe(read_csv_frame(path), **VALIDATION)
+    single_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sharded_rows = 0
+    for _, shard_valid, _ in iter_sharded_chunks(
+        path, VALIDATION, int(float(shard_size_mb) * 1024 * 1024), n_workers
+    ):
+        sharded_rows += len(shard_valid)
+    sharded_secs = time.perf_counter() - start
+
+    assert sharded_rows == len(valid_df)
+
+    print(f"rows: {len(valid_df)}  workers: {n_workers}")
+    print(f"single process: {single_secs:8.3f}s")
+    print(f"sharded:        {sharded_secs:8.3f}s")
+    print(f"speedup: {single_secs / sharded_secs:.2f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
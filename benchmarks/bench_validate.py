@@ -0,0 +1,36 @@
+"""
+Compare per-row validate_records against column-at-a-time validate_dataframe.
+
+Usage:
+    python -m benchmarks.bench_validate [path/to/file.csv]
+"""
+import sys
+import time
+
+from ingestion.read import read_csv_frame
+from ingestion.validate import validate_records, validate_dataframe
+
+
+def main(path: str = "data/Air_Quality.csv") -> None:
+    df = read_csv_frame(path)
+    records = df.to_dict(orient="records")
+
+    start = time.perf_counter()
+    valid, rejected = validate_records(records)
+    row_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    valid_df, rejected_df = validate_dataframe(df)
+    frame_secs = time.perf_counter() - start
+
+    assert len(valid) == len(valid_df) and len(rejected) == len(rejected_df)
+
+    n = len(df)
+    print(f"rows: {n}")
+    print(f"validate_records:   {row_secs:8.3f}s  {n / row_secs:12,.0f} rows/s")
+    print(f"validate_dataframe: {frame_secs:8.3f}s  {n / frame_secs:12,.0f} rows/s")
+    print(f"speedup: {row_secs / frame_secs:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,357 @@
+"""
+Throughput and peak-memory benchmarks for every pipeline stage.
+
+Runs read_csv, validate_records, deduplicate_records and load_records (plus
+the DataFrame paths main uses: read_csv_frame, validate_dataframe,
+deduplicate_frame and frame_to_measurements) on a synthetic CSV of the requested size, writes the
+results to JSON and compares them with a stored baseline.
+
+load_records needs a throwaway Postgres stand-in, named explicitly with
+--dsn, BENCH_DB_DSN or BENCH_DB_HOST/BENCH_DB_PORT/BENCH_DB_NAME/BENCH_DB_USER/
+BENCH_DB_PASSWORD; the database in config/ingestion.yaml and the DB_*
+variables are never used. The benchmark run, its rows and the dimension keys
+it added are deleted afterwards. Without a stand-in, or if it is not
+reachable, the stage is skipped.
+
+Peak memory comes from tracemalloc, which slows pure-Python stages; compare
+runs made with the same --no-memory setting only.
+
+Usage:
+    python -m benchmarks.suite {10k|1m|10m|<rows>} [--stages read_csv,...]
+        [--baseline benchmarks/baselines/1m.json] [--save-baseline]
+        [--tolerance 0.15] [--dsn "host=localhost dbname=bench"] [--no-load] [--no-memory]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from benchmarks.synthetic import parse_size, write_synthetic_csv
+from config.config_loader import load_config
+from ingestion.deduplicator import deduplicate_frame, deduplicate_records
+from ingestion.loader import frame_to_measurements
+from ingestion.read import read_csv, read_csv_frame
+from ingestion.validate import validate_dataframe, validate_records
+
+STAGES = [
+    "read_csv",
+    "validate_records",
+    "deduplicate_records",
+    "load_records",
+    "read_csv_frame",
+    "validate_dataframe",
+    "deduplicate_frame",
+    "frame_to_measurements",
+]
+
+DATA_DIR = ".cache/bench"
+BASELINE_DIR = "benchmarks/baselines"
+
+# Fractional change in throughput or peak memory reported as a regression
+DEFAULT_TOLERANCE = 0.15
+
+# Connection settings of the load_records stand-in (BENCH_DB_DSN wins)
+BENCH_DB_ENV = {
+    "host": "BENCH_DB_HOST",
+    "port": "BENCH_DB_PORT",
+    "dbname": "BENCH_DB_NAME",
+    "user": "BENCH_DB_USER",
+    "password": "BENCH_DB_PASSWORD",
+}
+
+# Dimension tables load_records adds keys to, with their key column
+DIMENSION_KEYS = (("indicators", "indicator_id"), ("geographic", "geo_join_id"))
+
+
+def measure(
+    fn: Callable[[], Any], rows: Optional[int] = None, memory: bool = True
+) -> Tuple[Any, Dict]:
+    """
+    Run fn once; returns its result and {rows, seconds, rows_per_sec, peak_mb}.
+
+    rows defaults to len() of the result (for readers).
+    """
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+        seconds = time.perf_counter() - start
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20 if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+
+    rows = len(result) if rows is None else rows
+    return result, {
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "peak_mb": round(peak_mb, 1) if peak_mb is not None else None,
+    }
+
+
+def stand_in_dsn(dsn: Optional[str] = None) -> Optional[str]:
+    """
+    Connection string of the load_records stand-in: dsn, else BENCH_DB_DSN,
+    else one built from BENCH_DB_* (BENCH_DB_NAME required); None if unset.
+    """
+    from psycopg2.extensions import make_dsn
+
+    dsn = dsn or os.getenv("BENCH_DB_DSN")
+    if dsn:
+        return dsn
+    settings = {key: os.getenv(var) for key, var in BENCH_DB_ENV.items() if os.getenv(var)}
+    return make_dsn(**settings) if "dbname" in settings else None
+
+
+@contextmanager
+def load_into_stand_in(
+    cfg: Dict, dsn: str, valid: List[Dict], rejected: List[Dict], source_file: str
+) -> Iterator[Callable[[], Any]]:
+    """
+    Prepare a load_records run against the stand-in database dsn.
+
+    Yields a callable that loads valid/rejected in chunk_size batches under
+    one ingestion run; only that call is meant to be timed. Starting the
+    run happens before it; on exit the run's rows and the dimension keys it
+    added are removed and the pool is closed.
+    """
+    from db.connection import close_pool, configure_db, get_connection
+    from db.init_db import init_db
+    from ingestion.loader import load_records
+    from injestion_pt1 import finish_run, start_run
+
+    db_cfg = cfg["database"]
+    configure_db({**db_cfg, "dsn": dsn})
+    try:
+        init_db(reset=False)
+        batch = cfg["data_source"].get("chunk_size") or len(valid) or 1
+
+        # Keys stored before the run stay; any others were added by it
+        existing: Dict[str, List[int]] = {}
+        with get_connection() as conn:
+            cur = conn.cursor()
+            try:
+                for table, key in DIMENSION_KEYS:
+                    cur.execute(f"SELECT {key} FROM {table};")
+                    existing[table] = [row[0] for row in cur.fetchall()]
+            finally:
+                cur.close()
+
+        run_id = start_run(source_file)
+        try:
+
+            def run() -> None:
+                for i in range(0, max(len(valid), len(rejected)), batch):
+                    load_records(
+                        run_id=run_id,
+                        valid_records=valid[i : i + batch],
+                        rejected_records=rejected[i : i + batch],
+                        source_file=source_file,
+                        batch_size=db_cfg.get("batch_size", 500),
+                        load_strategy=db_cfg.get("load_strategy", "batch"),
+                        partitions=db_cfg.get("load_partitions") or 1,
+                        partition_by=db_cfg.get("partition_by", "hash"),
+                    )
+                finish_run(run_id, len(valid) + len(rejected), len(valid), len(rejected))
+
+            yield run
+        finally:
+            with get_connection() as conn:
+                cur = conn.cursor()
+                try:
+                    for table in ("measurements", "ingestion_rejects", "ingestion_runs"):
+                        cur.execute(f"DELETE FROM {table} WHERE run_id = %s;", (run_id,))
+                    for table, key in DIMENSION_KEYS:
+                        cur.execute(
+                            f"DELETE FROM {table} WHERE NOT ({key} = ANY(%s::int[]));",
+                            (existing[table],),
+                        )
+                    conn.commit()
+                finally:
+                    cur.close()
+    finally:
+        close_pool()
+
+
+def run_suite(
+    path: str,
+    stages: Optional[List[str]] = None,
+    memory: bool = True,
+    cfg: Optional[Dict] = None,
+    dsn: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """
+    Benchmark the selected stages on one CSV; returns per-stage results.
+
+    load_records runs only against the stand-in dsn (see stand_in_dsn).
+    """
+    cfg = cfg or load_config("config/ingestion.yaml")
+    stages = stages or STAGES
+    validation = cfg["validation"]
+    keys = cfg["deduplication"]["keys"]
+    results: Dict[str, Dict] = {}
+
+    # Record-level path (each stage feeds the next)
+    if any(s in stages for s in ("read_csv", "validate_records", "deduplicate_records", "load_records")):
+        records, results["read_csv"] = measure(lambda: read_csv(path), memory=memory)
+
+        (valid, rejected), results["validate_records"] = measure(
+            lambda: validate_records(records, **validation), len(records), memory
+        )
+        del records
+        unique, results["deduplicate_records"] = measure(
+            lambda: deduplicate_records(valid, keys), len(valid), memory
+        )
+        del valid
+
+        if "load_records" in stages and not dsn:
+            results["load_records"] = {"skipped": "no stand-in database (--dsn or BENCH_DB_*)"}
+        elif "load_records" in stages:
+            stand_in = ExitStack()
+            try:
+                load = stand_in.enter_context(
+                    load_into_stand_in(cfg, dsn, unique, rejected, os.path.basename(path))
+                )
+            except Exception as e:
+                results["load_records"] = {"skipped": f"database unavailable: {str(e).splitlines()[0]}"}
+            else:
+                # Setup and cleanup of the stand-in are outside the timed call
+                with stand_in:
+                    results["load_records"] = measure(load, len(unique) + len(rejected), memory)[1]
+        del unique, rejected
+
+    # DataFrame path used by injestion_pt1.main
+    frame_stages = ("read_csv_frame", "validate_dataframe", "deduplicate_frame", "frame_to_measurements")
+    if any(s in stages for s in frame_stages):
+        df, results["read_csv_frame"] = measure(lambda: read_csv_frame(path), memory=memory)
+        (valid_df, _), results["validate_dataframe"] = measure(
+            lambda: validate_dataframe(df, **validation), len(df), memory
+        )
+        del df
+        (unique_df, _), results["deduplicate_frame"] = measure(
+            lambda: deduplicate_frame(valid_df, keys), len(valid_df), memory
+        )
+        del valid_df
+        _, results["frame_to_measurements"] = measure(
+            lambda: frame_to_measurements(unique_df, 0), memory=memory
+        )
+
+    return {s: results[s] for s in stages if s in results}
+
+
+def compare_results(
+    current: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float = DEFAULT_TOLERANCE
+) -> List[str]:
+    """
+    List regressions of current stage results against a baseline.
+
+    A stage regresses when its throughput drops, or its peak memory grows,
+    by more than tolerance. Stages missing or skipped on either side, or run
+    on a different row count, are not compared.
+    """
+    regressions = []
+    for stage, cur in current.items():
+        base = baseline.get(stage)
+        if not base or "skipped" in base or "skipped" in cur or base["rows"] != cur["rows"]:
+            continue
+
+        if cur["rows_per_sec"] < base["rows_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{stage}: {cur['rows_per_sec']:,.0f} rows/s vs baseline "
+                f"{base['rows_per_sec']:,.0f} ({cur['rows_per_sec'] / base['rows_per_sec'] - 1:+.0%})"
+            )
+        if cur.get("peak_mb") and base.get("peak_mb") and cur["peak_mb"] > base["peak_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{stage}: peak {cur['peak_mb']:,.1f} MB vs baseline "
+                f"{base['peak_mb']:,.1f} MB ({cur['peak_mb'] / base['peak_mb'] - 1:+.0%})"
+            )
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("size", help="10k, 1m, 10m or a row count")
+    parser.add_argument("--stages", help=f"comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--output", help="results JSON (default .cache/bench/results-<size>.json)")
+    parser.add_argument("--baseline", help="baseline JSON (default benchmarks/baselines/<size>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--dsn", help="stand-in database for load_records (default BENCH_DB_DSN or BENCH_DB_*)"
+    )
+    parser.add_argument("--no-load", action="store_true", help="skip load_records")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = parse_size(args.size)
+    stages = args.stages.split(",") if args.stages else list(STAGES)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {sorted(unknown)}")
+    if args.no_load and "load_records" in stages:
+        stages.remove("load_records")
+
+    path = os.path.join(DATA_DIR, f"air_quality_{args.size.lower()}_s{args.seed}.csv")
+    if not os.path.exists(path):
+        print(f"generating {rows:,} rows -> {path}")
+        write_synthetic_csv(path, rows, seed=args.seed)
+
+    results = {
+        "meta": {
+            "rows": rows,
+            "source": path,
+            "memory_traced": not args.no_memory,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "stages": run_suite(path, stages, memory=not args.no_memory, dsn=stand_in_dsn(args.dsn)),
+    }
+
+    for stage, r in results["stages"].items():
+        if "skipped" in r:
+            print(f"{stage:22s} skipped ({r['skipped']})")
+            continue
+        peak = f"{r['peak_mb']:10,.1f} MB" if r["peak_mb"] is not None else ""
+        print(f"{stage:22s} {r['seconds']:9.3f}s {r['rows_per_sec']:14,.0f} rows/s {peak}")
+
+    output = args.output or os.path.join(DATA_DIR, f"results-{args.size.lower()}.json")
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.size.lower()}.json")
+    for target in [output] + ([baseline_path] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {target}")
+
+    if args.save_baseline or not os.path.exists(baseline_path):
+        return
+
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("memory_traced") != results["meta"]["memory_traced"]:
+        print("warning: baseline was recorded with a different --no-memory setting")
+
+    regressions = compare_results(results["stages"], baseline["stages"], args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {baseline_path}:")
+        for r in regressions:
+            print(f"  {r}")
+        sys.exit(1)
+    print(f"no regressions against {baseline_path} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
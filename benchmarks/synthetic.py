@@ -0,0 +1,166 @@
+"""
+Generate synthetic Air Quality CSVs with the schema of data/Air_Quality.csv.
+
+Indicator, geography and time-period combinations are sampled from the real
+file so dimension cardinalities stay realistic. A share of the rows can be
+made invalid (rejects), copied from earlier rows (duplicates) or padded with
+whitespace and odd number formatting that validation cleans up (dirty).
+
+Usage:
+    python -m benchmarks.synthetic out.csv {10k|1m|10m|<rows>} [--reject-ratio 0.01]
+        [--duplicate-ratio 0.05] [--dirty-ratio 0.05] [--seed 0]
+"""
+import argparse
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+SOURCE_CSV = "data/Air_Quality.csv"
+
+# Named dataset sizes used by the benchmark suite
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Column groups sampled together from the real file
+INDICATOR_COLS = ["Indicator ID", "Name", "Measure", "Measure Info"]
+GEO_COLS = ["Geo Type Name", "Geo Join ID", "Geo Place Name"]
+PERIOD_COLS = ["Time Period", "Start_Date"]
+
+CSV_COLUMNS = [
+    "Unique ID",
+    *INDICATOR_COLS,
+    *GEO_COLS,
+    *PERIOD_COLS,
+    "Data Value",
+    "Message",
+]
+
+# Rows are generated and written in blocks of this size to bound memory
+BLOCK_ROWS = 500_000
+
+
+def parse_size(size: str) -> int:
+    """Turn '10k' / '1m' / '10m' or a plain number into a row count."""
+    return SIZES.get(size.lower()) or int(size)
+
+
+def load_catalog(source_csv: str = SOURCE_CSV) -> Dict[str, pd.DataFrame]:
+    """Distinct indicator, geography and period combinations of the real file."""
+    df = pd.read_csv(source_csv, dtype=str, keep_default_na=False)
+    return {
+        "indicators": df[INDICATOR_COLS].drop_duplicates().reset_index(drop=True),
+        "geos": df[GEO_COLS].drop_duplicates().reset_index(drop=True),
+        "periods": df[PERIOD_COLS].drop_duplicates().reset_index(drop=True),
+    }
+
+
+def generate_block(
+    rows: int,
+    catalog: Dict[str, pd.DataFrame],
+    first_id: int = 1,
+    reject_ratio: float = 0.0,
+    duplicate_ratio: float = 0.0,
+    dirty_ratio: float = 0.0,
+    rng: Optional[np.random.Generator] = None,
+) -> pd.DataFrame:
+    """
+    Build one block of raw rows (all values as strings, like a CSV read).
+
+    Unique IDs run from first_id; duplicated rows repeat an earlier row of
+    the block verbatim, so they share its unique_id and dedup keys.
+    """
+    rng = rng or np.random.default_rng(0)
+    parts = [
+        catalog[name].iloc[rng.integers(0, len(catalog[name]), rows)].reset_index(drop=True)
+        for name in ("indicators", "geos", "periods")
+    ]
+    df = pd.concat(parts, axis=1)
+    df.insert(0, "Unique ID", np.arange(first_id, first_id + rows).astype(str))
+    df["Data Value"] = np.round(rng.gamma(2.0, 8.0, rows), 2).astype(str)
+    df["Message"] = ""
+
+    dirty = rng.random(rows) < dirty_ratio
+    if dirty.any():
+        # Whitespace and number formats that validation strips/parses
+        for col in ("Name", "Geo Place Name"):
+            df.loc[dirty, col] = "  " + df.loc[dirty, col] + " "
+        df.loc[dirty, "Data Value"] = " " + df.loc[dirty, "Data Value"] + "e0 "
+
+    reject = rng.random(rows) < reject_ratio
+    if reject.any():
+        idx = np.flatnonzero(reject)
+        kind = rng.integers(0, 4, len(idx))
+        df.loc[idx[kind == 0], "Name"] = ""
+        df.loc[idx[kind == 1], "Start_Date"] = "13/45/2020"
+        df.loc[idx[kind == 2], "Data Value"] = "pending"
+        df.loc[idx[kind == 3], "Indicator ID"] = "NO2"
+
+    duplicate = rng.random(rows) < duplicate_ratio
+    duplicate[0] = False
+    if duplicate.any():
+        idx = np.flatnonzero(duplicate)
+        # Copy a random earlier row of the block
+        source = (rng.random(len(idx)) * idx).astype(int)
+        df.iloc[idx] = df.iloc[source].to_numpy()
+
+    return df[CSV_COLUMNS]
+
+
+def write_synthetic_csv(
+    path: str,
+    rows: int,
+    reject_ratio: float = 0.01,
+    duplicate_ratio: float = 0.05,
+    dirty_ratio: float = 0.05,
+    seed: int = 0,
+    source_csv: str = SOURCE_CSV,
+) -> str:
+    """Write a synthetic CSV of `rows` rows block by block; returns the path."""
+    catalog = load_catalog(source_csv)
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        written = 0
+        while written < rows:
+            n = min(BLOCK_ROWS, rows - written)
+            block = generate_block(
+                n,
+                catalog,
+                first_id=written + 1,
+                reject_ratio=reject_ratio,
+                duplicate_ratio=duplicate_ratio,
+                dirty_ratio=dirty_ratio,
+                rng=rng,
+            )
+            block.to_csv(f, index=False, header=written == 0)
+            written += n
+
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path")
+    parser.add_argument("rows", help="10k, 1m, 10m or a row count")
+    parser.add_argument("--reject-ratio", type=float, default=0.01)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05)
+    parser.add_argument("--dirty-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    write_synthetic_csv(
+        args.path,
+        rows,
+        reject_ratio=args.reject_ratio,
+        duplicate_ratio=args.duplicate_ratio,
+        dirty_ratio=args.dirty_ratio,
+        seed=args.seed,
+    )
+    print(f"wrote {rows:,} rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,150 @@
 import psycopg2
 import os
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, parse_dsn
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+# Defaults match the SSH tunnel described in db/README.md
+DEFAULT_DB_SETTINGS: Dict[str, Any] = {
+    "host": "127.0.0.1",
+    "port": 5433,
+    "dbname": "postgres",
+    "user": "postgres",
+    "pool_min_size": 1,
+    "pool_max_size": 5,
+}
+
+# Environment variables win over config/ingestion.yaml
+ENV_SETTINGS = {
+    "host": "DB_HOST",
+    "port": "DB_PORT",
+    "dbname": "DB_NAME",
+    "user": "DB_USER",
+    "pool_min_size": "DB_POOL_MIN_SIZE",
+    "pool_max_size": "DB_POOL_MAX_SIZE",
+}
+
+_settings: Dict[str, Any] = dict(DEFAULT_DB_SETTINGS)
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_pid: Optional[int] = None
+
+
+def configure_db(settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Set connection and pool settings from the `database` config section.
+
+    Environment variables (DB_HOST, DB_PORT, DB_NAME, DB_USER,
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE) override config values.
+    settings["dsn"], a libpq connection string, is used as-is instead:
+    DB_* variables and DB_PASSWORD do not apply to it.
+    An already open pool is closed so the next borrow uses the new settings.
+    """
+    global _settings
+
+    merged = dict(DEFAULT_DB_SETTINGS)
+    for key in DEFAULT_DB_SETTINGS:
+        if settings and settings.get(key) is not None:
+            merged[key] = settings[key]
+        if os.getenv(ENV_SETTINGS[key]):
+            merged[key] = os.getenv(ENV_SETTINGS[key])
+
+    if settings and settings.get("dsn"):
+        parsed = parse_dsn(settings["dsn"])
+        merged.update((key, parsed[key]) for key in ("host", "port", "dbname", "user") if key in parsed)
+        merged["dsn"] = settings["dsn"]
+
+    for key in ("port", "pool_min_size", "pool_max_size"):
+        merged[key] = int(merged[key])
+
+    close_pool()
+    _settings = merged
+    return dict(_settings)
+
+
+def _connect_kwargs() -> Dict[str, Any]:
+    if _settings.get("dsn"):
+        return {"dsn": _settings["dsn"], "options": "-c lock_timeout=5000"}
+    return {
+        "host": _settings["host"],
+        "port": _settings["port"],
+        "database": _settings["dbname"],
+        "user": _settings["user"],
+        "password": DB_PASSWORD,
+        "options": "-c lock_timeout=5000",
+    }
+
+
 def connect_to_db():
+    """Open a new, unpooled connection. Prefer get_connection()."""
     try:
-        conn = psycopg2.connect(
-            host="127.0.0.1",
-            port=5433,
-            database="postgres",
-            user="postgres",
-            password=DB_PASSWORD,
-            options="-c lock_timeout=5000",
-        )
+        conn = psycopg2.connect(**_connect_kwargs())
         return conn
     except Exception as e:
         print(f"Database error: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool, _pool_pid
+
+    # A pool inherited through fork shares sockets with the parent; start fresh
+    if _pool is not None and _pool_pid != os.getpid():
+        _pool = None
+
+    if _pool is None:
+        try:
+            _pool = ThreadedConnectionPool(
+                _settings["pool_min_size"], _settings["pool_max_size"], **_connect_kwargs()
+            )
+        except Exception as e:
+            print(f"Database error: {e}")
+            raise
+        _pool_pid = os.getpid()
+        logging.info(
+            f"Connection pool opened: {_settings['host']}:{_settings['port']}/"
+            f"{_settings['dbname']} (min={_settings['pool_min_size']}, "
+            f"max={_settings['pool_max_size']})"
+        )
+
+    return _pool
+
+
+@contextmanager
+def get_connection() -> Iterator[Any]:
+    """
+    Borrow a pooled connection for the duration of a `with` block.
+
+    Callers commit explicitly. Any transaction still open when the block
+    exits (including on an exception) is rolled back before the connection
+    goes back to the pool; broken connections are discarded.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        if not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                conn.close()
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def close_pool() -> None:
+    """Close every pooled connection (safe to call when no pool is open)."""
+    global _pool, _pool_pid
+
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.closeall()
+    _pool = None
+    _pool_pid = None
@@ -0,0 +1,238 @@
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import BinaryIO, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency; exports fall back to CSV without it
+    pa = None
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Bytes copied per block when assembling the .npz file
+_BLOCK_BYTES = 1 << 20
+
+
+def resolve_format(fmt: Optional[str]) -> str:
+    """Validate an export format; parquet falls back to csv without pyarrow."""
+    fmt = (fmt or "parquet").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {EXPORT_FORMATS}")
+    if fmt == "parquet" and pa is None:
+        logging.warning("Parquet export needs pyarrow, which is not installed; writing CSV")
+        return "csv"
+    return fmt
+
+
+def _codes(values: pd.Series, categories: Sequence[str]) -> np.ndarray:
+    """Position of each value in categories; -1 for missing or unknown values."""
+    return pd.Index(list(categories)).get_indexer(values.astype(object))
+
+
+def one_hot(
+    df: pd.DataFrame, column: str, categories: Sequence[str], drop_first: bool = False
+) -> pd.DataFrame:
+    """
+    pd.get_dummies of one column over a fixed list of categories, so every
+    chunk of an export gets the same dummy columns in the same order.
+    """
+    df = df.copy(deep=False)
+    df[column] = pd.Categorical.from_codes(_codes(df[column], categories), categories=list(categories))
+    return pd.get_dummies(df, columns=[column], drop_first=drop_first, dtype="int8")
+
+
+def _export_field(field: "pa.Field") -> "pa.Field":
+    if pa.types.is_dictionary(field.type):
+        # Fixed index width: chunks have different numbers of categories
+        return field.with_type(pa.dictionary(pa.int32(), pa.string()))
+    if pa.types.is_null(field.type):
+        return field.with_type(pa.string())
+    return field
+
+
+class FrameWriter:
+    """
+    Appends DataFrame chunks to one CSV or Parquet file.
+
+    Only the current chunk is held in memory. The file is written under a
+    temporary name and renamed into place by close(), so readers never see
+    a partial export; leaving the `with` block on an error discards it.
+    Parquet columns keep their types and are zstd-compressed. Categoricals
+    (text columns, see db.frames) are written as string dictionaries and
+    columns that are all NULL in the first chunk as strings, whatever type
+    pandas gave their missing values.
+    """
+
+    def __init__(self, path: str, fmt: str = "parquet"):
+        self.path = path
+        self.fmt = resolve_format(fmt)
+        self.rows = 0
+        self._tmp = f"{path}.tmp-{os.getpid()}"
+        self._parquet = None
+        self._schema = None
+        self._int_columns: Optional[List[str]] = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.fmt == "csv":
+            if self._int_columns is None:
+                self._int_columns = [col for col in df.columns if df[col].dtype == "int64"]
+            # int64 chunks with NULLs come as float64; keep writing integers
+            floats = [col for col in self._int_columns if df[col].dtype == "float64"]
+            if floats:
+                df = df.astype({col: "Int64" for col in floats})
+            df.to_csv(self._tmp, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._schema is None:
+                self._schema = pa.schema(_export_field(field) for field in table.schema)
+                self._parquet = pq.ParquetWriter(self._tmp, self._schema, compression="zstd")
+            # Also turns int64 chunks with NULLs (float64) back into int64
+            self._parquet.write_table(table.cast(self._schema))
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        elif not os.path.exists(self._tmp):
+            # No chunk was written; still leave an (empty) file behind
+            open(self._tmp, "w").close()
+        os.replace(self._tmp, self.path)
+        logging.info(f"Exported {self.rows} rows to {self.path}")
+
+    def discard(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def _write_npy_header(f: BinaryIO, dtype: str, length: int) -> None:
+    header = {
+        "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        "fortran_order": False,
+        "shape": (length,),
+    }
+    np.lib.format.write_array_header_1_0(f, header)
+
+
+class OneHotWriter:
+    """
+    Sparse one-hot encoding of one column, written as a CSR matrix in a
+    .npz file (rows in export order, one column per category).
+
+    The file has the layout of scipy.sparse.save_npz, so
+    scipy.sparse.load_npz reads it, plus "columns" (the category of each
+    matrix column) and "row_ids" (id_column of each row). Values outside
+    categories or missing leave their row empty.
+
+    Indices and row ids are spooled to temporary files chunk by chunk and
+    copied into the archive by close(), so memory stays bounded by the
+    chunk size.
+    """
+
+    def __init__(self, path: str, column: str, categories: Sequence[str], id_column: str = "unique_id"):
+        self.path = path
+        self.column = column
+        self.categories = list(categories)
+        self.id_column = id_column
+        self.rows = 0
+        self.nnz = 0
+        self._indices = tempfile.TemporaryFile()
+        self._indptr = tempfile.TemporaryFile()
+        self._row_ids = tempfile.TemporaryFile()
+        self._indptr.write(np.zeros(1, dtype="<i8").tobytes())
+
+    def write(self, df: pd.DataFrame) -> None:
+        codes = _codes(df[self.column], self.categories)
+        present = codes >= 0
+        self._indices.write(codes[present].astype("<i4").tobytes())
+        self._indptr.write((self.nnz + np.cumsum(present, dtype="<i8")).tobytes())
+        self._row_ids.write(df[self.id_column].to_numpy(dtype="<i8").tobytes())
+        self.nnz += int(present.sum())
+        self.rows += len(df)
+
+    def _copy_array(self, zf: zipfile.ZipFile, name: str, src, dtype: str, length: int) -> None:
+        with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+            _write_npy_header(f, dtype, length)
+            src.seek(0)
+            shutil.copyfileobj(src, f, _BLOCK_BYTES)
+
+    def _write_ones(self, zf: zipfile.ZipFile) -> None:
+        with zf.open("data.npy", "w", force_zip64=True) as f:
+            _write_npy_header(f, "<i1", self.nnz)
+            remaining = self.nnz
+            while remaining:
+                block = min(remaining, _BLOCK_BYTES)
+                f.write(np.ones(block, dtype="<i1").tobytes())
+                remaining -= block
+
+    def _save(self, zf: zipfile.ZipFile, name: str, array: np.ndarray) -> None:
+        with zf.open(f"{name}.npy", "w") as f:
+            np.lib.format.write_array(f, array, allow_pickle=False)
+
+    def close(self) -> None:
+        tmp = f"{self.path}.tmp-{os.getpid()}"
+        try:
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                self._save(zf, "format", np.array(b"csr"))
+                self._save(zf, "shape", np.array([self.rows, len(self.categories)], dtype="<i8"))
+                self._write_ones(zf)
+                self._copy_array(zf, "indices", self._indices, "<i4", self.nnz)
+                self._copy_array(zf, "indptr", self._indptr, "<i8", self.rows + 1)
+                self._copy_array(zf, "row_ids", self._row_ids, "<i8", self.rows)
+                self._save(zf, "columns", np.array(self.categories, dtype=str))
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        finally:
+            self.discard()
+        logging.info(
+            f"Exported {self.rows} x {len(self.categories)} one-hot CSR ({self.nnz} entries) to {self.path}"
+        )
+
+    def discard(self) -> None:
+        for spool in (self._indices, self._indptr, self._row_ids):
+            spool.close()
+
+    def __enter__(self) -> "OneHotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def export_path(directory: str, name: str, fmt: str) -> str:
+    return os.path.join(directory, f"{name}.{fmt}")
+
+
+def load_one_hot(path: str):
+    """(indptr, indices, shape, columns, row_ids) of a file written by OneHotWriter."""
+    with np.load(path, allow_pickle=False) as npz:
+        return (
+            npz["indptr"],
+            npz["indices"],
+            tuple(npz["shape"]),
+            npz["columns"].tolist(),
+            npz["row_ids"],
+        )
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from itertools import count
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from psycopg2 import extensions
+
+from db.connection import get_connection
+
+# Rows fetched from the server-side cursor per round trip
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Column dtype by Postgres type; anything else stays object
+_OID_DTYPES: Dict[int, str] = {}
+_OID_DTYPES.update((oid, "float64") for oid in extensions.DECIMAL.values + extensions.FLOAT.values)
+_OID_DTYPES.update((oid, "int64") for oid in extensions.INTEGER.values + extensions.LONGINTEGER.values)
+_OID_DTYPES.update((oid, "datetime64") for oid in extensions.DATE.values + extensions.PYDATETIME.values)
+_OID_DTYPES.update((oid, "category") for oid in extensions.UNICODE.values)
+
+# NUMERIC as float instead of Decimal; DATE and TIMESTAMP as their ISO text,
+# which numpy parses a whole column at a time
+_NUMERIC_AS_FLOAT = extensions.new_type(
+    extensions.DECIMAL.values, "FRAME_NUMERIC", lambda value, cur: None if value is None else float(value)
+)
+_DATETIME_AS_TEXT = extensions.new_type(
+    extensions.DATE.values + extensions.PYDATETIME.values, "FRAME_DATETIME", lambda value, cur: value
+)
+
+# Categories of text columns: "str" or object, depending on the pandas version
+_TEXT_DTYPE = pd.Index([""]).dtype
+
+# Frames already loaded in this process, by (query, params, dtypes)
+_frames: Dict[Tuple[str, Tuple, Tuple], pd.DataFrame] = {}
+_lock = threading.Lock()
+_cursor_ids = count()
+
+
+def _register_casters(cur) -> None:
+    extensions.register_type(_NUMERIC_AS_FLOAT, cur)
+    extensions.register_type(_DATETIME_AS_TEXT, cur)
+
+
+def _column_array(values: Sequence[Any], dtype: str):
+    """One chunk of a column as a typed array (missing values as NaN/NaT)."""
+    if dtype == "float64":
+        return np.array(values, dtype="float64")
+    if dtype == "int64":
+        try:
+            return np.array(values, dtype="int64")
+        except TypeError:
+            # NULLs: float64 like read_sql; chunks are upcast when combined
+            return np.array(values, dtype="float64")
+    if dtype == "datetime64":
+        return np.array(values, dtype="datetime64[us]").astype("datetime64[ns]")
+    if dtype == "category":
+        categorical = pd.Categorical(values)
+        if categorical.categories.empty:
+            # All NULL: text categories (not float64), so chunks still combine
+            return pd.Categorical(values, categories=pd.Index([], dtype=_TEXT_DTYPE))
+        return categorical
+    return np.array(values, dtype=object)
+
+
+def _chunk_frame(rows: List[Tuple], names: List[str], types: List[str], start: int) -> pd.DataFrame:
+    values = zip(*rows) if rows else ([] for _ in names)
+    columns = {name: _column_array(v, dtype) for name, v, dtype in zip(names, values, types)}
+    return pd.DataFrame(columns, columns=names, index=pd.RangeIndex(start, start + len(rows)))
+
+
+def iter_frames(
+    conn,
+    query: str,
+    params: Optional[Sequence] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Run query on a named (server-side) cursor and yield typed DataFrames of
+    at most chunk_rows rows (at least one, empty if there are no rows).
+
+    Each chunk of row tuples is turned into typed columns right away, so
+    only one chunk of Python objects is alive at a time. Column dtypes
+    follow the Postgres types: numbers float64/int64, dates and timestamps
+    datetime64, text categorical; dtypes overrides them by column name
+    ("float64", "int64", "datetime64", "category" or "object"). Categories
+    differ between chunks.
+    """
+    cur = conn.cursor(name=f"frame_{next(_cursor_ids)}")
+    cur.itersize = chunk_rows
+    try:
+        _register_casters(cur)
+        cur.execute(query, params)
+        names: Optional[List[str]] = None
+        types: List[str] = []
+        emitted = 0
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if names is None:
+                # A named cursor only describes its columns after the first fetch
+                names = [col[0] for col in cur.description]
+                types = [
+                    (dtypes or {}).get(name, _OID_DTYPES.get(col[1], "object"))
+                    for name, col in zip(names, cur.description)
+                ]
+            if not rows:
+                if not emitted:
+                    yield _chunk_frame([], names, types, 0)
+                break
+            yield _chunk_frame(rows, names, types, emitted)
+            emitted += len(rows)
+    finally:
+        cur.close()
+
+
+def _combine(parts: List[pd.Series]):
+    if isinstance(parts[0].dtype, pd.CategoricalDtype):
+        return union_categoricals(parts, sort_categories=True)
+    # int64 chunks are upcast to float64 if any chunk had NULLs
+    return np.concatenate([part.to_numpy() for part in parts])
+
+
+def stream_frame(
+    conn,
+    query: str,
+    params: Optional[Sequence] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> pd.DataFrame:
+    """The whole result of query as one typed DataFrame (see iter_frames)."""
+    chunks = list(iter_frames(conn, query, params, dtypes, chunk_rows))
+    if len(chunks) == 1:
+        return chunks[0]
+    names = chunks[0].columns
+    return pd.DataFrame({name: _combine([c[name] for c in chunks]) for name in names}, columns=names)
+
+
+def iter_query(
+    query: str,
+    params: Optional[Sequence] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """iter_frames on a pooled connection, held until the generator finishes."""
+    with get_connection() as conn:
+        yield from iter_frames(conn, query, params, dtypes, chunk_rows)
+
+
+def read_frame(
+    query: str,
+    params: Optional[Sequence] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+    cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Typed DataFrame of a query (see stream_frame), on a pooled connection.
+
+    Results are cached per (query, params, dtypes) for the rest of the
+    process, so repeated reads of a table are not fetched again. Callers get
+    a shallow copy: adding or replacing columns leaves the cached frame
+    unchanged.
+    """
+    key = (" ".join(query.split()), tuple(params or ()), tuple(sorted((dtypes or {}).items())))
+    with _lock:
+        df = _frames.get(key) if cache else None
+    if df is None:
+        start = time.perf_counter()
+        with get_connection() as conn:
+            df = stream_frame(conn, query, params, dtypes)
+        logging.info(
+            f"Loaded {len(df)} rows ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB) "
+            f"in {time.perf_counter() - start:.2f}s: {key[0]}"
+        )
+        if cache:
+            with _lock:
+                _frames[key] = df
+    return df.copy(deep=False)
+
+
+def read_table(table: str, dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """All rows of a table, fetched once per process (see read_frame)."""
+    return read_frame(f"SELECT * FROM {table};", dtypes=dtypes)
+
+
+def clear_frame_cache() -> None:
+    with _lock:
+        _frames.clear()
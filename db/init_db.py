@@ -1,46 +1,97 @@
 import logging
-from db.connection import connect_to_db
-from db.schema import CREATE_INGESTION_RUNS, CREATE_INGESTION_REJECTS, CREATE_MEASUREMENTS, CREATE_INDICATORS, CREATE_GEOGRAPHIC
+from typing import Optional
 
-def init_db(reset: bool = True) -> None:
+from db import partitions
+from db.connection import get_connection
+from db.schema import (
+    CREATE_INGESTION_RUNS,
+    ALTER_INGESTION_RUNS,
+    CREATE_INGESTION_REJECTS,
+    CREATE_MEASUREMENTS,
+    CREATE_MEASUREMENTS_INDEXES,
+    CREATE_MEASUREMENTS_PARTITIONED,
+    CREATE_MEASUREMENT_AGGREGATES,
+    CREATE_MEASUREMENT_AGGREGATE_STATS,
+    CREATE_MEASUREMENT_FEATURES,
+    CREATE_SEASON_IDX_FUNCTION,
+    CREATE_INDICATORS,
+    CREATE_GEOGRAPHIC,
+    CREATE_INGESTION_MANIFEST,
+    CREATE_INGESTION_ROW_HASHES,
+    CREATE_INGESTION_RUN_METRICS,
+    ALTER_INGESTION_RUN_METRICS,
+)
+
+def init_db(reset: bool = True, partition_interval: Optional[str] = None) -> None:
     """
     Initialize database tables.
 
     reset=False → only CREATE IF NOT EXISTS (safe for production)
     reset=True  → DROP + recreate tables (development only)
+
+    partition_interval ("year" or "month") creates measurements range-
+    partitioned on start_date; partitions are added while loading. An
+    existing unpartitioned measurements table is kept (reset to convert).
     """
+    if partition_interval and partition_interval not in partitions.PARTITION_INTERVALS:
+        raise ValueError(
+            f"Unknown partition interval '{partition_interval}', "
+            f"expected one of {partitions.PARTITION_INTERVALS}"
+        )
+
+    with get_connection() as conn:
+        cur = conn.cursor()
 
-    conn = connect_to_db()
-    cur = conn.cursor()
+        try:
+            if reset:
+                # Drop views and child tables first (dependencies)
+                cur.execute("DROP VIEW IF EXISTS measurement_features;")
+                cur.execute("DROP VIEW IF EXISTS measurement_aggregate_stats;")
+                cur.execute("DROP TABLE IF EXISTS measurement_aggregates;")
+                cur.execute("DROP TABLE IF EXISTS ingestion_run_metrics;")
+                cur.execute("DROP TABLE IF EXISTS ingestion_row_hashes;")
+                cur.execute("DROP TABLE IF EXISTS ingestion_manifest;")
+                cur.execute("DROP TABLE IF EXISTS ingestion_rejects;")
+                cur.execute("DROP TABLE IF EXISTS measurements;")
 
-    try:
-        if reset:
-            # Drop child tables first (FK dependencies)
-            cur.execute("DROP TABLE IF EXISTS ingestion_rejects;")
-            cur.execute("DROP TABLE IF EXISTS measurements;")
+                # Drop parent tables after
+                cur.execute("DROP TABLE IF EXISTS geographic;")
+                cur.execute("DROP TABLE IF EXISTS indicators;")
+                cur.execute("DROP TABLE IF EXISTS ingestion_runs;")
 
-            # Drop parent tables after
-            cur.execute("DROP TABLE IF EXISTS geographic;")
-            cur.execute("DROP TABLE IF EXISTS indicators;")
-            cur.execute("DROP TABLE IF EXISTS ingestion_runs;")
+            cur.execute(CREATE_SEASON_IDX_FUNCTION)
 
-        # Create parent tables first
-        cur.execute(CREATE_INGESTION_RUNS)
-        cur.execute(CREATE_INDICATORS)
-        cur.execute(CREATE_GEOGRAPHIC)
+            # Create parent tables first
+            cur.execute(CREATE_INGESTION_RUNS)
+            cur.execute(ALTER_INGESTION_RUNS)
+            cur.execute(CREATE_INDICATORS)
+            cur.execute(CREATE_GEOGRAPHIC)
 
-        # Then child tables
-        cur.execute(CREATE_MEASUREMENTS)
-        cur.execute(CREATE_INGESTION_REJECTS)
+            # Then child tables
+            cur.execute(CREATE_MEASUREMENTS_PARTITIONED if partition_interval else CREATE_MEASUREMENTS)
+            cur.execute(CREATE_MEASUREMENTS_INDEXES)
+            cur.execute(CREATE_INGESTION_REJECTS)
+            cur.execute(CREATE_INGESTION_MANIFEST)
+            cur.execute(CREATE_INGESTION_ROW_HASHES)
+            cur.execute(CREATE_INGESTION_RUN_METRICS)
+            cur.execute(ALTER_INGESTION_RUN_METRICS)
+            cur.execute(CREATE_MEASUREMENT_AGGREGATES)
+            cur.execute(CREATE_MEASUREMENT_AGGREGATE_STATS)
+            cur.execute(CREATE_MEASUREMENT_FEATURES)
 
-        conn.commit()
-        logging.info("Database tables verified/created successfully")
+            conn.commit()
+            partitions.reset()
+            if partition_interval and not partitions.is_partitioned(cur, "measurements"):
+                logging.warning(
+                    "measurements exists without partitioning; "
+                    "run init_db(reset=True) to recreate it partitioned"
+                )
+            logging.info("Database tables verified/created successfully")
 
-    except Exception as e:
-        conn.rollback()
-        logging.error(f"Database initialization failed: {e}")
-        raise
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Database initialization failed: {e}")
+            raise
 
-    finally:
-        cur.close()
-        conn.close()
\ No newline at end of file
+        finally:
+            cur.close()
\ No newline at end of file
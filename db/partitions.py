@@ -0,0 +1,103 @@
+import logging
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from psycopg2 import errors
+
+from db.connection import get_connection
+
+# database.measurements_partitioning.interval
+PARTITION_INTERVALS = ("year", "month")
+
+# Partitions known to exist, and whether each table is partitioned at all;
+# both are filled lazily per process
+_known: Set[str] = set()
+_partitioned: Dict[str, bool] = {}
+_lock = threading.Lock()
+
+
+def partition_bounds(day: date, interval: str = "year") -> Tuple[date, date]:
+    """[start, end) of the partition holding day."""
+    if interval == "year":
+        return date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    if interval == "month":
+        start = date(day.year, day.month, 1)
+        end = date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+        return start, end
+    raise ValueError(f"Unknown partition interval '{interval}', expected one of {PARTITION_INTERVALS}")
+
+
+def partition_name(table: str, start: date, interval: str = "year") -> str:
+    if interval == "month":
+        return f"{table}_{start.year}_{start.month:02d}"
+    return f"{table}_{start.year}"
+
+
+def create_partition_sql(table: str, start: date, end: date, name: str) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}');"
+    )
+
+
+def is_partitioned(cur, table: str) -> bool:
+    """Whether table was created with PARTITION BY (checked once per process)."""
+    if table not in _partitioned:
+        cur.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s);", (table,)
+        )
+        _partitioned[table] = cur.fetchone() is not None
+    return _partitioned[table]
+
+
+def ensure_partitions(
+    table: str, days: Iterable[Optional[date]], interval: str = "year"
+) -> List[str]:
+    """
+    Create the partitions of table that days fall into, if missing.
+
+    Runs on its own pooled connection and commits right away, so loaders
+    on other connections (partitioned loads) see the new partitions and
+    the DDL lock on the parent table is held only briefly. Returns the
+    names of the partitions created.
+    """
+    bounds = {partition_bounds(d, interval) for d in days if d is not None}
+    with _lock:
+        missing = {
+            (start, end) for start, end in bounds
+            if partition_name(table, start, interval) not in _known
+        }
+    if not missing:
+        return []
+
+    created = []
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            for start, end in sorted(missing):
+                name = partition_name(table, start, interval)
+                cur.execute("SELECT to_regclass(%s) IS NOT NULL;", (name,))
+                if not cur.fetchone()[0]:
+                    try:
+                        cur.execute(create_partition_sql(table, start, end, name))
+                        conn.commit()
+                        created.append(name)
+                    except (errors.DuplicateTable, errors.UniqueViolation):
+                        # Another loader created it first
+                        conn.rollback()
+                with _lock:
+                    _known.add(name)
+        finally:
+            cur.close()
+
+    if created:
+        logging.info(f"Created {table} partitions: {', '.join(created)}")
+    return created
+
+
+def reset() -> None:
+    """Forget known partitions (e.g. after the tables were recreated)."""
+    with _lock:
+        _known.clear()
+        _partitioned.clear()
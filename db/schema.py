@@ -10,11 +10,19 @@ CREATE TABLE IF NOT EXISTS ingestion_runs (
     total_records   INTEGER,
     valid_records   INTEGER,
     rejected_records INTEGER,
+    skipped_records INTEGER DEFAULT 0,
+    duplicate_records INTEGER DEFAULT 0,
     status          VARCHAR(50),
     error_message   TEXT
 );
 """
 
+# columns added after the first release; keeps existing databases in step
+ALTER_INGESTION_RUNS = """
+ALTER TABLE ingestion_runs ADD COLUMN IF NOT EXISTS skipped_records INTEGER DEFAULT 0;
+ALTER TABLE ingestion_runs ADD COLUMN IF NOT EXISTS duplicate_records INTEGER DEFAULT 0;
+"""
+
 # imo dont even need this table. 
 # if there is a nonzero amount of rejected records in ingestion runs then we know there is a rejection
 # error reason can be stored in error_message of ingestion_runs
@@ -76,6 +84,113 @@ CREATE TABLE IF NOT EXISTS measurements (
 );
 """
 
+# range-partitioned on start_date (database.measurements_partitioning);
+# partitions are created on demand by db.partitions.ensure_partitions.
+# Postgres needs the partition key in every unique constraint, so unique_id
+# is only unique per start_date here.
+CREATE_MEASUREMENTS_PARTITIONED = """
+CREATE TABLE IF NOT EXISTS measurements (
+    unique_id       INTEGER NOT NULL,
+    indicator_id    INTEGER REFERENCES indicators(indicator_id),
+    geo_join_id     INTEGER REFERENCES geographic(geo_join_id),
+    time_period     TEXT,
+    start_date      DATE NOT NULL,
+    data_value      NUMERIC,
+    message         TEXT,
+    run_id          INTEGER REFERENCES ingestion_runs(run_id),
+    load_timestamp  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (unique_id, start_date)
+) PARTITION BY RANGE (start_date);
+"""
+
+# analysis_pt2 filters one indicator_id over a start_date range and joins
+# geographic on geo_join_id; on a partitioned table every partition gets them
+CREATE_MEASUREMENTS_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_measurements_indicator_date
+    ON measurements (indicator_id, start_date);
+CREATE INDEX IF NOT EXISTS idx_measurements_geo_join_id
+    ON measurements (geo_join_id);
+"""
+
+# Season of a date: 1 winter (Dec-Feb), 2 summer, 3 fall, 4 spring. A plain
+# SQL expression, so the planner inlines it into the queries that use it
+CREATE_SEASON_IDX_FUNCTION = """
+CREATE OR REPLACE FUNCTION season_idx(on_date DATE) RETURNS INTEGER
+LANGUAGE SQL IMMUTABLE AS $$
+    SELECT CASE
+        WHEN EXTRACT(MONTH FROM on_date) IN (12, 1, 2) THEN 1
+        WHEN EXTRACT(MONTH FROM on_date) IN (6, 7, 8) THEN 2
+        WHEN EXTRACT(MONTH FROM on_date) IN (9, 10, 11) THEN 3
+        ELSE 4
+    END
+$$;
+"""
+
+# Per indicator × geo_join_id × year × season statistics of data_value,
+# kept up to date by the loader (ingestion.aggregates); season as in season_idx
+CREATE_MEASUREMENT_AGGREGATES = """
+CREATE TABLE IF NOT EXISTS measurement_aggregates (
+    indicator_id    INTEGER NOT NULL,
+    geo_join_id     INTEGER NOT NULL,
+    year            INTEGER NOT NULL,
+    season          SMALLINT NOT NULL,
+    value_count     BIGINT NOT NULL,
+    value_sum       NUMERIC NOT NULL,
+    value_sum_sq    NUMERIC NOT NULL,
+    value_min       NUMERIC,
+    value_max       NUMERIC,
+    updated_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (indicator_id, geo_join_id, year, season)
+);
+"""
+
+# Mean and sample standard deviation per group, for dashboards; groups can
+# be rolled up (e.g. per location) by summing count, sum and sum_sq first
+CREATE_MEASUREMENT_AGGREGATE_STATS = """
+CREATE OR REPLACE VIEW measurement_aggregate_stats AS
+SELECT
+    indicator_id,
+    geo_join_id,
+    year,
+    season,
+    value_count,
+    value_sum / value_count AS value_avg,
+    CASE WHEN value_count > 1 THEN
+        sqrt(greatest(value_sum_sq - value_sum * value_sum / value_count, 0) / (value_count - 1))
+    END AS value_stddev,
+    value_min,
+    value_max
+FROM measurement_aggregates;
+"""
+
+# measurements with their place and the analysis features: date parts,
+# season and the deviation from the location's mean for the indicator.
+# indicator_id is in every window's PARTITION BY, so a filter on it is
+# applied before the windows are computed (index scan, one indicator only)
+CREATE_MEASUREMENT_FEATURES = """
+CREATE OR REPLACE VIEW measurement_features AS
+SELECT
+    m.unique_id,
+    m.indicator_id,
+    m.geo_join_id,
+    g.geo_place_name,
+    m.time_period,
+    m.start_date,
+    m.data_value,
+    m.message,
+    m.run_id,
+    m.load_timestamp,
+    EXTRACT(YEAR FROM m.start_date)::int AS year,
+    EXTRACT(MONTH FROM m.start_date)::int AS month,
+    EXTRACT(DAY FROM m.start_date)::int AS day,
+    season_idx(m.start_date) AS season_idx,
+    AVG(m.data_value) OVER location AS location_avg_pollution,
+    m.data_value - AVG(m.data_value) OVER location AS pollution_deviation
+FROM measurements m
+LEFT JOIN geographic g ON m.geo_join_id = g.geo_join_id
+WINDOW location AS (PARTITION BY m.indicator_id, m.geo_join_id);
+"""
+
 CREATE_INGESTION_REJECTS = """
 CREATE TABLE IF NOT EXISTS ingestion_rejects (
     reject_id       SERIAL PRIMARY KEY,
@@ -85,4 +200,52 @@ CREATE TABLE IF NOT EXISTS ingestion_rejects (
     source_file     VARCHAR NOT NULL,
     rejected_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
-"""
\ No newline at end of file
+"""
+
+# one row per source file; size/mtime are a cheap pre-check before hashing
+CREATE_INGESTION_MANIFEST = """
+CREATE TABLE IF NOT EXISTS ingestion_manifest (
+    source_path     VARCHAR PRIMARY KEY,
+    source_file     VARCHAR NOT NULL,
+    file_size       BIGINT NOT NULL,
+    file_mtime      DOUBLE PRECISION NOT NULL,
+    content_hash    VARCHAR(64) NOT NULL,
+    row_count       INTEGER,
+    last_run_id     INTEGER REFERENCES ingestion_runs(run_id),
+    updated_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# per-stage timings of a run; seconds are summed over calls (and over
+# threads/worker processes). process_peak_rss_mb is the process's high-water
+# RSS when the stage last finished: the same for every stage after the run's
+# peak, not memory used by the stage
+CREATE_INGESTION_RUN_METRICS = """
+CREATE TABLE IF NOT EXISTS ingestion_run_metrics (
+    run_id          INTEGER NOT NULL REFERENCES ingestion_runs(run_id),
+    stage           VARCHAR(50) NOT NULL,
+    calls           INTEGER NOT NULL,
+    row_count       BIGINT NOT NULL,
+    seconds         DOUBLE PRECISION NOT NULL,
+    rows_per_sec    DOUBLE PRECISION,
+    process_peak_rss_mb DOUBLE PRECISION,
+    recorded_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, stage)
+);
+"""
+
+# peak_rss_mb was renamed; the old column is left in place (no longer written)
+ALTER_INGESTION_RUN_METRICS = """
+ALTER TABLE ingestion_run_metrics ADD COLUMN IF NOT EXISTS process_peak_rss_mb DOUBLE PRECISION;
+"""
+
+# per-row content hashes so a changed file only loads new or modified rows
+CREATE_INGESTION_ROW_HASHES = """
+CREATE TABLE IF NOT EXISTS ingestion_row_hashes (
+    source_path     VARCHAR NOT NULL,
+    unique_id       INTEGER NOT NULL,
+    row_hash        BIGINT NOT NULL,
+    run_id          INTEGER REFERENCES ingestion_runs(run_id),
+    PRIMARY KEY (source_path, unique_id)
+);
+"""
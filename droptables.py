@@ -4,15 +4,29 @@ from db.schema import (
     CREATE_INGESTION_RUNS,
     CREATE_INGESTION_REJECTS,
     CREATE_MEASUREMENTS,
+    CREATE_MEASUREMENTS_INDEXES,
+    CREATE_MEASUREMENT_AGGREGATES,
+    CREATE_MEASUREMENT_AGGREGATE_STATS,
+    CREATE_MEASUREMENT_FEATURES,
+    CREATE_SEASON_IDX_FUNCTION,
     CREATE_INDICATORS,
     CREATE_GEOGRAPHIC,
+    CREATE_INGESTION_MANIFEST,
+    CREATE_INGESTION_ROW_HASHES,
+    CREATE_INGESTION_RUN_METRICS,
 )
 
 conn = connect_to_db()
 cur = conn.cursor()
 
 try:
-     # Drop child tables first (FK dependencies)
+     # Drop views and child tables first (dependencies)
+    cur.execute("DROP VIEW IF EXISTS measurement_features;")
+    cur.execute("DROP VIEW IF EXISTS measurement_aggregate_stats;")
+    cur.execute("DROP TABLE IF EXISTS measurement_aggregates;")
+    cur.execute("DROP TABLE IF EXISTS ingestion_run_metrics;")
+    cur.execute("DROP TABLE IF EXISTS ingestion_row_hashes;")
+    cur.execute("DROP TABLE IF EXISTS ingestion_manifest;")
     cur.execute("DROP TABLE IF EXISTS ingestion_rejects;")
     cur.execute("DROP TABLE IF EXISTS measurements;")
 
@@ -21,6 +35,8 @@ try:
     cur.execute("DROP TABLE IF EXISTS indicators;")
     cur.execute("DROP TABLE IF EXISTS ingestion_runs;")
 
+    cur.execute(CREATE_SEASON_IDX_FUNCTION)
+
     # Create parent tables first
     cur.execute(CREATE_INGESTION_RUNS)
     cur.execute(CREATE_INDICATORS)
@@ -28,7 +44,14 @@ try:
 
     # Then child tables
     cur.execute(CREATE_MEASUREMENTS)
+    cur.execute(CREATE_MEASUREMENTS_INDEXES)
     cur.execute(CREATE_INGESTION_REJECTS)
+    cur.execute(CREATE_INGESTION_MANIFEST)
+    cur.execute(CREATE_INGESTION_ROW_HASHES)
+    cur.execute(CREATE_INGESTION_RUN_METRICS)
+    cur.execute(CREATE_MEASUREMENT_AGGREGATES)
+    cur.execute(CREATE_MEASUREMENT_AGGREGATE_STATS)
+    cur.execute(CREATE_MEASUREMENT_FEATURES)
 
     conn.commit()
     logging.info("Database tables verified/created successfully")
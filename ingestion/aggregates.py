@@ -0,0 +1,181 @@
+import logging
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# (indicator_id, geo_join_id, year, season)
+Group = Tuple[int, int, int, int]
+
+AGGREGATES_TABLE = "measurement_aggregates"
+
+# db.schema.CREATE_SEASON_IDX_FUNCTION
+SEASON_SQL = "season_idx(m.start_date)"
+YEAR_SQL = "EXTRACT(YEAR FROM m.start_date)::int"
+
+# Rows without a group key or a value are not aggregated
+_AGGREGATED = (
+    "m.indicator_id IS NOT NULL AND m.geo_join_id IS NOT NULL "
+    "AND m.start_date IS NOT NULL AND m.data_value IS NOT NULL"
+)
+
+_enabled = False
+
+
+def configure_aggregates(enabled: bool = True) -> None:
+    """Turn load-time maintenance of the aggregate table on/off."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def current_xid(cur) -> int:
+    """Id of the open transaction, as stored in the xmin of the rows it inserted."""
+    cur.execute("SELECT txid_current() % 4294967296;")
+    return cur.fetchone()[0]
+
+
+def _upsert_sql(aggregates_table: str, source_sql: str, incremental: bool) -> str:
+    """
+    INSERT ... ON CONFLICT of per-group statistics of the measurements m
+    selected by source_sql. incremental adds them to the stored ones;
+    otherwise they replace them.
+    """
+    if incremental:
+        updates = (
+            "value_count = a.value_count + EXCLUDED.value_count, "
+            "value_sum = a.value_sum + EXCLUDED.value_sum, "
+            "value_sum_sq = a.value_sum_sq + EXCLUDED.value_sum_sq, "
+            "value_min = LEAST(a.value_min, EXCLUDED.value_min), "
+            "value_max = GREATEST(a.value_max, EXCLUDED.value_max), "
+        )
+    else:
+        updates = "".join(
+            f"{col} = EXCLUDED.{col}, "
+            for col in ("value_count", "value_sum", "value_sum_sq", "value_min", "value_max")
+        )
+    # Key order gives concurrent loaders the same lock order (no deadlocks)
+    return (
+        f"INSERT INTO {aggregates_table} AS a "
+        "(indicator_id, geo_join_id, year, season, "
+        "value_count, value_sum, value_sum_sq, value_min, value_max) "
+        f"SELECT m.indicator_id, m.geo_join_id, {YEAR_SQL}, {SEASON_SQL}, "
+        "count(*), sum(m.data_value), sum(m.data_value * m.data_value), "
+        "min(m.data_value), max(m.data_value) "
+        f"{source_sql} AND {_AGGREGATED} "
+        "GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4 "
+        "ON CONFLICT (indicator_id, geo_join_id, year, season) DO UPDATE SET "
+        f"{updates}updated_at = CURRENT_TIMESTAMP"
+    )
+
+
+def affected_groups(
+    cur, measurements_table: str, unique_ids: Sequence[int], run_id: Optional[int] = None
+) -> List[Group]:
+    """Groups of the stored measurements with these unique_ids (e.g. before deleting them)."""
+    if not unique_ids:
+        return []
+    sql = (
+        f"SELECT DISTINCT m.indicator_id, m.geo_join_id, {YEAR_SQL}, {SEASON_SQL} "
+        f"FROM {measurements_table} m WHERE m.unique_id = ANY(%s) AND {_AGGREGATED}"
+    )
+    params: List = [list(unique_ids)]
+    if run_id is not None:
+        sql += " AND m.run_id = %s"
+        params.append(run_id)
+    cur.execute(sql + ";", params)
+    return [tuple(row) for row in cur.fetchall()]
+
+
+def add_inserted(
+    cur,
+    measurements_table: str,
+    unique_ids: Sequence[int],
+    xids: Iterable[int],
+    aggregates_table: str = AGGREGATES_TABLE,
+) -> int:
+    """
+    Add the measurements with these unique_ids that the transactions xids
+    inserted to their groups. Rows skipped as conflicts keep the xmin of
+    the run that stored them, so they are not counted twice.
+
+    Returns the number of groups updated.
+    """
+    if not unique_ids:
+        return 0
+    source_sql = (
+        f"FROM {measurements_table} m "
+        "WHERE m.unique_id = ANY(%s) AND m.xmin::text::bigint = ANY(%s)"
+    )
+    cur.execute(
+        _upsert_sql(aggregates_table, source_sql, incremental=True) + ";",
+        (list(unique_ids), list(xids)),
+    )
+    return cur.rowcount
+
+
+def recompute_groups(
+    cur,
+    measurements_table: str,
+    groups: Iterable[Group],
+    aggregates_table: str = AGGREGATES_TABLE,
+) -> None:
+    """
+    Recompute groups from the stored measurements.
+
+    Needed where rows were deleted (replaced or compensated): min and max
+    cannot be taken back incrementally. Groups left without rows are removed.
+    """
+    groups = sorted(set(groups))
+    if not groups:
+        return
+    arrays = [list(col) for col in zip(*groups)]
+    stale = (
+        "unnest(%s::int[], %s::int[], %s::int[], %s::int[]) "
+        "AS s(indicator_id, geo_join_id, year, season)"
+    )
+    cur.execute(
+        f"DELETE FROM {aggregates_table} a USING {stale} "
+        "WHERE a.indicator_id = s.indicator_id AND a.geo_join_id = s.geo_join_id "
+        "AND a.year = s.year AND a.season = s.season;",
+        arrays,
+    )
+    source_sql = (
+        f"FROM {measurements_table} m JOIN {stale} "
+        "ON m.indicator_id = s.indicator_id AND m.geo_join_id = s.geo_join_id "
+        f"AND {YEAR_SQL} = s.year AND {SEASON_SQL} = s.season WHERE TRUE"
+    )
+    cur.execute(_upsert_sql(aggregates_table, source_sql, incremental=False) + ";", arrays)
+
+
+def update_aggregates(
+    cur,
+    measurements_table: str,
+    unique_ids: Sequence[int],
+    xids: Iterable[int],
+    stale: Iterable[Group] = (),
+    aggregates_table: str = AGGREGATES_TABLE,
+) -> None:
+    """Fold a loaded chunk into the aggregates; stale groups are recomputed."""
+    add_inserted(cur, measurements_table, unique_ids, xids, aggregates_table)
+    # After the increments, so recomputed groups are not counted twice
+    recompute_groups(cur, measurements_table, stale, aggregates_table)
+
+
+def backfill(
+    cur, measurements_table: str = "measurements", aggregates_table: str = AGGREGATES_TABLE
+) -> int:
+    """
+    Build the aggregates from all stored measurements if the table is empty
+    (e.g. aggregation was enabled after data was loaded).
+
+    Returns the number of groups created.
+    """
+    cur.execute(f"SELECT EXISTS (SELECT 1 FROM {aggregates_table});")
+    if cur.fetchone()[0]:
+        return 0
+    source_sql = f"FROM {measurements_table} m WHERE TRUE"
+    cur.execute(_upsert_sql(aggregates_table, source_sql, incremental=False) + ";")
+    if cur.rowcount:
+        logging.info(f"Backfilled {cur.rowcount} {aggregates_table} groups from {measurements_table}")
+    return cur.rowcount
@@ -1,8 +1,500 @@
-from typing import List, Dict
+import logging
+import math
+import os
+import shutil
+import struct
+import tempfile
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import List, Dict, Optional, Set, Tuple, Union
 
+import numpy as np
+import pandas as pd
 
-def deduplicate_records(records: List[Dict], keys: List[str]) -> List[Dict]:
-    seen = set()
+# Separates key columns in the canonical key text (never appears in the data)
+KEY_SEPARATOR = "\x1f"
+# Stands in for a missing value (None/NaN) in the canonical key text
+NULL_KEY = "\x1e"
+
+_EMPTY = np.uint64(0)
+_LENGTH = struct.Struct("<I")
+
+
+# -----------------------
+# Canonical key text
+# -----------------------
+
+def _canonical_value(value) -> str:
+    """Text form of one key value; equal values give equal text."""
+    if value is None:
+        return NULL_KEY
+    if isinstance(value, float) and math.isnan(value):
+        return NULL_KEY
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, datetime):
+        if value == datetime(value.year, value.month, value.day):
+            return value.date().isoformat()
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _canonical_column(values: pd.Series) -> pd.Series:
+    """Vectorized _canonical_value for a DataFrame column."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Canonicalize each distinct value once, then expand by code
+        categories = _canonical_column(pd.Series(values.cat.categories)).to_numpy()
+        codes = values.cat.codes.to_numpy()
+        text = pd.Series(
+            categories[codes] if len(categories) else np.full(len(values), NULL_KEY, dtype=object),
+            index=values.index,
+            dtype=object,
+        )
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        if (values.dropna() == values.dropna().dt.normalize()).all():
+            text = values.dt.strftime("%Y-%m-%d")
+        else:
+            text = values.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    elif pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+        text = values.astype(str)
+    elif pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+        text = values.astype(object)
+    else:
+        text = pd.Series(
+            [_canonical_value(v) for v in values.tolist()], index=values.index, dtype=object
+        )
+    return text.where(values.notna(), NULL_KEY).astype(object)
+
+
+def record_key_texts(
+    records: List[Dict], keys: List[str], describe_missing: bool = True
+) -> List[str]:
+    """
+    Canonical key text per record.
+
+    Raises:
+        KeyError: a key is missing; with describe_missing the message names the
+            key and the record, as deduplicate_records always has
+    """
+    texts = []
+    for record in records:
+        try:
+            texts.append(KEY_SEPARATOR.join(_canonical_value(record[k]) for k in keys))
+        except KeyError as e:
+            if describe_missing:
+                raise KeyError(f"Deduplication key '{e.args[0]}' missing in record: {record}")
+            raise
+    return texts
+
+
+def frame_key_texts(df: pd.DataFrame, keys: List[str]) -> np.ndarray:
+    """Canonical key text per DataFrame row (same text as record_key_texts)."""
+    missing = [k for k in keys if k not in df.columns]
+    if missing:
+        raise KeyError(f"Deduplication key '{missing[0]}' missing in columns: {list(df.columns)}")
+    if df.empty:
+        return np.array([], dtype=object)
+
+    text = _canonical_column(df[keys[0]])
+    for k in keys[1:]:
+        text = text + KEY_SEPARATOR + _canonical_column(df[k])
+    return text.to_numpy(dtype=object)
+
+
+def hash_key_texts(texts) -> np.ndarray:
+    """64-bit hash per key text (0 is reserved for empty table slots)."""
+    if len(texts) == 0:
+        return np.array([], dtype=np.uint64)
+    hashes = pd.util.hash_array(np.asarray(texts, dtype=object))
+    hashes[hashes == _EMPTY] = 1
+    return hashes
+
+
+# -----------------------
+# Compact hash table
+# -----------------------
+
+class CompactDeduplicator:
+    """
+    First-occurrence-wins duplicate detector over 64-bit key hashes.
+
+    Hashes are kept in NumPy open-addressing tables (linear probing, at most
+    half full), one per hash partition: 16 bytes per distinct key instead of
+    a Python tuple of strings. When the resident tables exceed
+    memory_budget_mb, the least recently used partitions are written to
+    spill_dir and loaded back when a later chunk needs them.
+
+    Without exact, two different keys with the same 64-bit hash are treated
+    as duplicates (odds are ~n²/2⁶⁵). With exact=True the key text of every
+    stored hash is appended to a per-partition file and each hash match is
+    confirmed against it, so only true duplicates are dropped.
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: float = 256,
+        spill_dir: Optional[str] = None,
+        exact: bool = False,
+        partition_bits: int = 6,
+        initial_capacity: int = 1024,
+    ):
+        if not 1 <= partition_bits <= 16:
+            raise ValueError("partition_bits must be between 1 and 16")
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.exact = exact
+        self.partition_bits = partition_bits
+        self.n_partitions = 1 << partition_bits
+        self.spill_count = 0
+        self.load_count = 0
+
+        self._spill_root = spill_dir
+        self._work_dir: Optional[str] = None
+        self._initial_capacity = 1 << max(4, (initial_capacity - 1).bit_length())
+        self._counts = [0] * self.n_partitions
+        self._resident: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._offsets: Dict[int, np.ndarray] = {}
+        self._spilled: Set[int] = set()
+        self._key_files: Dict[int, int] = {}
+        self._key_sizes: Dict[int, int] = {}
+        self._warned_oversize = False
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def __enter__(self) -> "CompactDeduplicator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Drop all state and remove spill and key files."""
+        for fd in self._key_files.values():
+            os.close(fd)
+        self._key_files.clear()
+        self._resident.clear()
+        self._offsets.clear()
+        self._spilled.clear()
+        if self._work_dir:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
+            self._work_dir = None
+
+    # --- public API -------------------------------------------------------
+
+    def add(self, hashes: np.ndarray, texts=None) -> np.ndarray:
+        """
+        Insert a batch of key hashes in order.
+
+        Args:
+            hashes: uint64 hash per row (hash_key_texts)
+            texts: key text per row; required when exact=True
+
+        Returns:
+            bool array, True where the row repeats an earlier key (from this
+            batch or any previous one)
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if self.exact and texts is None:
+            raise ValueError("exact deduplication needs the key texts")
+
+        duplicate = np.zeros(len(hashes), dtype=bool)
+        if len(hashes) == 0:
+            return duplicate
+
+        partition = (hashes >> np.uint64(64 - self.partition_bits)).astype(np.intp)
+        # Stable sort keeps rows of a partition in input order (first wins)
+        order = np.argsort(partition, kind="stable")
+        bounds = np.flatnonzero(np.diff(partition[order])) + 1
+        for idx in np.split(order, bounds):
+            p = int(partition[idx[0]])
+            batch_texts = [texts[i] for i in idx] if self.exact else None
+            duplicate[idx] = self._add_to_partition(p, hashes[idx], batch_texts)
+        return duplicate
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": len(self),
+            "resident_bytes": self._resident_bytes(),
+            "resident_partitions": len(self._resident),
+            "spilled_partitions": len(self._spilled),
+            "spills": self.spill_count,
+            "reloads": self.load_count,
+        }
+
+    # --- partitions -------------------------------------------------------
+
+    def _dir(self) -> str:
+        if self._work_dir is None:
+            if self._spill_root:
+                os.makedirs(self._spill_root, exist_ok=True)
+            self._work_dir = tempfile.mkdtemp(prefix="dedup-", dir=self._spill_root)
+        return self._work_dir
+
+    def _spill_path(self, p: int, kind: str) -> str:
+        return os.path.join(self._dir(), f"partition_{p:05d}.{kind}.npy")
+
+    def _resident_bytes(self) -> int:
+        size = sum(t.nbytes for t in self._resident.values())
+        return size + sum(o.nbytes for o in self._offsets.values())
+
+    def _partition(self, p: int) -> np.ndarray:
+        """Return partition p's table, loading it from disk if it was spilled."""
+        if p in self._resident:
+            self._resident.move_to_end(p)
+            return self._resident[p]
+
+        if p in self._spilled:
+            self._resident[p] = np.load(self._spill_path(p, "slots"))
+            if self.exact:
+                self._offsets[p] = np.load(self._spill_path(p, "offsets"))
+            self._spilled.discard(p)
+            self.load_count += 1
+        else:
+            self._resident[p] = np.zeros(self._initial_capacity, dtype=np.uint64)
+            if self.exact:
+                self._offsets[p] = np.full(self._initial_capacity, -1, dtype=np.int64)
+        return self._resident[p]
+
+    def _enforce_budget(self, keep: int) -> None:
+        """Spill least recently used partitions until under the memory budget."""
+        while self._resident_bytes() > self.memory_budget and len(self._resident) > 1:
+            victim = next(p for p in self._resident if p != keep)
+            np.save(self._spill_path(victim, "slots"), self._resident.pop(victim))
+            if self.exact:
+                np.save(self._spill_path(victim, "offsets"), self._offsets.pop(victim))
+            self._spilled.add(victim)
+            self.spill_count += 1
+
+        if self._resident_bytes() > self.memory_budget and not self._warned_oversize:
+            self._warned_oversize = True
+            logging.warning(
+                "Deduplication partition exceeds memory_budget_mb on its own; "
+                "raise the budget or partition_bits"
+            )
+
+    def _reserve(self, p: int, incoming: int) -> np.ndarray:
+        """Grow partition p so that incoming new keys keep it at most half full."""
+        table = self._resident[p]
+        needed = self._counts[p] + incoming
+        if needed * 2 <= len(table):
+            return table
+
+        capacity = len(table)
+        while needed * 2 > capacity:
+            capacity *= 2
+
+        occupied = np.flatnonzero(table != _EMPTY)
+        grown = np.zeros(capacity, dtype=np.uint64)
+        slots = _place(grown, table[occupied])
+        if self.exact:
+            offsets = np.full(capacity, -1, dtype=np.int64)
+            offsets[slots] = self._offsets[p][occupied]
+            self._offsets[p] = offsets
+        self._resident[p] = grown
+        return grown
+
+    def _add_to_partition(self, p: int, hashes: np.ndarray, texts) -> np.ndarray:
+        self._partition(p)
+        unique, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        table = self._reserve(p, len(unique))
+
+        existed, slots = _lookup_insert(table, unique)
+        self._counts[p] += int((~existed).sum())
+
+        duplicate = np.ones(len(hashes), dtype=bool)
+        duplicate[first[~existed]] = False
+
+        if self.exact:
+            new = np.flatnonzero(~existed)
+            self._offsets[p][slots[new]] = self._append_keys(p, [texts[first[u]] for u in new])
+
+            # Every other row only matched by hash; confirm against the stored text
+            inserted_first = np.zeros(len(hashes), dtype=bool)
+            inserted_first[first[new]] = True
+            for i in np.flatnonzero(~inserted_first):
+                duplicate[i] = self._confirm_or_insert(p, hashes[i], texts[i])
+
+        self._enforce_budget(keep=p)
+        return duplicate
+
+    # --- exact mode -------------------------------------------------------
+
+    def _append_keys(self, p: int, texts: List[str]) -> np.ndarray:
+        if p not in self._key_files:
+            path = os.path.join(self._dir(), f"partition_{p:05d}.keys")
+            self._key_files[p] = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            self._key_sizes[p] = 0
+
+        offsets = np.empty(len(texts), dtype=np.int64)
+        buf = bytearray()
+        position = self._key_sizes[p]
+        for n, text in enumerate(texts):
+            encoded = text.encode("utf-8")
+            offsets[n] = position + len(buf)
+            buf += _LENGTH.pack(len(encoded)) + encoded
+        os.pwrite(self._key_files[p], bytes(buf), position)
+        self._key_sizes[p] = position + len(buf)
+        return offsets
+
+    def _read_key(self, p: int, offset: int) -> str:
+        fd = self._key_files[p]
+        (length,) = _LENGTH.unpack(os.pread(fd, _LENGTH.size, offset))
+        return os.pread(fd, length, offset + _LENGTH.size).decode("utf-8")
+
+    def _confirm_or_insert(self, p: int, h: np.uint64, text: str) -> bool:
+        """Walk h's probe chain; True if text is stored, else insert it."""
+        table = self._reserve(p, 1)
+        mask = len(table) - 1
+        slot = int(h) & mask
+        while table[slot] != _EMPTY:
+            if table[slot] == h and self._read_key(p, int(self._offsets[p][slot])) == text:
+                return True
+            slot = (slot + 1) & mask
+
+        # Same hash, different key: a collision, stored as its own entry
+        table[slot] = h
+        self._offsets[p][slot] = self._append_keys(p, [text])[0]
+        self._counts[p] += 1
+        return False
+
+
+def _lookup_insert(table: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized linear-probing lookup of distinct values, inserting the absent ones.
+
+    Returns:
+        (existed, slots): whether each value was already present, and its slot
+    """
+    mask = np.uint64(len(table) - 1)
+    pos = (values & mask).astype(np.intp)
+    existed = np.zeros(len(values), dtype=bool)
+    slots = np.full(len(values), -1, dtype=np.intp)
+    pending = np.arange(len(values))
+
+    while pending.size:
+        current = table[pos[pending]]
+        done = current == values[pending]
+        existed[pending[done]] = True
+        slots[pending[done]] = pos[pending[done]]
+
+        empty = np.flatnonzero(current == _EMPTY)
+        if empty.size:
+            # Several values may probe the same empty slot; the first one takes it
+            _, winners = np.unique(pos[pending[empty]], return_index=True)
+            won = empty[winners]
+            table[pos[pending[won]]] = values[pending[won]]
+            slots[pending[won]] = pos[pending[won]]
+            done[won] = True
+
+        pending = pending[~done]
+        pos[pending] = (pos[pending] + 1) & int(mask)
+
+    return existed, slots
+
+
+def _place(table: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Put every value (equal values included) in its own empty slot; used on resize."""
+    mask = len(table) - 1
+    pos = (values & np.uint64(mask)).astype(np.intp)
+    slots = np.full(len(values), -1, dtype=np.intp)
+    pending = np.arange(len(values))
+
+    while pending.size:
+        empty = np.flatnonzero(table[pos[pending]] == _EMPTY)
+        done = np.zeros(len(pending), dtype=bool)
+        if empty.size:
+            _, winners = np.unique(pos[pending[empty]], return_index=True)
+            won = empty[winners]
+            table[pos[pending[won]]] = values[pending[won]]
+            slots[pending[won]] = pos[pending[won]]
+            done[won] = True
+        pending = pending[~done]
+        pos[pending] = (pos[pending] + 1) & mask
+
+    return slots
+
+
+def make_deduplicator(dedup_cfg: Dict) -> Union[Set[Tuple], CompactDeduplicator]:
+    """
+    Build the `seen` state for a deduplicated stream from the `deduplication`
+    config section: a plain set (engine: set) or a CompactDeduplicator.
+    """
+    if dedup_cfg.get("engine", "set") != "compact":
+        return set()
+    return CompactDeduplicator(
+        memory_budget_mb=dedup_cfg.get("memory_budget_mb") or 256,
+        spill_dir=dedup_cfg.get("spill_dir"),
+        exact=bool(dedup_cfg.get("exact", False)),
+    )
+
+
+# -----------------------
+# DataFrame API
+# -----------------------
+
+def deduplicate_frame(
+    df: pd.DataFrame,
+    keys: List[str],
+    seen: Optional[Union[Set[Tuple], CompactDeduplicator]] = None,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Vectorized deduplicate_records: keep the first row for each key.
+
+    Duplicates inside the frame are found with DataFrame.duplicated(); `seen`
+    (a set or CompactDeduplicator shared across calls) also drops rows whose
+    key appeared in an earlier chunk.
+
+    Returns:
+        (frame without duplicates, number of rows dropped)
+    """
+    missing = [k for k in keys if k not in df.columns]
+    if missing:
+        raise KeyError(f"Deduplication key '{missing[0]}' missing in columns: {list(df.columns)}")
+
+    duplicate = df.duplicated(subset=keys, keep="first").to_numpy(copy=True)
+
+    if seen is not None and not df.empty:
+        first_rows = np.flatnonzero(~duplicate)
+        if isinstance(seen, CompactDeduplicator):
+            texts = frame_key_texts(df.iloc[first_rows], keys)
+            earlier = seen.add(hash_key_texts(texts), texts if seen.exact else None)
+        else:
+            key_columns = [df[k].iloc[first_rows].tolist() for k in keys]
+            earlier = np.zeros(len(first_rows), dtype=bool)
+            for n, key in enumerate(zip(*key_columns)):
+                if key in seen:
+                    earlier[n] = True
+                else:
+                    seen.add(key)
+        duplicate[first_rows[earlier]] = True
+
+    return df.loc[~duplicate], int(duplicate.sum())
+
+
+# -----------------------
+# Record-level API
+# -----------------------
+
+def deduplicate_records(
+    records: List[Dict],
+    keys: List[str],
+    seen: Optional[Union[Set[Tuple], CompactDeduplicator]] = None,
+) -> List[Dict]:
+    """
+    Keep the first record for each key.
+
+    Pass the same `seen` set across calls to deduplicate a stream of chunks,
+    or a CompactDeduplicator to bound memory on very large inputs.
+    """
+    if isinstance(seen, CompactDeduplicator):
+        texts = record_key_texts(records, keys)
+        duplicate = seen.add(hash_key_texts(texts), texts if seen.exact else None)
+        return [r for r, dup in zip(records, duplicate) if not dup]
+
+    if seen is None:
+        seen = set()
     unique_records = []
 
     for record in records:
@@ -18,7 +510,15 @@ def deduplicate_records(records: List[Dict], keys: List[str]) -> List[Dict]:
     return unique_records
 
 
-def count_duplicates(records: List[Dict], keys: List[str]) -> int:
+def count_duplicates(
+    records: List[Dict],
+    keys: List[str],
+    seen: Optional[CompactDeduplicator] = None,
+) -> int:
+    if seen is not None:
+        texts = record_key_texts(records, keys, describe_missing=False)
+        return int(seen.add(hash_key_texts(texts), texts if seen.exact else None).sum())
+
     seen = set()
     duplicates = 0
 
@@ -29,4 +529,4 @@ def count_duplicates(records: List[Dict], keys: List[str]) -> int:
         else:
             seen.add(key)
 
-    return duplicates
\ No newline at end of file
+    return duplicates
@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+# Process-wide cache of dimension keys known to exist in the database.
+# Keys are only added after the transaction that inserted them commits.
+_known: Dict[str, Set] = {}
+_verified: Set[str] = set()
+_enabled = False
+_cache_path: Optional[str] = None
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def configure_dimension_cache(enabled: bool = True, path: Optional[str] = None) -> None:
+    """
+    Turn the cache on/off and set the optional on-disk location.
+
+    Every table is checked against the database once per process, the first
+    time it is used. Without a path its keys are read from the table. With a
+    path, keys survive between runs: a SELECT count(*) verifies the stored
+    keys, and the full key list is only re-read when the file is missing or
+    the count differs.
+    """
+    global _enabled, _cache_path
+
+    with _lock:
+        _enabled = bool(enabled)
+        _cache_path = path
+        _known.clear()
+        _verified.clear()
+        _stats.update(hits=0, misses=0)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _load_from_disk() -> bool:
+    if not _cache_path or not os.path.exists(_cache_path):
+        return False
+    try:
+        with open(_cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable dimension cache {_cache_path}: {e}")
+        return False
+
+    for table, keys in data.items():
+        _known[table] = set(keys)
+    logging.info(f"Dimension cache loaded from {_cache_path}")
+    return True
+
+
+def _persist() -> None:
+    if not _cache_path:
+        return
+    os.makedirs(os.path.dirname(_cache_path) or ".", exist_ok=True)
+    tmp_path = f"{_cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({table: sorted(keys) for table, keys in _known.items()}, f)
+    os.replace(tmp_path, _cache_path)
+
+
+def _warm(cur, table: str, key: str) -> None:
+    """
+    Load known keys for a table once per process.
+
+    Keys persisted on disk are trusted only if the table still holds the same
+    number of rows; otherwise (e.g. the tables were reset) they are re-read.
+    """
+    if table in _verified:
+        return
+
+    if not _known:
+        _load_from_disk()
+
+    if table in _known:
+        cur.execute(f"SELECT count(*) FROM {table};")
+        if cur.fetchone()[0] == len(_known[table]):
+            _verified.add(table)
+            return
+        logging.info(f"Dimension cache for {table} is stale, reloading from database")
+
+    cur.execute(f"SELECT {key} FROM {table};")
+    _known[table] = {row[0] for row in cur.fetchall()}
+    _verified.add(table)
+    logging.info(f"Dimension cache warmed: {len(_known[table])} {table} keys")
+
+
+def filter_unseen(cur, table: str, rows: List[Dict], key: str) -> Tuple[List[Dict], int]:
+    """
+    Drop dimension rows whose key is already known to exist.
+
+    Returns:
+        (rows still to send, number of cache hits)
+    """
+    with _lock:
+        _warm(cur, table, key)
+        known = _known[table]
+        unseen = [r for r in rows if r[key] not in known]
+        hits = len(rows) - len(unseen)
+        _stats["hits"] += hits
+        _stats["misses"] += len(unseen)
+
+    logging.debug(f"Dimension cache {table}: hits={hits} misses={len(unseen)}")
+    return unseen, hits
+
+
+def remember(table: str, keys: List) -> None:
+    """Add keys after they are committed (inserted or found to exist)."""
+    if not keys:
+        return
+    with _lock:
+        before = len(_known.setdefault(table, set()))
+        _known[table].update(keys)
+        if len(_known[table]) != before:
+            _persist()
+
+
+def invalidate() -> None:
+    """Forget every key (e.g. after a foreign-key error showed the cache was stale)."""
+    with _lock:
+        _known.clear()
+        _verified.clear()
+        if _cache_path and os.path.exists(_cache_path):
+            os.remove(_cache_path)
+    logging.warning("Dimension cache invalidated")
+
+
+def get_stats() -> Dict[str, int]:
+    return dict(_stats)
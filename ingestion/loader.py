@@ -1,10 +1,34 @@
+import csv
+import io
 import json
+import logging
 import math
-from typing import List, Dict, Any, Tuple
-from datetime import datetime
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from operator import attrgetter, itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from datetime import date, datetime
 
+import numpy as np
+import pandas as pd
+from psycopg2 import errors
 from psycopg2.extras import execute_batch
-from db.connection import connect_to_db
+from db.connection import get_connection, get_pool
+from db.partitions import ensure_partitions, is_partitioned
+from ingestion import aggregates, dimension_cache, metrics
+from ingestion.validate import frame_to_records
 
 # --- DATABASE COLUMN DEFINITIONS ---
 
@@ -50,8 +74,48 @@ MEASUREMENTS_COLS = [
     "time_period",
     "start_date",
     "data_value",
+    "message",
+    "run_id",
 ]
 
+
+
+class Measurement(NamedTuple):
+    """
+    One measurements row, fields in MEASUREMENTS_COLS order.
+
+    A tuple: no per-row dict, and it goes to COPY / execute_batch as is.
+    Values are plain Python objects with None for missing (never NaN).
+    """
+
+    unique_id: int
+    indicator_id: int
+    geo_join_id: Optional[int]
+    time_period: Optional[str]
+    start_date: Optional[date]
+    data_value: Optional[float]
+    message: Optional[str]
+    run_id: int
+
+
+class RejectRow(NamedTuple):
+    """One ingestion_rejects row, fields in INGESTION_REJECTS_COLS order."""
+
+    run_id: int
+    raw_record: str
+    error_reason: str
+    source_file: str
+
+
+# A row for write_rows: a dict keyed by column, or a NamedTuple such as Measurement
+Row = Union[Dict, Tuple]
+
+# Load strategies selectable via database.load_strategy
+LOAD_STRATEGIES = ("batch", "copy")
+
+# How measurements are split across connections (database.partition_by)
+PARTITION_METHODS = ("hash", "range")
+
 INSERT_INDICATORS = """
 INSERT INTO indicators (indicator_id, name, measure, measure_info)
 VALUES (%(indicator_id)s, %(name)s, %(measure)s, %(measure_info)s)
@@ -114,14 +178,15 @@ def sanitize_for_json(value: Any) -> Any:
 
 
 def build_insert_sql(
-    table_name: str, columns: List[str], conflict_target: str = None
+    table_name: str, columns: List[str], conflict_target: str = None, positional: bool = False
 ) -> str:
     """
     Builds a dynamic SQL insert statement.
     If conflict_target is provided, adds 'ON CONFLICT DO NOTHING'.
+    positional=True takes value tuples (%s) instead of dicts (%(col)s).
     """
     cols = ", ".join(columns)
-    vals = ", ".join([f"%({c})s" for c in columns])
+    vals = ", ".join(["%s" if positional else f"%({c})s" for c in columns])
 
     sql = f"INSERT INTO {table_name} ({cols}) VALUES ({vals})"
 
@@ -131,13 +196,134 @@ def build_insert_sql(
     return sql
 
 
+def build_insert_select_sql(
+    table_name: str, staging_table: str, columns: List[str], conflict_target: str = None
+) -> str:
+    """
+    Builds a set-based INSERT ... SELECT from a staging table.
+    Rows are inserted in staging order, so the first occurrence of a key wins,
+    as with row-by-row inserts.
+    """
+    cols = ", ".join(columns)
+
+    sql = (
+        f"INSERT INTO {table_name} ({cols}) "
+        f"SELECT {cols} FROM {staging_table} ORDER BY stage_seq"
+    )
+
+    if conflict_target:
+        sql += f" ON CONFLICT ({conflict_target}) DO NOTHING"
+
+    return sql
+
+
+def _is_tuple_row(row: Row) -> bool:
+    return isinstance(row, tuple) and hasattr(row, "_fields")
+
+
+def _field_getter(row: Row, key: str) -> Callable[[Row], Any]:
+    return attrgetter(key) if _is_tuple_row(row) else itemgetter(key)
+
+
+def row_values(rows: Sequence[Row], columns: List[str]) -> Iterable[Sequence]:
+    """
+    Values of each row in columns order.
+
+    NamedTuple rows whose fields are exactly columns pass through untouched;
+    dict rows are looked up by name, with NaN turned into None.
+    """
+    if not rows:
+        return []
+    first = rows[0]
+    if _is_tuple_row(first):
+        if list(first._fields) == list(columns):
+            return rows
+        positions = [first._fields.index(c) for c in columns]
+        return ([r[i] for i in positions] for r in rows)
+    return ([sanitize_for_json(r.get(c)) for c in columns] for r in rows)
+
+
+def copy_rows(cur, table_name: str, columns: List[str], rows: Sequence[Row]) -> int:
+    """Stream rows (dicts or NamedTuples) into a table with COPY FROM STDIN (CSV format)."""
+    buf = io.StringIO()
+    # None and NaN become unquoted empty fields, which COPY reads as NULL
+    csv.writer(buf).writerows(row_values(rows, columns))
+    buf.seek(0)
+
+    cols = ", ".join(columns)
+    cur.copy_expert(f"COPY {table_name} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+    return len(rows)
+
+
+def write_rows(
+    cur,
+    table_name: str,
+    columns: List[str],
+    rows: Sequence[Row],
+    conflict_target: Optional[str] = None,
+    load_strategy: str = "batch",
+    batch_size: int = 500,
+) -> Dict[str, Optional[int]]:
+    """
+    Write rows to a table with the chosen strategy.
+
+    batch: execute_batch of per-row INSERT ... ON CONFLICT DO NOTHING
+    copy:  COPY into a temp staging table, then one INSERT ... SELECT ... ON CONFLICT
+
+    Returns:
+        {"sent": n, "inserted": n, "skipped": n}; inserted/skipped are None
+        for the batch strategy, which cannot tell them apart.
+    """
+    if not rows:
+        return {"sent": 0, "inserted": 0, "skipped": 0}
+
+    if load_strategy == "batch":
+        if _is_tuple_row(rows[0]):
+            sql = build_insert_sql(table_name, columns, conflict_target, positional=True)
+            execute_batch(cur, sql, list(row_values(rows, columns)), page_size=batch_size)
+        else:
+            sql = build_insert_sql(table_name, columns, conflict_target=conflict_target)
+            execute_batch(cur, sql, rows, page_size=batch_size)
+        return {"sent": len(rows), "inserted": None, "skipped": None}
+
+    if load_strategy != "copy":
+        raise ValueError(
+            f"Unknown load strategy '{load_strategy}', expected one of {LOAD_STRATEGIES}"
+        )
+
+    staging_table = f"stage_{table_name}"
+    cur.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging_table} "
+        f"(LIKE {table_name} INCLUDING DEFAULTS, stage_seq BIGSERIAL) ON COMMIT DROP;"
+    )
+    copy_rows(cur, staging_table, columns, rows)
+    cur.execute(
+        build_insert_select_sql(table_name, staging_table, columns, conflict_target)
+    )
+    inserted = cur.rowcount
+    cur.execute(f"TRUNCATE {staging_table};")
+
+    return {"sent": len(rows), "inserted": inserted, "skipped": len(rows) - inserted}
+
+
 def extract_dimension_data(
-    records: List[Dict], key_map: Dict[str, str], unique_key: str
+    records: Union[List[Dict], pd.DataFrame], key_map: Dict[str, str], unique_key: str
 ) -> List[Dict]:
     """
     Extracts unique dimension data (e.g., unique Indicators) from the raw list of records.
     key_map: maps DB column name -> CSV/Source key name
+
+    A validated DataFrame is deduplicated with drop_duplicates() instead of
+    the per-record loop; the first row per key wins either way.
     """
+    if isinstance(records, pd.DataFrame):
+        source_key = key_map[unique_key]
+        ids = records[source_key]
+        dims = records.loc[ids.notna() & ids.astype(bool), list(key_map.values())]
+        dims = dims.drop_duplicates(subset=source_key, keep="first")
+        dims = pd.DataFrame({db_col: dims[src] for db_col, src in key_map.items()})
+        return frame_to_records(dims)
+
     seen = set()
     unique_rows = []
 
@@ -155,17 +341,376 @@ def extract_dimension_data(
 
     return unique_rows
 
-def map_measurement(record: Dict, run_id: int) -> Dict:
-    return {
-        "unique_id": record.get("unique_id"),
-        "indicator_id": record.get("indicator_id"),
-        "geo_join_id": record.get("geo_join_id"),
-        "time_period": record.get("time_period"),
-        "start_date": record.get("start_date"),
-        "data_value": record.get("data_value"),
-        "message": record.get("message"),
-        "run_id": run_id,
-    }
+def map_measurement(record: Dict, run_id: int) -> Measurement:
+    """Measurement row of one validated record dict (use ._asdict() for a dict)."""
+    return Measurement(
+        record.get("unique_id"),
+        record.get("indicator_id"),
+        sanitize_for_json(record.get("geo_join_id")),
+        sanitize_for_json(record.get("time_period")),
+        record.get("start_date"),
+        sanitize_for_json(record.get("data_value")),
+        sanitize_for_json(record.get("message")),
+        run_id,
+    )
+
+
+def _column_values(df: pd.DataFrame, col: str) -> List[Any]:
+    """Python values of one column (None for missing, datetimes as dates)."""
+    if col not in df.columns:
+        return [None] * len(df)
+    series = df[col]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # One date object per distinct day, shared by its rows
+        codes, days = pd.factorize(series)
+        dates = np.array([d.date() for d in days] + [None], dtype=object)
+        return dates[codes].tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def frame_to_measurements(df: pd.DataFrame, run_id: int) -> List[Measurement]:
+    """
+    Measurement rows of a validated DataFrame, built a column at a time.
+
+    Same values as map_measurement over frame_to_records, without creating
+    any per-row dict.
+    """
+    columns = [_column_values(df, col) for col in Measurement._fields[:-1]]
+    columns.append([run_id] * len(df))
+    return list(map(Measurement._make, zip(*columns)))
+
+
+def partition_rows(
+    rows: List[Row],
+    replace_ids: Optional[List[int]],
+    partitions: int,
+    partition_by: str = "hash",
+    key: str = "unique_id",
+) -> List[Tuple[List[Row], List[int]]]:
+    """
+    Split fact rows into disjoint partitions by key.
+
+    hash:  key modulo the partition count (spreads rows evenly)
+    range: contiguous key ranges of about equal row counts (index locality)
+
+    replace_ids are assigned with the same rule, so a row and its outdated
+    version always land in the same partition. Empty partitions are dropped.
+    """
+    get_key = _field_getter(rows[0], key) if rows else itemgetter(key)
+
+    if partition_by == "hash":
+        def assign(k):
+            return hash(k) % partitions
+    elif partition_by == "range":
+        keys = sorted(map(get_key, rows))
+        bounds = [keys[len(keys) * i // partitions] for i in range(1, partitions)] if keys else []
+
+        def assign(k):
+            return bisect_right(bounds, k)
+    else:
+        raise ValueError(
+            f"Unknown partition method '{partition_by}', expected one of {PARTITION_METHODS}"
+        )
+
+    parts: List[Tuple[List[Row], List[int]]] = [([], []) for _ in range(partitions)]
+    for r in rows:
+        parts[assign(get_key(r))][0].append(r)
+    for k in replace_ids or []:
+        parts[assign(k)][1].append(k)
+
+    return [p for p in parts if p[0] or p[1]]
+
+
+def _write_measurement_partition(
+    conn,
+    rows: List[Row],
+    replace_ids: List[int],
+    measurements_table: str,
+    load_strategy: str,
+    batch_size: int,
+    conflict_target: str = "unique_id",
+) -> Dict[str, Optional[int]]:
+    """
+    Delete outdated rows and write one partition; the caller commits.
+
+    The counts include the transaction id as "xid": the xmin of the rows it
+    inserted, for the aggregates and for compensation once it committed.
+    """
+    cur = conn.cursor()
+    try:
+        replaced = 0
+        if replace_ids:
+            cur.execute(
+                f"DELETE FROM {measurements_table} WHERE unique_id = ANY(%s);",
+                (list(replace_ids),),
+            )
+            replaced = cur.rowcount
+
+        counts = write_rows(
+            cur,
+            measurements_table,
+            MEASUREMENTS_COLS,
+            rows,
+            conflict_target=conflict_target,
+            load_strategy=load_strategy,
+            batch_size=batch_size,
+        )
+        counts["replaced"] = replaced
+        counts["xid"] = aggregates.current_xid(cur)
+        return counts
+    finally:
+        cur.close()
+
+
+def load_measurement_partitions(
+    run_id: int,
+    measurements_data: List[Row],
+    replace_ids: Optional[List[int]],
+    partitions: int,
+    partition_by: str = "hash",
+    measurements_table: str = "measurements",
+    load_strategy: str = "batch",
+    batch_size: int = 500,
+    conflict_target: str = "unique_id",
+) -> Tuple[Dict[str, Optional[int]], List[int]]:
+    """
+    Load measurements as parallel partitions, one pooled connection each.
+
+    Every partition is written in its own transaction and nothing is
+    committed until all of them succeeded; an error rolls every partition
+    back. If a commit fails after others went through, the committed
+    partitions are compensated by deleting the rows they inserted (by
+    xmin; rows of earlier chunks of the same run stay), so
+    the chunk is either fully loaded or not at all. (Outdated rows deleted
+    for replace_ids are not restored; their row hashes are only saved after
+    a successful load, so the next run reloads them.)
+
+    With aggregates enabled they are updated once every partition committed
+    (partitions would otherwise wait on each other's aggregate row locks);
+    if that fails, the partitions are compensated as well.
+
+    Returns:
+        (summed {"sent", "inserted", "skipped", "replaced"} counts,
+        transaction ids of the partitions, for compensating them later)
+    """
+    parts = partition_rows(measurements_data, replace_ids, partitions, partition_by)
+    committed: List[int] = []
+    use_aggregates = aggregates.is_enabled() and bool(parts)
+    stale: List[aggregates.Group] = []
+
+    try:
+        with ExitStack() as stack:
+            conns = [stack.enter_context(get_connection()) for _ in parts]
+            if use_aggregates and replace_ids:
+                # Groups of the outdated rows, before the partitions delete them
+                cur = conns[0].cursor()
+                try:
+                    stale = aggregates.affected_groups(cur, measurements_table, replace_ids)
+                finally:
+                    cur.close()
+
+            with ThreadPoolExecutor(
+                max_workers=len(parts) or 1, thread_name_prefix="load-partition"
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        _write_measurement_partition,
+                        conn,
+                        rows,
+                        ids,
+                        measurements_table,
+                        load_strategy,
+                        batch_size,
+                        conflict_target,
+                    )
+                    for conn, (rows, ids) in zip(conns, parts)
+                ]
+                # The pool waits for every partition before an error propagates
+                results = [f.result() for f in futures]
+
+            for conn, counts in zip(conns, results):
+                conn.commit()
+                committed.append(counts["xid"])
+
+            if use_aggregates:
+                cur = conns[0].cursor()
+                try:
+                    aggregates.update_aggregates(
+                        cur,
+                        measurements_table,
+                        [_field_getter(r, "unique_id")(r) for r in measurements_data],
+                        committed,
+                        stale,
+                    )
+                finally:
+                    cur.close()
+                conns[0].commit()
+
+    except Exception:
+        if committed:
+            ids = [_field_getter(r, "unique_id")(r) for r in measurements_data]
+            _compensate_partitions(run_id, measurements_table, ids, committed, stale)
+        raise
+
+    totals: Dict[str, Optional[int]] = {}
+    for key in ("sent", "inserted", "skipped", "replaced"):
+        values = [c[key] for c in results]
+        totals[key] = None if None in values else sum(values)
+    logging.debug(
+        f"Loaded {measurements_table} in {len(parts)} partitions ({partition_by}): "
+        f"{[c['sent'] for c in results]}"
+    )
+    return totals, committed
+
+
+def _compensate_partitions(
+    run_id: int,
+    measurements_table: str,
+    unique_ids: List[int],
+    xids: Sequence[int],
+    stale: Sequence[aggregates.Group] = (),
+) -> None:
+    """
+    Delete the rows with these unique_ids that the committed partition
+    transactions xids inserted. Rows an earlier chunk of the same run
+    stored have another xmin and stay.
+
+    With aggregates enabled, their groups and the stale groups of replaced
+    rows are recomputed.
+    """
+    logging.warning(
+        f"Partitioned load of run_id={run_id} failed after {len(xids)} commits; "
+        f"removing the rows they inserted"
+    )
+    try:
+        with get_connection() as conn:
+            cur = conn.cursor()
+            try:
+                groups = list(stale)
+                if aggregates.is_enabled():
+                    groups += aggregates.affected_groups(
+                        cur, measurements_table, unique_ids, run_id=run_id
+                    )
+                # xmin guard: rows that already existed were skipped, not inserted
+                cur.execute(
+                    f"DELETE FROM {measurements_table} "
+                    "WHERE unique_id = ANY(%s) AND xmin::text::bigint = ANY(%s);",
+                    (list(unique_ids), list(xids)),
+                )
+                if aggregates.is_enabled():
+                    aggregates.recompute_groups(cur, measurements_table, groups)
+                conn.commit()
+            finally:
+                cur.close()
+    except Exception as e:
+        logging.exception(f"Compensation for run_id={run_id} failed: {e}")
+
+
+# -----------------------
+# Rejects
+# -----------------------
+
+UNKNOWN_REJECT_REASON = "Unknown validation error"
+
+
+def serialize_rejects(rejected_df: pd.DataFrame) -> List[str]:
+    """
+    JSON text of every rejected row (without error_reason), in one pass.
+
+    Uses DataFrame.to_json: NaN becomes null, dates ISO strings, and floats
+    keep 15 significant digits.
+    """
+    if rejected_df.empty:
+        return []
+    raw = rejected_df.drop(columns=["error_reason"], errors="ignore")
+    text = raw.to_json(
+        orient="records", lines=True, date_format="iso", double_precision=15, default_handler=str
+    )
+    # Newlines inside values are escaped, so every line is one record
+    return text.splitlines()
+
+
+def build_reject_rows(
+    rejected_records: Union[List[Dict], pd.DataFrame], run_id: int, source_file: str
+) -> List[RejectRow]:
+    """ingestion_rejects rows of a rejected DataFrame (or of reject dicts, one by one)."""
+    if isinstance(rejected_records, pd.DataFrame):
+        if "error_reason" in rejected_records.columns:
+            reasons = rejected_records["error_reason"].fillna(UNKNOWN_REJECT_REASON).tolist()
+        else:
+            reasons = [UNKNOWN_REJECT_REASON] * len(rejected_records)
+        return [
+            RejectRow(run_id, raw, reason, source_file)
+            for raw, reason in zip(serialize_rejects(rejected_records), reasons)
+        ]
+
+    rows = []
+    for r in rejected_records:
+        sanitized = sanitize_for_json(r)
+        error_reason = sanitized.pop("error_reason", UNKNOWN_REJECT_REASON)
+        # default=str handles dates
+        rows.append(RejectRow(run_id, json.dumps(sanitized, default=str), error_reason, source_file))
+    return rows
+
+
+def _copy_text(value: Any) -> str:
+    """A value as a COPY text-format field (\\N is NULL)."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_reject_rows(cur, table_name: str, rows: List[RejectRow]) -> int:
+    """
+    Stream reject rows into a table with COPY FROM STDIN (text format).
+
+    Text format only escapes backslashes and control characters, where CSV
+    would double every quote of the JSON; reasons repeat, so each distinct
+    one is escaped once.
+    """
+    reasons: Dict[str, str] = {}
+    source_files: Dict[str, str] = {}
+
+    def escaped(cache: Dict[str, str], value: str) -> str:
+        if value not in cache:
+            cache[value] = _copy_text(value)
+        return cache[value]
+
+    buf = io.StringIO()
+    buf.writelines(
+        f"{r.run_id}\t{_copy_text(r.raw_record)}\t{escaped(reasons, r.error_reason)}"
+        f"\t{escaped(source_files, r.source_file)}\n"
+        for r in rows
+    )
+    buf.seek(0)
+
+    cols = ", ".join(INGESTION_REJECTS_COLS)
+    cur.copy_expert(f"COPY {table_name} ({cols}) FROM STDIN", buf)
+    return len(rows)
+
+
+def cap_rejects(rejected_df: pd.DataFrame, cap: Optional[int], stored: Dict[str, int]) -> pd.DataFrame:
+    """
+    Keep at most cap rejected rows per error_reason over a run.
+
+    stored counts the rows already kept per reason in earlier chunks and is
+    updated in place. cap None keeps everything.
+    """
+    if cap is None or rejected_df.empty:
+        return rejected_df
+
+    reasons = rejected_df["error_reason"].fillna(UNKNOWN_REJECT_REASON)
+    earlier = reasons.map(stored).fillna(0)
+    kept = rejected_df.loc[(reasons.groupby(reasons, sort=False).cumcount() + earlier < cap).to_numpy()]
+    for reason, n in kept["error_reason"].fillna(UNKNOWN_REJECT_REASON).value_counts().items():
+        stored[reason] = stored.get(reason, 0) + int(n)
+    return kept
 
 
 # -----------------------
@@ -174,8 +719,8 @@ def map_measurement(record: Dict, run_id: int) -> Dict:
 
 def load_records(
     run_id: int,
-    valid_records: List[Dict],
-    rejected_records: List[Dict],
+    valid_records: Union[List[Dict], pd.DataFrame],
+    rejected_records: Union[List[Dict], pd.DataFrame],
     source_file: str,
     ingestion_runs_table: str = "ingestion_runs",
     ingestion_reject_table: str = "ingestion_rejects",
@@ -183,107 +728,235 @@ def load_records(
     indicators_table: str = "indicators",
     geographic_table: str = "geographic",
     batch_size: int = 500,
-) -> None:
-
-    conn = connect_to_db()
-    cur = conn.cursor()
-
-    try:
-        # 1. LOG THE RUN (Get run_id)
-        # ---------------------------------------------------------
-
-        # 2. PREPARE & LOAD DIMENSIONS (Indicators)
-        # ---------------------------------------------------------
-        # Mapping: DB Column -> Source CSV Header
-        indicator_map = {
-            "indicator_id": "indicator_id",
-            "name": "name",
-            "measure": "measure",
-            "measure_info": "measure_info",
-        }
-        unique_indicators = extract_dimension_data(
-            valid_records, indicator_map, "indicator_id"
-        )
-
-        if unique_indicators:
-            sql = build_insert_sql(
-                indicators_table, INDICATORS_COLS, conflict_target="indicator_id"
-            )
-            execute_batch(cur, sql, unique_indicators, page_size=batch_size)
-
-        # 3. PREPARE & LOAD DIMENSIONS (Geographic)
-        # ---------------------------------------------------------
-        geo_map = {
-            "geo_join_id": "geo_join_id",
-            "geo_type_name": "geo_type_name",
-            "geo_place_name": "geo_place_name",
-        }
-        unique_geo = extract_dimension_data(valid_records, geo_map, "geo_join_id")
-
-        if unique_geo:
-            sql = build_insert_sql(
-                geographic_table, GEOGRAPHIC_COLS, conflict_target="geo_join_id"
-            )
-            execute_batch(cur, sql, unique_geo, page_size=batch_size)
-
-        # 4. LOAD MEASUREMENTS (Facts)
-        # ---------------------------------------------------------
-        # 4. LOAD MEASUREMENTS (Facts)
-        # ---------------------------------------------------------
-        measurements_data = []
-        for r in valid_records:
-            measurements_data.append(
-                {
-                    "unique_id": r.get("unique_id"),
-                    "indicator_id": r.get("indicator_id"),
-                    "geo_join_id": r.get("geo_join_id"),
-                    "time_period": r.get("time_period"),
-                    "start_date": r.get("start_date"),
-                    "data_value": r.get("data_value"),
-                    "message": r.get("message"),  
-                    "run_id": run_id              
-                }
-            )
+    load_strategy: str = "batch",
+    replace_ids: Optional[List[int]] = None,
+    partitions: int = 1,
+    partition_by: str = "hash",
+    date_partitions: Optional[str] = None,
+) -> Dict[str, Dict[str, Optional[int]]]:
+    """
+    Load one batch of validated records and rejects in a single transaction.
+
+    valid_records may be a validated DataFrame; dimension rows are then
+    extracted from it with vectorized deduplication and measurement rows
+    are built column-wise (frame_to_measurements), with no per-row dicts.
+    rejected_records may be the rejected DataFrame, serialized in one pass
+    (see serialize_rejects).
+
+    replace_ids: unique_ids whose stored measurements are outdated; they are
+    deleted in the same transaction so the new values are inserted.
+
+    partitions > 1: dimensions are committed first, then the measurements
+    are split by unique_id (see partition_rows) and loaded in parallel over
+    their own pooled connections (see load_measurement_partitions). Rejects
+    are committed only after every partition did, so a failed load leaves
+    none behind.
+
+    With aggregates enabled (ingestion.aggregates), the measurement_aggregates
+    groups of the rows actually inserted are updated in the same transaction.
+
+    date_partitions ("year" or "month"): if measurements is range-partitioned
+    on start_date, the partitions this batch needs are created first (see
+    db.partitions.ensure_partitions). Its primary key then is
+    (unique_id, start_date), which becomes the conflict target.
+
+    Returns:
+        Per-table {"sent", "inserted", "skipped"} counts (see write_rows);
+        measurements also reports how many outdated rows were "replaced",
+        and dimensions how many rows the key cache kept from being sent ("cached").
+    """
 
-        if measurements_data:
-            # Note: unique_id is likely the PK, so we might need conflict handling here too
-            # depending on if you are reloading the same file.
-            sql = build_insert_sql(
-                measurements_table, MEASUREMENTS_COLS, conflict_target="unique_id"
+    if isinstance(valid_records, pd.DataFrame):
+        measurements_data = frame_to_measurements(valid_records, run_id)
+    else:
+        measurements_data = [map_measurement(r, run_id) for r in valid_records]
+
+    if partitions > 1:
+        # Every partition borrows a connection while this one stays checked out
+        partitions = min(partitions, get_pool().maxconn - 1)
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+        counts: Dict[str, Dict[str, Optional[int]]] = {}
+        # Transactions of measurement partitions that committed
+        partition_xids: List[int] = []
+
+        try:
+            # 1. LOG THE RUN (Get run_id)
+            # ---------------------------------------------------------
+
+            # 2. PREPARE & LOAD DIMENSIONS (Indicators)
+            # ---------------------------------------------------------
+            # Mapping: DB Column -> Source CSV Header
+            indicator_map = {
+                "indicator_id": "indicator_id",
+                "name": "name",
+                "measure": "measure",
+                "measure_info": "measure_info",
+            }
+            unique_indicators = extract_dimension_data(
+                valid_records, indicator_map, "indicator_id"
             )
-            execute_batch(cur, sql, measurements_data, page_size=batch_size)
-
-        # 5. LOAD REJECTS
-        # ---------------------------------------------------------
-        reject_rows = []
-        for r in rejected_records:
-            sanitized = sanitize_for_json(r)
-            # Remove error_reason from the raw dump to keep it clean, if desired
-            error_reason = sanitized.pop("error_reason", "Unknown validation error")
-
-            reject_rows.append(
-                {
-                    "run_id": run_id,
-                    "raw_record": json.dumps(
-                        sanitized, default=str
-                    ),  # default=str handles dates
-                    "error_reason": error_reason,
-                    "source_file": source_file,
+            # Key order gives concurrent loaders the same lock order (no deadlocks)
+            unique_indicators.sort(key=lambda r: r["indicator_id"])
+            indicator_hits = 0
+            if dimension_cache.is_enabled():
+                unique_indicators, indicator_hits = dimension_cache.filter_unseen(
+                    cur, indicators_table, unique_indicators, "indicator_id"
+                )
+
+            with metrics.timed("load_indicators", len(unique_indicators)):
+                counts[indicators_table] = write_rows(
+                    cur,
+                    indicators_table,
+                    INDICATORS_COLS,
+                    unique_indicators,
+                    conflict_target="indicator_id",
+                    load_strategy=load_strategy,
+                    batch_size=batch_size,
+                )
+            counts[indicators_table]["cached"] = indicator_hits
+
+            # 3. PREPARE & LOAD DIMENSIONS (Geographic)
+            # ---------------------------------------------------------
+            geo_map = {
+                "geo_join_id": "geo_join_id",
+                "geo_type_name": "geo_type_name",
+                "geo_place_name": "geo_place_name",
+            }
+            unique_geo = extract_dimension_data(valid_records, geo_map, "geo_join_id")
+            unique_geo.sort(key=lambda r: r["geo_join_id"])
+            geo_hits = 0
+            if dimension_cache.is_enabled():
+                unique_geo, geo_hits = dimension_cache.filter_unseen(
+                    cur, geographic_table, unique_geo, "geo_join_id"
+                )
+
+            with metrics.timed("load_geographic", len(unique_geo)):
+                counts[geographic_table] = write_rows(
+                    cur,
+                    geographic_table,
+                    GEOGRAPHIC_COLS,
+                    unique_geo,
+                    conflict_target="geo_join_id",
+                    load_strategy=load_strategy,
+                    batch_size=batch_size,
+                )
+            counts[geographic_table]["cached"] = geo_hits
+
+            if partitions > 1:
+                # Partition connections only see committed dimension rows (FKs);
+                # rejects are written below and committed with the run's outcome
+                conn.commit()
+
+            # 4. LOAD REJECTS
+            # ---------------------------------------------------------
+            with metrics.timed("load_rejects", len(rejected_records)):
+                reject_rows = build_reject_rows(rejected_records, run_id, source_file)
+
+                if reject_rows:
+                    if load_strategy == "copy":
+                        copy_reject_rows(cur, ingestion_reject_table, reject_rows)
+                    else:
+                        sql = build_insert_sql(
+                            ingestion_reject_table, INGESTION_REJECTS_COLS, positional=True
+                        )
+                        execute_batch(cur, sql, reject_rows, page_size=batch_size)
+                counts[ingestion_reject_table] = {
+                    "sent": len(reject_rows),
+                    "inserted": len(reject_rows),
+                    "skipped": 0,
                 }
-            )
-
-        rejects_inserted = 0
-        if reject_rows:
-            sql = build_insert_sql(ingestion_reject_table, INGESTION_REJECTS_COLS)
-            execute_batch(cur, sql, reject_rows, page_size=batch_size)
-
-        conn.commit()
-        print("Batch load committed successfully.")
 
-    except Exception as e:
-        conn.rollback()
-        print(f"Error during loading: {e}")
-        raise
-    finally:
-        cur.close()
-        conn.close()
+            # 5. LOAD MEASUREMENTS (Facts)
+            # ---------------------------------------------------------
+            conflict_target = "unique_id"
+            if date_partitions and is_partitioned(cur, measurements_table):
+                ensure_partitions(
+                    measurements_table,
+                    {m.start_date for m in measurements_data},
+                    date_partitions,
+                )
+                conflict_target = "unique_id, start_date"
+
+            with metrics.timed("load_measurements", len(measurements_data)):
+                if partitions > 1:
+                    counts[measurements_table], partition_xids = load_measurement_partitions(
+                        run_id,
+                        measurements_data,
+                        replace_ids,
+                        partitions,
+                        partition_by=partition_by,
+                        measurements_table=measurements_table,
+                        load_strategy=load_strategy,
+                        batch_size=batch_size,
+                        conflict_target=conflict_target,
+                    )
+                else:
+                    replaced = 0
+                    stale: List[aggregates.Group] = []
+                    if replace_ids:
+                        if aggregates.is_enabled():
+                            stale = aggregates.affected_groups(cur, measurements_table, replace_ids)
+                        cur.execute(
+                            f"DELETE FROM {measurements_table} WHERE unique_id = ANY(%s);",
+                            (list(replace_ids),),
+                        )
+                        replaced = cur.rowcount
+
+                    # unique_id is the PK, so reloading the same file skips existing rows
+                    counts[measurements_table] = write_rows(
+                        cur,
+                        measurements_table,
+                        MEASUREMENTS_COLS,
+                        measurements_data,
+                        conflict_target=conflict_target,
+                        load_strategy=load_strategy,
+                        batch_size=batch_size,
+                    )
+                    counts[measurements_table]["replaced"] = replaced
+
+                    if aggregates.is_enabled():
+                        # Only rows this transaction inserted; conflicts were skipped
+                        aggregates.update_aggregates(
+                            cur,
+                            measurements_table,
+                            [m.unique_id for m in measurements_data],
+                            [aggregates.current_xid(cur)],
+                            stale,
+                        )
+
+            conn.commit()
+            print("Batch load committed successfully.")
+
+            if dimension_cache.is_enabled():
+                # Sent keys now exist, whether inserted or skipped as conflicts
+                dimension_cache.remember(
+                    indicators_table, [r["indicator_id"] for r in unique_indicators]
+                )
+                dimension_cache.remember(geographic_table, [r["geo_join_id"] for r in unique_geo])
+
+            for table, c in counts.items():
+                logging.debug(
+                    f"Loaded {table} ({load_strategy}): sent={c['sent']} "
+                    f"inserted={c['inserted']} skipped={c['skipped']}"
+                )
+            return counts
+
+        except Exception as e:
+            conn.rollback()
+            print(f"Error during loading: {e}")
+            if partition_xids:
+                # The rejects did not commit; take the measurements back out too
+                _compensate_partitions(
+                    run_id,
+                    measurements_table,
+                    [m.unique_id for m in measurements_data],
+                    partition_xids,
+                )
+            if isinstance(e, errors.ForeignKeyViolation) and dimension_cache.is_enabled():
+                # A cached key no longer exists (e.g. tables were reset)
+                dimension_cache.invalidate()
+            raise
+        finally:
+            cur.close()
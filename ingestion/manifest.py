@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from db.connection import get_connection
+
+# Manifest columns written per source file
+MANIFEST_COLS = [
+    "source_path",
+    "source_file",
+    "file_size",
+    "file_mtime",
+    "content_hash",
+    "row_count",
+    "last_run_id",
+]
+
+UPSERT_MANIFEST = """
+INSERT INTO ingestion_manifest (
+    source_path, source_file, file_size, file_mtime, content_hash, row_count, last_run_id
+)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT (source_path) DO UPDATE SET
+    source_file = EXCLUDED.source_file,
+    file_size = EXCLUDED.file_size,
+    file_mtime = EXCLUDED.file_mtime,
+    content_hash = EXCLUDED.content_hash,
+    row_count = COALESCE(EXCLUDED.row_count, ingestion_manifest.row_count),
+    last_run_id = COALESCE(EXCLUDED.last_run_id, ingestion_manifest.last_run_id),
+    updated_at = CURRENT_TIMESTAMP;
+"""
+
+UPSERT_ROW_HASHES = """
+INSERT INTO ingestion_row_hashes (source_path, unique_id, row_hash, run_id)
+VALUES %s
+ON CONFLICT (source_path, unique_id) DO UPDATE SET
+    row_hash = EXCLUDED.row_hash,
+    run_id = EXCLUDED.run_id;
+"""
+
+
+# -----------------------
+# File-level fingerprints
+# -----------------------
+
+def compute_content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of the file contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_manifest_entry(source_path: str) -> Optional[Dict]:
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"SELECT {', '.join(MANIFEST_COLS)} FROM ingestion_manifest WHERE source_path = %s;",
+                (source_path,),
+            )
+            row = cur.fetchone()
+            conn.commit()
+            return dict(zip(MANIFEST_COLS, row)) if row else None
+        finally:
+            cur.close()
+
+
+def check_source_file(source_path: str) -> Tuple[bool, Dict]:
+    """
+    Compare a source file against its manifest entry.
+
+    Size and mtime are checked first; the content is only hashed when they
+    differ, so an untouched file costs one stat() call.
+
+    Returns:
+        (unchanged, fingerprint) where fingerprint holds file_size,
+        file_mtime, content_hash and the previous row_count
+    """
+    stat = os.stat(source_path)
+    fingerprint = {
+        "file_size": stat.st_size,
+        "file_mtime": stat.st_mtime,
+        "content_hash": None,
+        "row_count": None,
+    }
+
+    entry = get_manifest_entry(source_path)
+    if entry:
+        fingerprint["row_count"] = entry["row_count"]
+        if entry["file_size"] == stat.st_size and entry["file_mtime"] == stat.st_mtime:
+            fingerprint["content_hash"] = entry["content_hash"]
+            return True, fingerprint
+
+    fingerprint["content_hash"] = compute_content_hash(source_path)
+    unchanged = bool(entry) and entry["content_hash"] == fingerprint["content_hash"]
+    return unchanged, fingerprint
+
+
+def update_manifest(
+    source_path: str,
+    fingerprint: Dict,
+    run_id: Optional[int] = None,
+    row_count: Optional[int] = None,
+) -> None:
+    """Record the file as ingested; call only after a successful run."""
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                UPSERT_MANIFEST,
+                (
+                    source_path,
+                    os.path.basename(source_path),
+                    fingerprint["file_size"],
+                    fingerprint["file_mtime"],
+                    fingerprint["content_hash"],
+                    row_count,
+                    run_id,
+                ),
+            )
+            conn.commit()
+        finally:
+            cur.close()
+
+
+# -----------------------
+# Row-level hashes
+# -----------------------
+
+def compute_row_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    64-bit content hash per row (as signed int64 for a BIGINT column).
+
+    Values are hashed as strings so that dtype differences between runs
+    (e.g. an all-empty column read as float vs object) do not count as changes.
+    """
+    cols = sorted(df.columns)
+    as_text = df[cols].astype(object).where(df[cols].notna(), None).astype(str)
+    hashes = pd.util.hash_pandas_object(as_text, index=False)
+    return pd.Series(hashes.to_numpy().view(np.int64), index=df.index)
+
+
+def filter_changed_rows(
+    source_path: str, valid_df: pd.DataFrame, key: str = "unique_id"
+) -> Tuple[pd.DataFrame, List[int], pd.Series]:
+    """
+    Keep only rows that are new or whose content changed since the last run.
+
+    Returns:
+        changed_df: rows to load
+        replace_ids: keys of modified rows (already loaded with older values)
+        hashes: row hashes of changed_df, for save_row_hashes after the load
+    """
+    if valid_df.empty:
+        return valid_df, [], pd.Series(dtype="int64")
+
+    hashes = compute_row_hashes(valid_df)
+    ids = valid_df[key].astype("int64")
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT unique_id, row_hash FROM ingestion_row_hashes "
+                "WHERE source_path = %s AND unique_id = ANY(%s);",
+                (source_path, ids.unique().tolist()),
+            )
+            stored = dict(cur.fetchall())
+            conn.commit()
+        finally:
+            cur.close()
+
+    # object dtype keeps the 64-bit hashes exact (a float column would round them)
+    previous = pd.Series([stored.get(i) for i in ids.tolist()], index=ids.index, dtype=object)
+    is_new = previous.isna()
+    is_modified = ~is_new & (previous != hashes.astype(object))
+    changed = (is_new | is_modified).to_numpy()
+
+    replace_ids = ids[is_modified].unique().tolist()
+    return valid_df.loc[changed], replace_ids, hashes.loc[changed]
+
+
+def save_row_hashes(
+    source_path: str, run_id: int, unique_ids: pd.Series, hashes: pd.Series
+) -> None:
+    """Upsert row hashes for loaded rows; the first row per key wins, as in the load."""
+    rows = pd.DataFrame({"unique_id": unique_ids.astype("int64"), "row_hash": hashes})
+    rows = rows.drop_duplicates(subset="unique_id", keep="first")
+    if rows.empty:
+        return
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            execute_values(
+                cur,
+                UPSERT_ROW_HASHES,
+                [
+                    (source_path, int(uid), int(h), run_id)
+                    for uid, h in zip(rows["unique_id"], rows["row_hash"])
+                ],
+                page_size=1000,
+            )
+            conn.commit()
+            logging.debug(f"Saved {len(rows)} row hashes for {source_path}")
+        finally:
+            cur.close()
@@ -0,0 +1,169 @@
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from psycopg2.extras import execute_values
+
+from db.connection import get_connection
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stages in pipeline order (summaries and the table follow this order)
+STAGES = (
+    "read",
+    "validate",
+    "dedup",
+    "load_indicators",
+    "load_geographic",
+    "load_measurements",
+    "load_rejects",
+)
+
+INSERT_RUN_METRICS = """
+INSERT INTO ingestion_run_metrics (
+    run_id, stage, calls, row_count, seconds, rows_per_sec, process_peak_rss_mb
+)
+VALUES %s
+ON CONFLICT (run_id, stage) DO UPDATE SET
+    calls = EXCLUDED.calls,
+    row_count = EXCLUDED.row_count,
+    seconds = EXCLUDED.seconds,
+    rows_per_sec = EXCLUDED.rows_per_sec,
+    process_peak_rss_mb = EXCLUDED.process_peak_rss_mb,
+    recorded_at = CURRENT_TIMESTAMP;
+"""
+
+# Process-wide totals for the run being ingested; ingest_file resets them.
+# Worker processes collect their own and hand a snapshot back (see merge).
+_stages: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+def process_peak_rss_mb() -> Optional[float]:
+    """
+    High-water resident set size of this process so far, in MB.
+
+    Process-wide, not per stage: recorded with each stage call, it stays at
+    the run's peak for every stage that finishes after it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def reset() -> None:
+    with _lock:
+        _stages.clear()
+
+
+def record(stage: str, seconds: float, rows: int = 0, calls: int = 1, peak: Optional[float] = None) -> None:
+    """Add one timed call of a stage (thread-safe)."""
+    peak = process_peak_rss_mb() if peak is None else peak
+    with _lock:
+        s = _stages.setdefault(
+            stage, {"calls": 0, "rows": 0, "seconds": 0.0, "process_peak_rss_mb": None}
+        )
+        s["calls"] += calls
+        s["rows"] += int(rows)
+        s["seconds"] += seconds
+        if peak is not None:
+            s["process_peak_rss_mb"] = max(s["process_peak_rss_mb"] or 0.0, peak)
+
+
+@contextmanager
+def timed(stage: str, rows: int = 0) -> Iterator[Dict]:
+    """
+    Time a `with` block as one call of stage.
+
+    The yielded dict's "rows" can be set inside the block when the row
+    count is only known afterwards. Failed calls are recorded too.
+    """
+    call = {"rows": rows}
+    start = time.perf_counter()
+    try:
+        yield call
+    finally:
+        record(stage, time.perf_counter() - start, call["rows"])
+
+
+def snapshot() -> Dict[str, Dict]:
+    """Copy of the current totals, with rows_per_sec, in stage order."""
+    with _lock:
+        stages = {k: dict(v) for k, v in _stages.items()}
+
+    ordered = [s for s in STAGES if s in stages] + sorted(set(stages) - set(STAGES))
+    out = {}
+    for stage in ordered:
+        s = stages[stage]
+        s["rows_per_sec"] = s["rows"] / s["seconds"] if s["seconds"] else None
+        out[stage] = s
+    return out
+
+
+def merge(stages: Dict[str, Dict]) -> None:
+    """Add a snapshot taken in a worker process to this process's totals."""
+    for stage, s in stages.items():
+        record(stage, s["seconds"], s["rows"], calls=s["calls"], peak=s["process_peak_rss_mb"])
+
+
+def log_summary(run_id: int, stages: Dict[str, Dict]) -> None:
+    for stage, s in stages.items():
+        rate = f"{s['rows_per_sec']:,.0f} rows/s" if s["rows_per_sec"] else "-"
+        peak = f"{s['process_peak_rss_mb']:,.1f} MB" if s["process_peak_rss_mb"] is not None else "-"
+        logging.info(
+            f"Run {run_id} stage {stage}: calls={s['calls']} rows={s['rows']} "
+            f"time={s['seconds']:.3f}s rate={rate} process_peak_rss={peak}"
+        )
+
+
+def save_run_metrics(run_id: int, stages: Dict[str, Dict]) -> None:
+    """Upsert one ingestion_run_metrics row per stage."""
+    if not stages:
+        return
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            execute_values(
+                cur,
+                INSERT_RUN_METRICS,
+                [
+                    (
+                        run_id,
+                        stage,
+                        s["calls"],
+                        s["rows"],
+                        s["seconds"],
+                        s["rows_per_sec"],
+                        s["process_peak_rss_mb"],
+                    )
+                    for stage, s in stages.items()
+                ],
+            )
+            conn.commit()
+        finally:
+            cur.close()
+
+
+def finish_run_metrics(run_id: int) -> Dict[str, Dict]:
+    """
+    Log and persist the totals collected for a run.
+
+    Metrics are best effort: a failure to store them is logged, never raised,
+    so it cannot change the outcome of the run.
+    """
+    stages = snapshot()
+    log_summary(run_id, stages)
+    try:
+        save_run_metrics(run_id, stages)
+    except Exception as e:
+        logging.warning(f"Could not save metrics for run_id={run_id}: {e}")
+    return stages
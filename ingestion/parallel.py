@@ -0,0 +1,202 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from ingestion import metrics
+from ingestion.read import (
+    configure_csv_engine,
+    configure_schema_mapping,
+    get_csv_engine,
+    get_schema_mapping,
+    iter_source_chunks,
+    plan_csv_shards,
+    read_csv_shard,
+)
+from ingestion.validate import validate_dataframe
+
+# (rows read, valid_df, rejected_df) for one chunk of a source file
+ValidatedChunk = Tuple[int, pd.DataFrame, pd.DataFrame]
+
+# Stage metrics a worker process collected (see ingestion.metrics.snapshot)
+StageMetrics = Dict[str, Dict]
+
+
+def validate_frame(raw_df: pd.DataFrame, validation: Dict, force_reject: bool) -> ValidatedChunk:
+    """
+    Validate one raw chunk (shared by the sequential, sharded and pipelined
+    readers); see iter_validated_chunks for the arguments.
+    """
+    if force_reject and not raw_df.empty:
+        forced_bad = raw_df.iloc[[0]].astype(object)
+        forced_bad["name"] = None
+        raw_df = pd.concat([raw_df, forced_bad], ignore_index=True)
+
+    with metrics.timed("validate", len(raw_df)):
+        valid_df, rejected_df = validate_dataframe(
+            raw_df,
+            required_fields=validation.get("required_fields", []),
+            numeric_fields=validation.get("numeric_fields", []),
+            date_fields=validation.get("date_fields", []),
+        )
+    return len(raw_df), valid_df, rejected_df
+
+
+def iter_validated_chunks(
+    file_path: str,
+    validation: Dict,
+    chunk_size: Optional[int] = None,
+    force_reject: bool = False,
+    fmt: str = "csv",
+) -> Iterator[ValidatedChunk]:
+    """
+    Read and validate a file one chunk at a time.
+
+    validation: the `validation` section of config/ingestion.yaml
+    force_reject: append a copy of the first row with `name` blanked (testing hook)
+    fmt: data_source.format, selects the reader (see ingestion.read.CHUNK_READERS)
+    """
+    raw_chunks = iter_source_chunks(file_path, chunk_size, fmt)
+    for chunk_no, raw_df in enumerate(raw_chunks, start=1):
+        yield validate_frame(raw_df, validation, force_reject and chunk_no == 1)
+
+
+def read_and_validate_file(
+    file_path: str,
+    validation: Dict,
+    chunk_size: Optional[int] = None,
+    force_reject: bool = False,
+    fmt: str = "csv",
+) -> Tuple[List[ValidatedChunk], StageMetrics]:
+    """
+    Worker entry point: read and validate a whole file in a child process.
+
+    Returns the chunks and the read/validate metrics of this file, which the
+    parent merges into the run's metrics.
+    """
+    metrics.reset()
+    chunks = list(iter_validated_chunks(file_path, validation, chunk_size, force_reject, fmt))
+    return chunks, metrics.snapshot()
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """None or 0 means one worker per core."""
+    return int(workers) if workers else (os.cpu_count() or 1)
+
+
+def _init_worker(engine: str, schema: Dict) -> None:
+    configure_csv_engine(engine)
+    configure_schema_mapping(schema)
+
+
+def _worker_pool(workers: int) -> ProcessPoolExecutor:
+    # Workers parse with the CSV engine and schema_mapping of this process
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(get_csv_engine(), get_schema_mapping()),
+    )
+
+
+def map_files(
+    file_paths: List[str],
+    validation: Dict,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    force_reject: bool = False,
+    fmt: str = "csv",
+) -> Iterator[Tuple[str, Future]]:
+    """
+    Read and validate files in a process pool.
+
+    Yields (file_path, future) in completion order so the caller can load
+    each file while the others are still being parsed. At most two files
+    per worker are in flight, which bounds the memory held by results
+    waiting to be loaded. Loading stays in the calling process, so writes
+    to the shared dimension tables never race each other.
+    """
+    workers = resolve_workers(workers)
+    pending = list(file_paths)
+    in_flight: Dict[Future, str] = {}
+
+    logging.info(f"Reading {len(file_paths)} files with {workers} worker processes")
+
+    with _worker_pool(workers) as pool:
+        while pending or in_flight:
+            while pending and len(in_flight) < 2 * workers:
+                path = pending.pop(0)
+                future = pool.submit(
+                    read_and_validate_file, path, validation, chunk_size, force_reject, fmt
+                )
+                in_flight[future] = path
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future
+
+
+def read_and_validate_shard(
+    file_path: str,
+    start: int,
+    end: int,
+    header: List[str],
+    validation: Dict,
+    force_reject: bool = False,
+) -> Tuple[ValidatedChunk, StageMetrics]:
+    """Worker entry point: parse and validate one byte range of a CSV file."""
+    metrics.reset()
+    raw_df = read_csv_shard(file_path, start, end, header)
+    return validate_frame(raw_df, validation, force_reject), metrics.snapshot()
+
+
+def iter_sharded_chunks(
+    file_path: str,
+    validation: Dict,
+    shard_bytes: int,
+    workers: Optional[int] = None,
+    force_reject: bool = False,
+) -> Iterator[ValidatedChunk]:
+    """
+    Parse and validate one large CSV across worker processes.
+
+    The file is split into line-aligned byte ranges of about shard_bytes.
+    Shards are yielded in file order, so concatenating them gives the same
+    rows as the single-process path and first-occurrence dedup still holds.
+    At most two shards per worker are parsed ahead of the consumer.
+    """
+    workers = resolve_workers(workers)
+    header, ranges = plan_csv_shards(file_path, shard_bytes)
+
+    logging.info(
+        f"Reading {file_path} as {len(ranges)} shards of ~{shard_bytes} bytes "
+        f"with {workers} worker processes"
+    )
+
+    with _worker_pool(workers) as pool:
+        in_flight: Deque[Future] = deque()
+        for shard_no, (start, end) in enumerate(ranges):
+            in_flight.append(
+                pool.submit(
+                    read_and_validate_shard,
+                    file_path,
+                    start,
+                    end,
+                    header,
+                    validation,
+                    force_reject and shard_no == 0,
+                )
+            )
+            if len(in_flight) >= 2 * workers:
+                yield _merge_shard(in_flight.popleft())
+
+        while in_flight:
+            yield _merge_shard(in_flight.popleft())
+
+
+def _merge_shard(future: Future) -> ValidatedChunk:
+    chunk, shard_metrics = future.result()
+    metrics.merge(shard_metrics)
+    return chunk
@@ -1,4 +1,6 @@
 from typing import Dict, List, Tuple, Optional
+import warnings
+import numpy as np
 import pandas as pd
 import math
 
@@ -15,6 +17,12 @@ DEFAULT_REQUIRED_FIELDS = [
 DEFAULT_NUMERIC_FIELDS = ["data_value"]
 DEFAULT_DATE_FIELDS = ["start_date"]
 
+# Fields that validate_record always casts with int()
+INTEGER_FIELDS = ["unique_id", "indicator_id"]
+
+# Strings float() accepts that pd.to_numeric turns into NaN
+NAN_STRINGS = {"nan", "+nan", "-nan"}
+
 
 def is_nan(value) -> bool:
     return isinstance(value, float) and math.isnan(value)
@@ -109,4 +117,219 @@ def validate_records(
             cleaned["error_reason"] = error_reason
             rejected_records.append(cleaned)
 
-    return valid_records, rejected_records
\ No newline at end of file
+    return valid_records, rejected_records
+
+# -----------------------
+# Column-at-a-time validation
+# -----------------------
+
+def _is_text_column(series: pd.Series) -> bool:
+    return series.dtype == object or pd.api.types.is_string_dtype(series)
+
+
+def _clean_column(series: pd.Series) -> pd.Series:
+    """Column-wise equivalent of clean_value."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Clean each distinct value once; values that clean alike are merged
+        cleaned = _clean_column(pd.Series(series.cat.categories, dtype=object))
+        categories = pd.Index(cleaned.dropna().unique())
+        remap = categories.get_indexer(cleaned)
+        codes = series.cat.codes.to_numpy()
+        if len(remap):
+            codes = np.where(codes >= 0, remap[codes], -1)
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories), index=series.index, name=series.name
+        )
+
+    if not _is_text_column(series):
+        return series
+
+    if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+        stripped = series.str.strip()
+        return stripped.mask(stripped == "")
+
+    # Mixed object column: fall back to the scalar rule
+    return series.map(clean_value)
+
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply clean_value to every column of a DataFrame."""
+    return pd.DataFrame({col: _clean_column(df[col]) for col in df.columns}, index=df.index)
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def _coerce_integer(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Vectorized int() check.
+
+    Returns:
+        (values, invalid_mask)
+    """
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return series.astype("float64"), pd.Series(False, index=series.index)
+
+    if pd.api.types.is_float_dtype(series):
+        # int() truncates floats but rejects NaN/inf
+        invalid = ~np.isfinite(series)
+        return np.trunc(series), invalid
+
+    kind = pd.api.types.infer_dtype(series, skipna=True)
+    if kind in ("string", "empty"):
+        # int("12.5") fails, so only plain integer literals pass
+        literal = series.str.fullmatch(r"[+-]?\d+").fillna(False).astype(bool)
+        values = pd.to_numeric(series.where(literal), errors="coerce")
+        return values, ~literal | values.isna()
+
+    if kind in ("integer", "floating", "mixed-integer-float"):
+        values = pd.to_numeric(series, errors="coerce")
+        invalid = ~np.isfinite(values)
+        return np.trunc(values), invalid
+
+    values = pd.to_numeric(series.map(_int_or_none), errors="coerce")
+    return values, values.isna()
+
+
+def _coerce_numeric(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Vectorized float() check. Missing values are skipped, as in validate_record.
+
+    Returns:
+        (values, invalid_mask)
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype("float64"), pd.Series(False, index=series.index)
+
+    values = pd.to_numeric(series, errors="coerce")
+    invalid = values.isna() & series.notna()
+
+    if invalid.any() and _is_text_column(series):
+        # "nan" is a valid float() literal but coerces to NaN
+        nan_literal = series.str.lower().isin(NAN_STRINGS).fillna(False).astype(bool)
+        invalid &= ~nan_literal
+
+    return values.astype("float64"), invalid
+
+
+def _parse_date_scalar(value):
+    """Scalar pd.to_datetime; None signals a parse error."""
+    try:
+        return pd.to_datetime(value)
+    except Exception:
+        return None
+
+
+def _coerce_date(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Vectorized pd.to_datetime check.
+
+    The whole column is parsed with one inferred format first; only the rows
+    that fail are retried with the scalar parser, so mixed formats still pass.
+
+    Returns:
+        (values normalized to midnight, invalid_mask)
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        parsed = pd.to_datetime(series, errors="coerce")
+
+    invalid = pd.Series(False, index=series.index)
+    retry = parsed.isna() & series.notna()
+    if retry.any():
+        fallback = [_parse_date_scalar(v) for v in series[retry]]
+        invalid[retry] = [v is None for v in fallback]
+        parsed = parsed.astype(object)
+        parsed[retry] = [pd.NaT if v is None else v for v in fallback]
+        parsed = pd.to_datetime(parsed, errors="coerce")
+
+    return parsed.dt.normalize(), invalid
+
+
+def validate_dataframe(
+    df: pd.DataFrame,
+    required_fields: Optional[List[str]] = None,
+    numeric_fields: Optional[List[str]] = None,
+    date_fields: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validate a DataFrame one column at a time.
+
+    Applies the same checks, in the same order, as validate_record, so every
+    rejected row carries the same `error_reason` text.
+
+    Returns:
+        valid_df: cleaned rows that passed validation (integer fields as int64,
+                  numeric fields as float64, date fields as datetime64)
+        rejected_df: cleaned rows with an `error_reason` column
+    """
+    req = required_fields or DEFAULT_REQUIRED_FIELDS
+    nums = numeric_fields or DEFAULT_NUMERIC_FIELDS
+    dates = date_fields or DEFAULT_DATE_FIELDS
+
+    cleaned = clean_frame(df)
+    n = len(cleaned)
+    missing_column = pd.Series(np.nan, index=cleaned.index, dtype=object)
+
+    def column(field: str) -> pd.Series:
+        return cleaned[field] if field in cleaned.columns else missing_column
+
+    # Later checks are written first so earlier ones overwrite them,
+    # matching the first-failure-wins order of validate_record.
+    reasons = np.full(n, None, dtype=object)
+    coerced: Dict[str, pd.Series] = {}
+
+    for field in reversed(dates):
+        values, invalid = _coerce_date(column(field))
+        reasons[invalid.to_numpy()] = f"Invalid date format for {field}"
+        coerced[field] = values
+
+    for field in reversed(nums):
+        values, invalid = _coerce_numeric(column(field))
+        reasons[invalid.to_numpy()] = f"Invalid numeric value for {field}"
+        coerced[field] = values
+
+    for field in INTEGER_FIELDS:
+        values, invalid = _coerce_integer(column(field))
+        reasons[invalid.to_numpy()] = "Invalid integer field"
+        coerced[field] = values
+
+    for field in reversed(req):
+        missing = column(field).isna().to_numpy()
+        reasons[missing] = f"Missing required field: {field}"
+
+    rejected_mask = pd.notna(reasons)
+
+    valid_df = cleaned.loc[~rejected_mask].copy()
+    for field, values in coerced.items():
+        if field not in valid_df.columns:
+            continue
+        values = values.loc[~rejected_mask]
+        if field in INTEGER_FIELDS:
+            values = values.astype("int64")
+        valid_df[field] = values
+
+    rejected_df = cleaned.loc[rejected_mask].copy()
+    rejected_df["error_reason"] = reasons[rejected_mask]
+
+    return valid_df, rejected_df
+
+
+def frame_to_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    Convert a validated DataFrame back into the list-of-dicts shape
+    produced by validate_records (NaN -> None, datetimes -> date).
+    """
+    if df.empty:
+        return []
+
+    out = df.astype(object).where(df.notna(), None)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            out[col] = [v.date() if v is not None else None for v in out[col]]
+
+    return out.to_dict(orient="records")
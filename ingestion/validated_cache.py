@@ -0,0 +1,263 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from ingestion import metrics
+from ingestion.manifest import compute_content_hash
+from ingestion.parallel import ValidatedChunk
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # optional dependency; the cache is off without it
+    pa = None
+
+# Bump when the entry layout or the validated frame shape changes
+CACHE_VERSION = 1
+
+META_FILE = "meta.json"
+
+# Unfinished entries of crashed runs older than this are removed on eviction
+STALE_TMP_SECONDS = 3600
+
+
+def is_available() -> bool:
+    return pa is not None
+
+
+def cache_key(
+    src_path: str,
+    validation: Dict,
+    fmt: str = "csv",
+    chunk_size: Optional[int] = None,
+    force_reject: bool = False,
+    content_hash: Optional[str] = None,
+    schema: Optional[Dict] = None,
+    engine: Optional[str] = None,
+) -> str:
+    """
+    Key of a source file's validated output.
+
+    Combines the SHA-256 of the file contents (pass content_hash when the
+    manifest already computed it) with everything that shapes the result:
+    the validation config, format, chunk_size, the force_reject hook, the
+    schema_mapping the frames were read with and the CSV parse engine
+    (c and pyarrow can give different dtypes).
+    """
+    settings = {
+        "version": CACHE_VERSION,
+        "content_hash": content_hash or compute_content_hash(src_path),
+        "validation": validation,
+        "format": fmt,
+        "chunk_size": chunk_size,
+        "force_reject": bool(force_reject),
+        "schema": schema or {},
+        "engine": engine,
+    }
+    text = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+# -----------------------
+# Frames <-> Arrow IPC files
+# -----------------------
+
+def _json_value(value):
+    return json.dumps(value, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+
+def _write_frame(df: pd.DataFrame, path: str) -> None:
+    """
+    Write a frame as an Arrow IPC file, keeping dtypes and the index.
+
+    Object columns Arrow cannot type (rejected rows mix raw strings and
+    numbers) are stored as JSON text and decoded again on read.
+    """
+    json_cols: List[str] = []
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[col] = [_json_value(v) for v in df[col]]
+                json_cols.append(col)
+        table = pa.Table.from_pandas(df, preserve_index=True)
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"json_columns"] = json.dumps(json_cols).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_frame(path: str) -> pd.DataFrame:
+    """Memory-map an Arrow IPC file written by _write_frame back into a frame."""
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas()
+
+    # Arrow strings come back as pandas' string dtype; keep object columns object
+    # (all-missing values come back as None, which loads the same as NaN)
+    for col in (table.schema.pandas_metadata or {}).get("columns", []):
+        if col["numpy_type"] == "object" and col["name"] in df.columns:
+            df[col["name"]] = df[col["name"]].astype(object)
+
+    metadata = table.schema.metadata or {}
+    for col in json.loads(metadata.get(b"json_columns", b"[]")):
+        df[col] = pd.Series([json.loads(v) for v in df[col]], index=df.index, dtype=object)
+    return df
+
+
+# -----------------------
+# Entries
+# -----------------------
+
+def _entry_dir(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key)
+
+
+def has_entry(cache_dir: str, key: str) -> bool:
+    return os.path.exists(os.path.join(_entry_dir(cache_dir, key), META_FILE))
+
+
+def iter_cached_chunks(cache_dir: str, key: str) -> Iterator[ValidatedChunk]:
+    """
+    Yield the validated chunks stored under key, one chunk in memory at a time.
+
+    Reading an entry marks it as recently used for eviction.
+    """
+    entry = _entry_dir(cache_dir, key)
+    meta_path = os.path.join(entry, META_FILE)
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    os.utime(meta_path)
+
+    logging.info(f"Validated cache hit {key}: {len(meta['read_counts'])} chunks from {entry}")
+    for i, read_count in enumerate(meta["read_counts"]):
+        with metrics.timed("read", read_count):
+            valid_df = _read_frame(os.path.join(entry, f"{i:05d}.valid.arrow"))
+            rejected_df = _read_frame(os.path.join(entry, f"{i:05d}.rejected.arrow"))
+        yield read_count, valid_df, rejected_df
+
+
+def write_through(
+    cache_dir: str,
+    key: str,
+    chunks: Iterable[ValidatedChunk],
+    max_size_mb: Optional[float] = None,
+) -> Iterator[ValidatedChunk]:
+    """
+    Pass chunks through while storing them as a cache entry.
+
+    The entry is written to a temporary directory and renamed into place
+    only once every chunk was produced, so readers never see a partial
+    entry. If the consumer stops early (e.g. a load failed) or reading or
+    validation fails, the partial entry is discarded; the next complete
+    pass over the file stores it.
+    """
+    entry = _entry_dir(cache_dir, key)
+    tmp = f"{entry}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    read_counts: List[int] = []
+    chunks = iter(chunks)
+    failed = False
+
+    def store(chunk: ValidatedChunk) -> None:
+        # Caching is best effort: a write error never fails the run
+        nonlocal failed
+        if failed:
+            return
+        read_count, valid_df, rejected_df = chunk
+        i = len(read_counts)
+        try:
+            _write_frame(valid_df, os.path.join(tmp, f"{i:05d}.valid.arrow"))
+            _write_frame(rejected_df, os.path.join(tmp, f"{i:05d}.rejected.arrow"))
+        except Exception as e:
+            logging.warning(f"Validated cache entry {key} not stored: {e}")
+            failed = True
+            return
+        read_counts.append(read_count)
+
+    complete = False
+    try:
+        for chunk in chunks:
+            store(chunk)
+            yield chunk
+        complete = True
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+        if complete and not failed:
+            _commit_entry(tmp, entry, read_counts)
+            if max_size_mb:
+                evict(cache_dir, max_size_mb)
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _commit_entry(tmp: str, entry: str, read_counts: List[int]) -> None:
+    with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "read_counts": read_counts}, f)
+    try:
+        os.replace(tmp, entry)
+    except OSError:
+        # Another run stored the same entry first
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    logging.info(f"Validated cache stored {len(read_counts)} chunks in {entry}")
+
+
+def _dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def evict(cache_dir: str, max_size_mb: float) -> List[str]:
+    """
+    Remove least recently used entries until the cache fits max_size_mb.
+
+    Returns the removed keys.
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if ".tmp-" in name:
+            if time.time() - os.path.getmtime(path) > STALE_TMP_SECONDS:
+                shutil.rmtree(path, ignore_errors=True)
+            continue
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            entries.append((os.path.getmtime(meta_path), name, _dir_size(path)))
+
+    budget = max_size_mb * 1024 * 1024
+    total = sum(size for _, _, size in entries)
+    removed = []
+    for _, name, size in sorted(entries):
+        if total <= budget:
+            break
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total -= size
+        removed.append(name)
+
+    if removed:
+        logging.info(f"Validated cache evicted {len(removed)} entries from {cache_dir}")
+    return removed
@@ -1,13 +1,39 @@
 import os
 import logging
 from collections import Counter
+from concurrent.futures import Future
+from typing import Iterable, Iterator, Optional
 
 from config.config_loader import load_config
 from db.init_db import init_db
-from db.connection import connect_to_db
-from ingestion.read import read_csv
-from ingestion.validate import validate_records
-from ingestion.loader import load_records
+from db.connection import configure_db, get_connection, close_pool
+from ingestion.read import (
+    configure_csv_engine,
+    configure_schema_mapping,
+    get_chunk_reader,
+    get_csv_engine,
+    resolve_source_files,
+)
+from ingestion.deduplicator import CompactDeduplicator, deduplicate_frame, make_deduplicator
+from ingestion.validate import frame_to_records
+from ingestion.loader import cap_rejects, load_records
+from ingestion.dimension_cache import configure_dimension_cache
+from ingestion.dimension_cache import get_stats as get_dimension_cache_stats
+from ingestion.manifest import (
+    check_source_file,
+    filter_changed_rows,
+    save_row_hashes,
+    update_manifest,
+)
+from ingestion.parallel import (
+    ValidatedChunk,
+    iter_sharded_chunks,
+    iter_validated_chunks,
+    map_files,
+    resolve_workers,
+)
+from ingestion.pipeline import iter_pipelined_chunks
+from ingestion import aggregates, metrics, validated_cache
 
 
 def setup_logging(log_level: str = "INFO") -> None:
@@ -19,15 +45,26 @@ def setup_logging(log_level: str = "INFO") -> None:
     )
 
 
-def log_reject_summary(rejected_records: list[dict], sample_size: int = 5) -> None:
-    if not rejected_records:
+def log_reject_summary(
+    rejected_records: list[dict],
+    sample_size: int = 5,
+    reason_counts: Counter | None = None,
+) -> None:
+    """
+    Log reject totals, top reasons and a few sample rows.
+
+    When reason_counts is given (streaming mode), it holds the totals for the
+    whole run and rejected_records only needs to hold the samples.
+    """
+    if not rejected_records and not reason_counts:
         return
 
-    reasons = [r.get("error_reason", "Validation failed") for r in rejected_records]
-    counts = Counter(reasons)
+    if reason_counts is None:
+        reasons = [r.get("error_reason", "Validation failed") for r in rejected_records]
+        reason_counts = Counter(reasons)
 
-    logging.warning(f"Reject summary: {len(rejected_records)} rejected total")
-    for reason, cnt in counts.most_common(5):
+    logging.warning(f"Reject summary: {sum(reason_counts.values())} rejected total")
+    for reason, cnt in reason_counts.most_common(5):
         logging.warning(f"Reject reason ({cnt}): {reason}")
 
     for i, r in enumerate(rejected_records[:sample_size], start=1):
@@ -39,23 +76,22 @@ def log_reject_summary(rejected_records: list[dict], sample_size: int = 5) -> No
 
 
 def start_run(source_file: str) -> int:
-    conn = connect_to_db()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            """
-            INSERT INTO ingestion_runs (source_file, status)
-            VALUES (%s, 'STARTED')
-            RETURNING run_id;
-            """,
-            (source_file,),
-        )
-        run_id = cur.fetchone()[0]
-        conn.commit()
-        return run_id
-    finally:
-        cur.close()
-        conn.close()
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                """
+                INSERT INTO ingestion_runs (source_file, status)
+                VALUES (%s, 'STARTED')
+                RETURNING run_id;
+                """,
+                (source_file,),
+            )
+            run_id = cur.fetchone()[0]
+            conn.commit()
+            return run_id
+        finally:
+            cur.close()
 
 
 def finish_run(
@@ -65,112 +101,395 @@ def finish_run(
     rejected_records: int,
     status: str = "SUCCESS",
     error_message: str | None = None,
+    skipped_records: int = 0,
+    duplicate_records: int = 0,
 ) -> None:
-    conn = connect_to_db()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            """
-            UPDATE ingestion_runs
-            SET end_timestamp = CURRENT_TIMESTAMP,
-                total_records = %s,
-                valid_records = %s,
-                rejected_records = %s,
-                status = %s,
-                error_message = %s
-            WHERE run_id = %s;
-            """,
-            (
-                total_records,
-                valid_records,
-                rejected_records,
-                status,
-                error_message,
-                run_id,
-            ),
-        )
-        conn.commit()
-    finally:
-        cur.close()
-        conn.close()
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                """
+                UPDATE ingestion_runs
+                SET end_timestamp = CURRENT_TIMESTAMP,
+                    total_records = %s,
+                    valid_records = %s,
+                    rejected_records = %s,
+                    skipped_records = %s,
+                    duplicate_records = %s,
+                    status = %s,
+                    error_message = %s
+                WHERE run_id = %s;
+                """,
+                (
+                    total_records,
+                    valid_records,
+                    rejected_records,
+                    skipped_records,
+                    duplicate_records,
+                    status,
+                    error_message,
+                    run_id,
+                ),
+            )
+            conn.commit()
+        finally:
+            cur.close()
 
 
-def main() -> None:
-    cfg = load_config("config/ingestion.yaml")
-    setup_logging(cfg["app"].get("log_level", "INFO"))
-    logging.info("Starting Air Quality Data Ingestion")
+def record_skipped_run(src_path: str, fingerprint: dict) -> None:
+    """Log an ingestion_runs row for a source file unchanged since its last load."""
+    source_file = os.path.basename(src_path)
+    run_id = start_run(source_file)
+    skipped = fingerprint.get("row_count") or 0
+    finish_run(
+        run_id=run_id,
+        total_records=0,
+        valid_records=0,
+        rejected_records=0,
+        skipped_records=skipped,
+        status="SKIPPED",
+        error_message=None,
+    )
+    logging.info(
+        f"Run {run_id}: {source_file} unchanged since last load, skipped ({skipped} records)"
+    )
 
-    # Create tables
-    init_db(reset=False)
 
-    src_path = cfg["data_source"]["path"]
+def ingest_file(
+    cfg: dict,
+    src_path: str,
+    chunks: Iterable[ValidatedChunk],
+    fingerprint: dict | None = None,
+) -> None:
+    """
+    Record one ingestion run for a source file and load its validated chunks.
+
+    chunks is consumed lazily, so a streaming reader keeps only one chunk in
+    memory; errors raised while producing chunks mark the run FAILED. A
+    generator is closed when the run ends, stopping any reader threads.
+    Per-stage metrics are logged and saved to ingestion_run_metrics either way.
+    fingerprint (incremental mode) is written to the manifest on success.
+    """
     source_file = os.path.basename(src_path)
+    chunk_size = cfg["data_source"].get("chunk_size")
 
     # Start run tracking
     run_id = start_run(source_file)
     logging.info(f"Run started: run_id={run_id}, source_file={source_file}")
+    metrics.reset()
+
+    dedup_cfg = cfg.get("deduplication", {})
+    dedup_keys = dedup_cfg.get("keys", []) if dedup_cfg.get("enabled") else []
+    seen_keys = make_deduplicator(dedup_cfg)
+    row_hashes = cfg.get("incremental", {}).get("enabled") and cfg["incremental"].get(
+        "row_hashes", False
+    )
+
+    # Run totals; only one chunk is held in memory at a time
+    total_count = 0
+    valid_count = 0
+    rejected_count = 0
+    duplicate_count = 0
+    skipped_count = 0
+    load_counts: dict[str, Counter] = {}
+    reason_counts: Counter = Counter()
+    reject_samples: list[dict] = []
+    # Rejected rows stored per error_reason, for database.reject_sample_cap
+    stored_rejects: dict[str, int] = {}
+    reject_cap = cfg["database"].get("reject_sample_cap")
 
     try:
-        raw_records = read_csv(src_path)
-
-        # Trigger rejects via YAML (optional)
-        force_reject = cfg.get("testing", {}).get("force_reject", False)
-        if force_reject and raw_records:
-            forced_bad = dict(raw_records[0])
-            forced_bad["name"] = None
-            raw_records.append(forced_bad)
-
-        logging.info(f"Records read: {len(raw_records)}")
-
-        required_fields = cfg["validation"].get("required_fields", [])
-        numeric_fields = cfg["validation"].get("numeric_fields", [])
-        date_fields = cfg["validation"].get("date_fields", [])
-
-        valid_records, rejected_records = validate_records(
-            raw_records,
-            required_fields=required_fields,
-            numeric_fields=numeric_fields,
-            date_fields=date_fields,
-        )
+        for chunk_no, (read_count, valid_df, rejected_df) in enumerate(chunks, start=1):
+            total_count += read_count
+            valid_count += len(valid_df)
 
-        logging.info(f"Valid records: {len(valid_records)}")
-        logging.info(f"Rejected records: {len(rejected_records)}")
-        log_reject_summary(rejected_records, sample_size=5)
+            rejected_count += len(rejected_df)
+            if not rejected_df.empty:
+                reason_counts.update(rejected_df["error_reason"].value_counts().to_dict())
+            if len(reject_samples) < 5:
+                reject_samples.extend(frame_to_records(rejected_df.head(5 - len(reject_samples))))
 
-        valid_records = [r for r in valid_records if r.get("unique_id") is not None]
+            # Dedup before the row-hash filter: the first occurrence of a key
+            # wins whether or not it changed, and later ones never replace it
+            if dedup_keys:
+                with metrics.timed("dedup", len(valid_df)):
+                    valid_df, duplicates = deduplicate_frame(valid_df, dedup_keys, seen=seen_keys)
+                duplicate_count += duplicates
 
-        # Load (normalized schema)
-        load_records(
-            run_id=run_id,
-            valid_records=valid_records,
-            rejected_records=rejected_records,
-            source_file=source_file,
-            batch_size=cfg["database"].get("batch_size", 500),
-        )
+            replace_ids: list[int] = []
+            if row_hashes:
+                # Only rows that are new or changed since the last run are loaded
+                deduplicated = len(valid_df)
+                valid_df, replace_ids, hashes = filter_changed_rows(src_path, valid_df)
+                skipped_count += deduplicated - len(valid_df)
+                # Stored rows are only deleted when a replacement is loaded
+                replace_ids = valid_df["unique_id"][
+                    valid_df["unique_id"].isin(replace_ids)
+                ].unique().tolist()
+
+            # Load (normalized schema)
+            chunk_counts = load_records(
+                run_id=run_id,
+                valid_records=valid_df,
+                rejected_records=cap_rejects(rejected_df, reject_cap, stored_rejects),
+                source_file=source_file,
+                batch_size=cfg["database"].get("batch_size", 500),
+                load_strategy=cfg["database"].get("load_strategy", "batch"),
+                replace_ids=replace_ids,
+                partitions=cfg["database"].get("load_partitions") or 1,
+                partition_by=cfg["database"].get("partition_by", "hash"),
+                date_partitions=partition_interval(cfg),
+            )
+            if row_hashes:
+                save_row_hashes(
+                    src_path, run_id, valid_df["unique_id"], hashes.loc[valid_df.index]
+                )
+            for table, c in chunk_counts.items():
+                load_counts.setdefault(table, Counter()).update(
+                    {k: v for k, v in c.items() if v is not None}
+                )
+
+            if chunk_size:
+                logging.info(
+                    f"Chunk {chunk_no}: read={read_count} valid={len(valid_df)} "
+                    f"rejected={len(rejected_df)}"
+                )
+
+        logging.info(f"Records read: {total_count}")
+        logging.info(f"Valid records: {valid_count}")
+        logging.info(f"Rejected records: {rejected_count}")
+        if dedup_keys:
+            logging.info(f"Duplicate records skipped: {duplicate_count}")
+            if isinstance(seen_keys, CompactDeduplicator):
+                logging.info(f"Deduplication state: {seen_keys.stats()}")
+        if row_hashes:
+            logging.info(f"Unchanged records skipped: {skipped_count}")
+        log_reject_summary(reject_samples, sample_size=5, reason_counts=reason_counts)
+        if reject_cap is not None and sum(stored_rejects.values()) < rejected_count:
+            logging.info(
+                f"Rejected records stored: {sum(stored_rejects.values())} "
+                f"(at most {reject_cap} per error reason)"
+            )
+        for table, c in load_counts.items():
+            extra = "".join(f" {k}={c[k]}" for k in ("replaced", "cached") if c.get(k))
+            logging.info(
+                f"Load totals for {table}: sent={c['sent']} "
+                f"inserted={c['inserted']} skipped={c['skipped']}{extra}"
+            )
 
         finish_run(
             run_id=run_id,
-            total_records=len(valid_records) + len(rejected_records),
-            valid_records=len(valid_records),
-            rejected_records=len(rejected_records),
+            total_records=total_count,
+            valid_records=valid_count,
+            rejected_records=rejected_count,
+            skipped_records=skipped_count,
+            duplicate_records=duplicate_count,
             status="SUCCESS",
             error_message=None,
         )
+        if fingerprint:
+            update_manifest(src_path, fingerprint, run_id=run_id, row_count=total_count)
 
-        logging.info("Air Quality Data Ingestion completed successfully")
+        logging.info(f"Ingestion completed successfully for {source_file}")
 
     except Exception as e:
         logging.exception(f"Ingestion failed for run_id={run_id}: {e}")
         finish_run(
             run_id=run_id,
             valid_records=0,
-            rejected_records=len(rejected_records),
-            total_records=len(raw_records),
+            rejected_records=rejected_count,
+            total_records=total_count,
+            skipped_records=skipped_count,
+            duplicate_records=duplicate_count,
             status="FAILED",
             error_message=str(e),
         )
         raise
 
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+        if isinstance(seen_keys, CompactDeduplicator):
+            seen_keys.close()
+        # After close(), so reader/validation threads have finished recording
+        metrics.finish_run_metrics(run_id)
+
+
+def backfill_aggregates() -> None:
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            aggregates.backfill(cur)
+            conn.commit()
+        finally:
+            cur.close()
+
+
+def partition_interval(cfg: dict) -> Optional[str]:
+    """database.measurements_partitioning interval, or None when disabled."""
+    part_cfg = cfg["database"].get("measurements_partitioning") or {}
+    if not part_cfg.get("enabled", False):
+        return None
+    return part_cfg.get("interval", "year")
+
+
+def iter_future_chunks(future: Future) -> Iterator[ValidatedChunk]:
+    """Yield the chunks a worker produced; worker errors surface here."""
+    chunks, worker_metrics = future.result()
+    metrics.merge(worker_metrics)
+    yield from chunks
+
+
+def main() -> None:
+    cfg = load_config("config/ingestion.yaml")
+    setup_logging(cfg["app"].get("log_level", "INFO"))
+    logging.info("Starting Air Quality Data Ingestion")
+    configure_db(cfg.get("database"))
+    cache_cfg = cfg["database"].get("dimension_cache", {})
+    configure_dimension_cache(cache_cfg.get("enabled", False), cache_cfg.get("path"))
+
+    # Create tables
+    init_db(reset=False, partition_interval=partition_interval(cfg))
+    aggregates.configure_aggregates(cfg["database"].get("aggregates", {}).get("enabled", False))
+    if aggregates.is_enabled():
+        backfill_aggregates()
+
+    source_cfg = cfg["data_source"]
+    fmt = source_cfg.get("format", "csv")
+    get_chunk_reader(fmt)  # fail fast on an unknown format
+    if fmt == "csv":
+        engine = configure_csv_engine(source_cfg.get("engine"))
+        logging.info(f"CSV parse engine: {engine}")
+    schema = configure_schema_mapping(cfg.get("schema_mapping"))
+    src_paths = resolve_source_files(source_cfg["path"], fmt)
+    chunk_size = source_cfg.get("chunk_size")
+    workers = resolve_workers(source_cfg.get("workers"))
+    shard_bytes = int((source_cfg.get("shard_size_mb") or 0) * 1024 * 1024)
+    force_reject = cfg.get("testing", {}).get("force_reject", False)
+    pipeline_cfg = cfg.get("pipeline", {})
+
+    validated_cfg = cfg.get("validated_cache", {})
+    use_validated_cache = bool(validated_cfg.get("enabled"))
+    if use_validated_cache and not validated_cache.is_available():
+        logging.warning("validated_cache needs pyarrow, which is not installed; cache disabled")
+        use_validated_cache = False
+    cache_dir = validated_cfg.get("path") or ".cache/validated"
+    cache_keys: dict[str, str] = {}
+
+    def cache_through(src_path: str, chunks: Iterable[ValidatedChunk]) -> Iterable[ValidatedChunk]:
+        # Store freshly validated chunks so the next run can skip parsing
+        if src_path not in cache_keys:
+            return chunks
+        return validated_cache.write_through(
+            cache_dir, cache_keys[src_path], chunks, validated_cfg.get("max_size_mb")
+        )
+
+    failures: list[Exception] = []
+    fingerprints: dict[str, dict] = {}
+
+    try:
+        if cfg.get("incremental", {}).get("enabled"):
+            # Skip files whose size/mtime/content match the manifest
+            pending = []
+            for src_path in src_paths:
+                unchanged, fingerprints[src_path] = check_source_file(src_path)
+                if unchanged:
+                    record_skipped_run(src_path, fingerprints[src_path])
+                else:
+                    pending.append(src_path)
+            src_paths = pending
+
+        to_parse = src_paths
+        if use_validated_cache:
+            # Files validated before with the same settings go straight to loading
+            to_parse = []
+            for src_path in src_paths:
+                key = validated_cache.cache_key(
+                    src_path,
+                    cfg["validation"],
+                    fmt,
+                    chunk_size,
+                    force_reject,
+                    schema=schema,
+                    engine=get_csv_engine() if fmt == "csv" else None,
+                    content_hash=fingerprints.get(src_path, {}).get("content_hash"),
+                )
+                if not validated_cache.has_entry(cache_dir, key):
+                    cache_keys[src_path] = key
+                    to_parse.append(src_path)
+                    continue
+                try:
+                    ingest_file(
+                        cfg,
+                        src_path,
+                        validated_cache.iter_cached_chunks(cache_dir, key),
+                        fingerprints.get(src_path),
+                    )
+                except Exception as e:
+                    failures.append(e)
+
+        if len(to_parse) <= 1 or workers == 1:
+            # Stream each file in-process, one chunk at a time
+            for src_path in to_parse:
+                if (
+                    fmt == "csv"
+                    and workers > 1
+                    and shard_bytes
+                    and os.path.getsize(src_path) > shard_bytes
+                ):
+                    # One big file: parse/validate byte-range shards in parallel
+                    chunks = iter_sharded_chunks(
+                        src_path, cfg["validation"], shard_bytes, workers, force_reject
+                    )
+                elif pipeline_cfg.get("enabled"):
+                    # Overlap reading/validation of later chunks with loading
+                    chunks = iter_pipelined_chunks(
+                        src_path,
+                        cfg["validation"],
+                        chunk_size,
+                        validate_workers=pipeline_cfg.get("validate_workers") or 2,
+                        queue_size=pipeline_cfg.get("queue_size") or 4,
+                        force_reject=force_reject,
+                        fmt=fmt,
+                    )
+                else:
+                    chunks = iter_validated_chunks(
+                        src_path, cfg["validation"], chunk_size, force_reject, fmt
+                    )
+                try:
+                    ingest_file(
+                        cfg, src_path, cache_through(src_path, chunks), fingerprints.get(src_path)
+                    )
+                except Exception as e:
+                    failures.append(e)
+        else:
+            # Parse/validate in worker processes; load here, one file at a time
+            for src_path, future in map_files(
+                to_parse, cfg["validation"], chunk_size, workers, force_reject, fmt
+            ):
+                try:
+                    ingest_file(
+                        cfg,
+                        src_path,
+                        cache_through(src_path, iter_future_chunks(future)),
+                        fingerprints.get(src_path),
+                    )
+                except Exception as e:
+                    failures.append(e)
+
+    finally:
+        close_pool()
+        if cache_cfg.get("enabled"):
+            stats = get_dimension_cache_stats()
+            logging.info(f"Dimension cache: hits={stats['hits']} misses={stats['misses']}")
+
+    if failures:
+        if len(src_paths) == 1:
+            raise failures[0]
+        raise RuntimeError(f"Ingestion failed for {len(failures)} of {len(src_paths)} files")
+
+    logging.info("Air Quality Data Ingestion completed successfully")
+
 
 if __name__ == "__main__":
     main()
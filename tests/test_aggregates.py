@@ -0,0 +1,51 @@
+from ingestion import aggregates
+
+
+class RecordingCursor:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.queries.append((sql, params))
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_update_aggregates_adds_inserted_rows_then_recomputes_stale_groups():
+    cur = RecordingCursor()
+
+    aggregates.update_aggregates(
+        cur, "measurements", [1, 2, 3], [42], stale=[(365, 2, 2014, 1), (365, 1, 2013, 4)]
+    )
+
+    (add_sql, add_params), (delete_sql, delete_params), (recompute_sql, recompute_params) = cur.queries
+    assert "m.xmin::text::bigint = ANY(%s)" in add_sql
+    assert "value_sum = a.value_sum + EXCLUDED.value_sum" in add_sql
+    assert add_params == ([1, 2, 3], [42])
+    assert delete_sql.startswith("DELETE FROM measurement_aggregates")
+    # groups are sorted and passed as one array per key column
+    assert delete_params == recompute_params == [[365, 365], [1, 2], [2013, 2014], [4, 1]]
+    assert "value_sum = EXCLUDED.value_sum" in recompute_sql
+
+
+def test_nothing_to_aggregate_sends_no_queries():
+    cur = RecordingCursor()
+
+    aggregates.update_aggregates(cur, "measurements", [], [42])
+
+    assert aggregates.affected_groups(cur, "measurements", []) == []
+    assert cur.queries == []
+
+
+def test_affected_groups_filters_by_run():
+    cur = RecordingCursor(rows=[(365, 1, 2014, 2)])
+
+    groups = aggregates.affected_groups(cur, "measurements", [7, 8], run_id=3)
+
+    sql, params = cur.queries[0]
+    assert groups == [(365, 1, 2014, 2)]
+    assert sql.endswith("AND m.run_id = %s;")
+    assert params == [[7, 8], 3]
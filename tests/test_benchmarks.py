@@ -0,0 +1,116 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.suite import BENCH_DB_ENV, compare_results, run_suite, stand_in_dsn
+from benchmarks.synthetic import generate_block, load_catalog, write_synthetic_csv
+from ingestion.read import normalize_columns
+from ingestion.validate import validate_dataframe
+
+
+def test_generate_block_injects_rejects_duplicates_and_dirty_values():
+    df = generate_block(
+        5000,
+        load_catalog(),
+        reject_ratio=0.05,
+        duplicate_ratio=0.1,
+        dirty_ratio=0.1,
+        rng=np.random.default_rng(3),
+    )
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    buf.seek(0)
+
+    valid_df, rejected_df = validate_dataframe(normalize_columns(pd.read_csv(buf)))
+
+    assert len(valid_df) + len(rejected_df) == 5000
+    assert 0.03 < len(rejected_df) / 5000 < 0.08
+    assert valid_df["unique_id"].duplicated().mean() > 0.05
+    assert not valid_df["name"].str.startswith(" ").any()
+
+
+def test_compare_results_flags_throughput_and_memory_regressions():
+    baseline = {
+        "read_csv": {"rows": 10, "rows_per_sec": 100.0, "peak_mb": 10.0},
+        "validate_records": {"rows": 10, "rows_per_sec": 100.0, "peak_mb": 10.0},
+        "load_records": {"skipped": "database unavailable"},
+    }
+    current = {
+        "read_csv": {"rows": 10, "rows_per_sec": 95.0, "peak_mb": 10.5},
+        "validate_records": {"rows": 10, "rows_per_sec": 50.0, "peak_mb": 20.0},
+        "load_records": {"rows": 10, "rows_per_sec": 1.0, "peak_mb": 1.0},
+    }
+
+    regressions = compare_results(current, baseline, tolerance=0.15)
+
+    assert len(regressions) == 2
+    assert all(r.startswith("validate_records") for r in regressions)
+
+
+def test_load_records_needs_an_explicit_stand_in(tmp_path, monkeypatch):
+    for var in list(BENCH_DB_ENV.values()) + ["BENCH_DB_DSN"]:
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("DB_HOST", "127.0.0.1")
+    monkeypatch.setenv("DB_NAME", "postgres")
+    path = write_synthetic_csv(str(tmp_path / "a.csv"), 50)
+
+    assert stand_in_dsn() is None
+    results = run_suite(path, ["load_records"], memory=False, dsn=stand_in_dsn())
+    assert results == {"load_records": {"skipped": "no stand-in database (--dsn or BENCH_DB_*)"}}
+
+    monkeypatch.setenv("BENCH_DB_NAME", "bench")
+    monkeypatch.setenv("BENCH_DB_HOST", "localhost")
+    assert stand_in_dsn() == "host=localhost dbname=bench"
+    assert stand_in_dsn("dbname=other") == "dbname=other"
+
+
+def test_load_stand_in_times_only_the_load(monkeypatch):
+    from contextlib import contextmanager
+
+    import db.connection
+    import db.init_db
+    import ingestion.loader
+    import injestion_pt1
+    from benchmarks.suite import load_into_stand_in
+
+    log = []
+
+    class Cursor:
+        def execute(self, sql, params=None):
+            log.append(sql.split()[0])
+
+        def fetchall(self):
+            return []
+
+        def close(self):
+            pass
+
+    class Conn:
+        def cursor(self):
+            return Cursor()
+
+        def commit(self):
+            pass
+
+    @contextmanager
+    def fake_connection():
+        yield Conn()
+
+    monkeypatch.setattr(db.connection, "configure_db", lambda settings: log.append("configure"))
+    monkeypatch.setattr(db.connection, "get_connection", fake_connection)
+    monkeypatch.setattr(db.connection, "close_pool", lambda: log.append("close_pool"))
+    monkeypatch.setattr(db.init_db, "init_db", lambda reset: None)
+    monkeypatch.setattr(ingestion.loader, "load_records", lambda **kwargs: log.append("load"))
+    monkeypatch.setattr(injestion_pt1, "start_run", lambda source_file: log.append("start") or 1)
+    monkeypatch.setattr(injestion_pt1, "finish_run", lambda *args: log.append("finish"))
+    cfg = {"database": {}, "data_source": {"chunk_size": 2}}
+
+    with load_into_stand_in(cfg, "dbname=bench", [{}] * 3, [], "a.csv") as load:
+        log.append("timed")
+        load()
+        log.append("done")
+
+    assert log[log.index("timed"):log.index("done")] == ["timed", "load", "load", "finish"]
+    assert "start" in log[: log.index("timed")]
+    assert log[log.index("done") + 1:] == ["DELETE"] * 5 + ["close_pool"]
@@ -0,0 +1,41 @@
+from db.connection import configure_db, DEFAULT_DB_SETTINGS
+
+
+def test_configure_db_env_overrides_config(monkeypatch):
+    monkeypatch.setenv("DB_HOST", "db.example.com")
+    monkeypatch.delenv("DB_PORT", raising=False)
+
+    settings = configure_db({"host": "10.0.0.1", "port": "6543", "pool_max_size": 8})
+
+    assert settings["host"] == "db.example.com"
+    assert settings["port"] == 6543
+    assert settings["pool_max_size"] == 8
+
+    monkeypatch.delenv("DB_HOST")
+    configure_db()
+
+
+def test_configure_db_defaults(monkeypatch):
+    for var in ("DB_HOST", "DB_PORT", "DB_NAME", "DB_USER", "DB_POOL_MIN_SIZE"):
+        monkeypatch.delenv(var, raising=False)
+
+    settings = configure_db(None)
+
+    assert settings["dbname"] == DEFAULT_DB_SETTINGS["dbname"]
+    assert settings["pool_min_size"] == DEFAULT_DB_SETTINGS["pool_min_size"]
+
+
+def test_configure_db_dsn_ignores_env(monkeypatch):
+    from db import connection
+
+    monkeypatch.setenv("DB_HOST", "db.example.com")
+
+    settings = configure_db({"dsn": "host=localhost port=5432 dbname=bench user=bench password=x"})
+
+    assert settings["host"] == "localhost"
+    assert settings["port"] == 5432
+    assert connection._connect_kwargs()["dsn"].startswith("host=localhost")
+    assert "password" not in connection._connect_kwargs()
+
+    monkeypatch.delenv("DB_HOST")
+    configure_db()
@@ -1,7 +1,18 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
 import pytest
 
 from ingestion.deduplicator import deduplicate_records
 from ingestion.deduplicator import count_duplicates
+from ingestion.deduplicator import (
+    CompactDeduplicator,
+    deduplicate_frame,
+    frame_key_texts,
+    hash_key_texts,
+    record_key_texts,
+)
 
 def test_count_duplicates_counts_correctly():
     records = [
@@ -116,4 +127,110 @@ def test_deduplicate_missing_key_raises_error():
     ]
 
     with pytest.raises(KeyError):
-        deduplicate_records(records, dedup_keys)
\ No newline at end of file
+        deduplicate_records(records, dedup_keys)
+
+def test_deduplicate_shared_seen_across_chunks():
+    keys = ["unique_id"]
+    seen = set()
+
+    first = deduplicate_records([{"unique_id": 1}, {"unique_id": 2}], keys, seen=seen)
+    second = deduplicate_records([{"unique_id": 2}, {"unique_id": 3}], keys, seen=seen)
+
+    assert [r["unique_id"] for r in first] == [1, 2]
+    assert [r["unique_id"] for r in second] == [3]
+
+
+def test_compact_deduplicator_matches_set_across_chunks():
+    keys = ["unique_id", "start_date"]
+    records = [
+        {"unique_id": i % 7, "start_date": "2020-01-01" if i % 2 else "2021-01-01"}
+        for i in range(100)
+    ]
+
+    with CompactDeduplicator(initial_capacity=16) as compact:
+        result = []
+        for i in range(0, len(records), 30):
+            result += deduplicate_records(records[i:i + 30], keys, seen=compact)
+
+    assert result == deduplicate_records(records, keys)
+
+
+def test_compact_deduplicator_spills_over_memory_budget(tmp_path):
+    with CompactDeduplicator(memory_budget_mb=0.01, spill_dir=str(tmp_path)) as compact:
+        hashes = hash_key_texts([str(i) for i in range(5000)])
+        assert not compact.add(hashes).any()
+        assert compact.add(hashes).all()
+        assert compact.stats()["spills"] > 0
+        assert len(compact) == 5000
+
+
+def test_compact_deduplicator_exact_mode_separates_hash_collisions():
+    same_hash = np.array([5, 5, 5], dtype=np.uint64)
+
+    with CompactDeduplicator(exact=True) as exact:
+        assert exact.add(same_hash, ["a", "b", "a"]).tolist() == [False, False, True]
+    with CompactDeduplicator() as approximate:
+        assert approximate.add(same_hash).tolist() == [False, True, True]
+
+
+def test_compact_deduplicator_keeps_keyerror_messages():
+    records = [{"unique_id": 1}]
+
+    with CompactDeduplicator() as compact:
+        with pytest.raises(KeyError, match="Deduplication key 'start_date' missing in record"):
+            deduplicate_records(records, ["unique_id", "start_date"], seen=compact)
+        with pytest.raises(KeyError) as exc:
+            count_duplicates(records, ["unique_id", "start_date"], seen=compact)
+    assert exc.value.args == ("start_date",)
+
+
+def test_frame_key_texts_match_record_key_texts():
+    df = pd.DataFrame(
+        {
+            "unique_id": pd.Series([1, 2], dtype="int64"),
+            "start_date": pd.to_datetime(["2020-01-01", "2020-06-01"]),
+            "geo_place_name": ["NY", None],
+        }
+    )
+    records = [
+        {"unique_id": 1, "start_date": date(2020, 1, 1), "geo_place_name": "NY"},
+        {"unique_id": 2, "start_date": date(2020, 6, 1), "geo_place_name": None},
+    ]
+    keys = ["unique_id", "start_date", "geo_place_name"]
+
+    assert frame_key_texts(df, keys).tolist() == record_key_texts(records, keys)
+
+
+def test_frame_key_texts_of_categorical_columns_match_plain_columns():
+    plain = pd.DataFrame({"geo_place_name": ["NY", None, "Bronx", "NY"], "unique_id": [1, 2, 3, 4]})
+    categorical = plain.astype({"geo_place_name": "category"})
+    keys = ["geo_place_name", "unique_id"]
+
+    assert frame_key_texts(categorical, keys).tolist() == frame_key_texts(plain, keys).tolist()
+    assert frame_key_texts(categorical.iloc[[1]], keys).tolist() == frame_key_texts(
+        plain.iloc[[1]], keys
+    ).tolist()
+
+
+def test_deduplicate_frame_keeps_first_occurrence_across_chunks():
+    keys = ["unique_id", "start_date"]
+    df = pd.DataFrame(
+        {
+            "unique_id": [1, 1, 2, 3, 2, 4],
+            "start_date": pd.to_datetime(["2020-01-01"] * 6),
+            "data_value": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+    expected = deduplicate_records(df.to_dict(orient="records"), keys)
+
+    for seen in (set(), CompactDeduplicator()):
+        first, first_dups = deduplicate_frame(df.iloc[:3], keys, seen=seen)
+        second, second_dups = deduplicate_frame(df.iloc[3:], keys, seen=seen)
+
+        assert pd.concat([first, second]).to_dict(orient="records") == expected
+        assert (first_dups, second_dups) == (1, 1)
+
+
+def test_deduplicate_frame_missing_key_raises_error():
+    with pytest.raises(KeyError, match="Deduplication key 'start_date' missing"):
+        deduplicate_frame(pd.DataFrame({"unique_id": [1]}), ["unique_id", "start_date"])
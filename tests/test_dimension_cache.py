@@ -0,0 +1,66 @@
+import pytest
+
+from ingestion import dimension_cache
+
+
+class FakeCursor:
+    def __init__(self, keys):
+        self.keys = keys
+        self.queries = []
+        self._result = []
+
+    def execute(self, sql):
+        self.queries.append(sql)
+        if "count(*)" in sql:
+            self._result = [(len(self.keys),)]
+        else:
+            self._result = [(k,) for k in self.keys]
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def dimension_cache_reset():
+    yield
+    dimension_cache.configure_dimension_cache(enabled=False)
+
+
+def test_filter_unseen_sends_only_new_keys(dimension_cache_reset):
+    dimension_cache.configure_dimension_cache(enabled=True)
+    cur = FakeCursor([365, 375])
+    rows = [{"indicator_id": 365}, {"indicator_id": 375}, {"indicator_id": 999}]
+
+    unseen, hits = dimension_cache.filter_unseen(cur, "indicators", rows, "indicator_id")
+    dimension_cache.filter_unseen(cur, "indicators", rows, "indicator_id")
+
+    assert unseen == [{"indicator_id": 999}]
+    assert hits == 2
+    assert len(cur.queries) == 1  # warmed once per process
+    assert dimension_cache.get_stats() == {"hits": 4, "misses": 2}
+
+
+def test_remember_persists_and_stale_disk_cache_is_reloaded(tmp_path, dimension_cache_reset):
+    path = str(tmp_path / "keys.json")
+    dimension_cache.configure_dimension_cache(enabled=True, path=path)
+    dimension_cache.filter_unseen(FakeCursor([]), "geographic", [], "geo_join_id")
+    dimension_cache.remember("geographic", [101, 102])
+
+    # new process: disk cache matches the table
+    dimension_cache.configure_dimension_cache(enabled=True, path=path)
+    cur = FakeCursor([101, 102])
+    unseen, hits = dimension_cache.filter_unseen(
+        cur, "geographic", [{"geo_join_id": 101}], "geo_join_id"
+    )
+    assert hits == 1
+    assert cur.queries == ["SELECT count(*) FROM geographic;"]
+
+    # new process after the tables were reset: disk cache is ignored
+    dimension_cache.configure_dimension_cache(enabled=True, path=path)
+    unseen, hits = dimension_cache.filter_unseen(
+        FakeCursor([]), "geographic", [{"geo_join_id": 101}], "geo_join_id"
+    )
+    assert hits == 0
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from db import export
+from db.export import FrameWriter, OneHotWriter, load_one_hot, one_hot
+
+NAMES = ["NO2", "Ozone", "PM2.5"]
+
+CHUNKS = [
+    pd.DataFrame({
+        "unique_id": np.array([1, 2, 3]),
+        "geo_join_id": np.array([10, 11, 12]),
+        "name": pd.Categorical(["PM2.5", "NO2", None]),
+    }),
+    pd.DataFrame({
+        "unique_id": np.array([4, 5]),
+        "geo_join_id": np.array([np.nan, 13.0]),  # int64 column with a NULL
+        "name": pd.Categorical(["Ozone", "Benzene"]),
+    }),
+]
+
+
+def test_one_hot_gives_every_chunk_the_same_columns():
+    first, second = (one_hot(c, "name", NAMES, drop_first=True) for c in CHUNKS)
+
+    assert first.columns.tolist() == second.columns.tolist() == [
+        "unique_id", "geo_join_id", "name_Ozone", "name_PM2.5"
+    ]
+    assert first["name_PM2.5"].tolist() == [1, 0, 0]
+    assert second["name_Ozone"].tolist() == [1, 0]
+
+
+def test_frame_writer_csv_appends_chunks(tmp_path):
+    path = str(tmp_path / "out.csv")
+
+    with FrameWriter(path, "csv") as writer:
+        for chunk in CHUNKS:
+            writer.write(chunk)
+
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines == ["unique_id,geo_join_id,name", "1,10,PM2.5", "2,11,NO2", "3,12,", "4,,Ozone", "5,13,Benzene"]
+
+
+def test_frame_writer_parquet_keeps_types_across_chunks(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "out.parquet")
+
+    with FrameWriter(path, "parquet") as writer:
+        for chunk in CHUNKS:
+            writer.write(chunk)
+
+    df = pd.read_parquet(path)
+    assert df["unique_id"].tolist() == [1, 2, 3, 4, 5]
+    assert df["geo_join_id"].isna().tolist() == [False, False, False, True, False]
+    assert df["name"].astype(object).tolist()[:2] == ["PM2.5", "NO2"]
+
+
+def test_frame_writer_parquet_first_chunk_all_null(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "out.parquet")
+
+    with FrameWriter(path, "parquet") as writer:
+        # what db.frames gave an all-NULL text chunk before: float64 categories
+        writer.write(pd.DataFrame({"message": pd.Categorical([None, None]), "note": [None, None]}))
+        writer.write(pd.DataFrame({"message": pd.Categorical(["x", "y"]), "note": ["a", None]}))
+
+    df = pd.read_parquet(path)
+    assert df["message"].astype(object).tolist()[2:] == ["x", "y"]
+    assert df["note"].tolist()[2] == "a"
+
+
+def test_frame_writer_parquet_streams_all_null_text_chunk(tmp_path):
+    pytest.importorskip("pyarrow")
+    from db import frames
+
+    chunks = [
+        frames._chunk_frame([(1, None), (2, None)], ["unique_id", "message"], ["int64", "category"], 0),
+        frames._chunk_frame([(3, "x"), (4, "y")], ["unique_id", "message"], ["int64", "category"], 2),
+    ]
+    path = str(tmp_path / "out.parquet")
+
+    with FrameWriter(path, "parquet") as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+
+    df = pd.read_parquet(path)
+    assert df["message"].astype(object).tolist()[2:] == ["x", "y"]
+    assert frames._combine([c["message"] for c in chunks]).tolist()[2:] == ["x", "y"]
+
+
+def test_frame_writer_discards_partial_export(tmp_path):
+    path = tmp_path / "out.csv"
+
+    with pytest.raises(RuntimeError):
+        with FrameWriter(str(path), "csv") as writer:
+            writer.write(CHUNKS[0])
+            raise RuntimeError("query failed")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_one_hot_writer_stores_csr_with_vocabulary(tmp_path):
+    path = str(tmp_path / "onehot.npz")
+
+    with OneHotWriter(path, "name", NAMES) as writer:
+        for chunk in CHUNKS:
+            writer.write(chunk)
+
+    indptr, indices, shape, columns, row_ids = load_one_hot(path)
+    assert shape == (5, 3)
+    assert columns == NAMES
+    assert row_ids.tolist() == [1, 2, 3, 4, 5]
+    # missing and unknown names leave their row empty
+    assert indptr.tolist() == [0, 1, 2, 2, 3, 3]
+    assert indices.tolist() == [2, 0, 1]
+    with np.load(path) as npz:
+        assert npz["data"].tolist() == [1, 1, 1]
+        assert npz["format"].item() == b"csr"
+
+
+def test_one_hot_writer_file_loads_with_scipy(tmp_path):
+    sparse = pytest.importorskip("scipy.sparse")
+    path = str(tmp_path / "onehot.npz")
+
+    with OneHotWriter(path, "name", NAMES) as writer:
+        for chunk in CHUNKS:
+            writer.write(chunk)
+
+    matrix = sparse.load_npz(path)
+    assert matrix.format == "csr"
+    assert matrix.toarray().tolist() == [[0, 0, 1], [1, 0, 0], [0, 0, 0], [0, 1, 0], [0, 0, 0]]
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        export.resolve_format("xlsx")
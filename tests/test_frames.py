@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+
+import pandas as pd
+
+from db import frames
+
+# (name, type_code) as in cursor.description
+DESCRIPTION = [("unique_id", 23), ("geo_join_id", 23), ("start_date", 1082), ("data_value", 1700), ("name", 25)]
+ROWS = [
+    (1, 10, "2014-01-01", 12.5, "PM2.5"),
+    (2, None, "2014-06-01", None, "NO2"),
+    (3, 11, None, 7.0, "PM2.5"),
+]
+
+
+class FakeNamedCursor:
+    def __init__(self, log, rows):
+        self.log = log
+        self.rows = list(rows)
+        self.description = None
+
+    def execute(self, query, params=None):
+        self.log.append(query)
+
+    def fetchmany(self, size):
+        self.description = DESCRIPTION
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, log, rows=ROWS):
+        self.log = log
+        self.rows = rows
+
+    def cursor(self, name=None):
+        assert name  # server-side cursor
+        return FakeNamedCursor(self.log, self.rows)
+
+
+def test_stream_frame_builds_typed_columns_across_chunks(monkeypatch):
+    monkeypatch.setattr(frames, "_register_casters", lambda cur: None)
+
+    df = frames.stream_frame(FakeConn([]), "SELECT 1", chunk_rows=2)
+
+    assert df["unique_id"].dtype == "int64"
+    assert df["geo_join_id"].dtype == "float64"  # NULL in the second chunk
+    assert df["start_date"].dtype == "datetime64[ns]"
+    assert df["data_value"].dtype == "float64"
+    assert isinstance(df["name"].dtype, pd.CategoricalDtype)
+    assert df["name"].tolist() == ["PM2.5", "NO2", "PM2.5"]
+    assert df["start_date"].isna().tolist() == [False, False, True]
+
+
+def test_stream_frame_empty_result_keeps_columns(monkeypatch):
+    monkeypatch.setattr(frames, "_register_casters", lambda cur: None)
+
+    df = frames.stream_frame(FakeConn([], rows=[]), "SELECT 1", dtypes={"name": "object"})
+
+    assert df.columns.tolist() == [name for name, _ in DESCRIPTION]
+    assert df.empty
+    assert df["start_date"].dtype == "datetime64[ns]"
+    assert df["name"].dtype == object
+
+
+def test_read_frame_fetches_each_query_once(monkeypatch):
+    log = []
+
+    @contextmanager
+    def fake_connection():
+        yield FakeConn(log)
+
+    monkeypatch.setattr(frames, "get_connection", fake_connection)
+    monkeypatch.setattr(frames, "_register_casters", lambda cur: None)
+    frames.clear_frame_cache()
+
+    first = frames.read_table("measurements")
+    first["month"] = first["start_date"].dt.month
+    second = frames.read_frame("SELECT *  FROM measurements;")
+
+    assert log == ["SELECT * FROM measurements;"]
+    assert "month" not in second.columns
+    frames.clear_frame_cache()
@@ -0,0 +1,45 @@
+import pandas as pd
+
+import injestion_pt1
+
+CFG = {
+    "data_source": {"chunk_size": 2},
+    "deduplication": {"enabled": True, "keys": ["unique_id"]},
+    "incremental": {"enabled": True, "row_hashes": True},
+    "database": {},
+}
+
+
+def chunk(ids, values):
+    valid_df = pd.DataFrame({"unique_id": ids, "data_value": values})
+    return len(ids), valid_df, pd.DataFrame({"error_reason": pd.Series(dtype=object)})
+
+
+def test_row_hashes_never_replace_a_row_with_a_dropped_duplicate(monkeypatch):
+    # Stored values from the last run; unique_id 1 is unchanged in the first chunk
+    stored = {1: 1.5, 2: 2.5}
+    loads = []
+
+    def fake_filter_changed_rows(src_path, valid_df):
+        previous = valid_df["unique_id"].map(stored)
+        changed = previous.isna() | (previous != valid_df["data_value"])
+        replace_ids = valid_df.loc[changed & previous.notna(), "unique_id"].tolist()
+        return valid_df[changed], replace_ids, pd.Series(0, index=valid_df.index[changed])
+
+    def fake_load_records(**kwargs):
+        loads.append((kwargs["valid_records"]["unique_id"].tolist(), kwargs["replace_ids"]))
+        return {}
+
+    monkeypatch.setattr(injestion_pt1, "start_run", lambda source_file: 1)
+    monkeypatch.setattr(injestion_pt1, "finish_run", lambda **kwargs: None)
+    monkeypatch.setattr(injestion_pt1, "filter_changed_rows", fake_filter_changed_rows)
+    monkeypatch.setattr(injestion_pt1, "save_row_hashes", lambda *args: None)
+    monkeypatch.setattr(injestion_pt1, "load_records", fake_load_records)
+    monkeypatch.setattr(injestion_pt1.metrics, "finish_run_metrics", lambda run_id: {})
+
+    chunks = [chunk([1, 2], [1.5, 9.0]), chunk([1, 3], [7.0, 3.5])]
+    injestion_pt1.ingest_file(CFG, "a.csv", iter(chunks))
+
+    # the changed repeat of unique_id 1 in the second chunk is a dropped duplicate:
+    # it neither wins over the first occurrence nor deletes the stored row
+    assert loads == [([2], [2]), ([3], [])]
@@ -0,0 +1,320 @@
+import datetime
+from contextlib import contextmanager
+
+import pandas as pd
+import pytest
+
+from ingestion import loader
+from ingestion.loader import (
+    build_insert_select_sql,
+    build_reject_rows,
+    cap_rejects,
+    copy_rows,
+    extract_dimension_data,
+    frame_to_measurements,
+    map_measurement,
+    partition_rows,
+)
+from ingestion.validate import frame_to_records
+
+
+class FakeCursor:
+    def __init__(self):
+        self.sql = None
+        self.data = None
+
+    def copy_expert(self, sql, buf):
+        self.sql = sql
+        self.data = buf.read()
+
+
+def test_build_insert_select_sql_keeps_staging_order():
+    sql = build_insert_select_sql(
+        "indicators", "stage_indicators", ["indicator_id", "name"], conflict_target="indicator_id"
+    )
+
+    assert sql == (
+        "INSERT INTO indicators (indicator_id, name) "
+        "SELECT indicator_id, name FROM stage_indicators ORDER BY stage_seq "
+        "ON CONFLICT (indicator_id) DO NOTHING"
+    )
+
+
+def test_copy_rows_writes_csv_with_nulls():
+    cur = FakeCursor()
+    rows = [
+        {"unique_id": 1, "start_date": datetime.date(2020, 1, 1), "data_value": float("nan")},
+        {"unique_id": 2, "start_date": None, "data_value": 1.5, "name": "a, b"},
+    ]
+
+    sent = copy_rows(cur, "stage_measurements", ["unique_id", "start_date", "data_value"], rows)
+
+    assert sent == 2
+    assert cur.sql.startswith("COPY stage_measurements (unique_id, start_date, data_value) FROM STDIN")
+    assert cur.data.splitlines() == ["1,2020-01-01,", "2,,1.5"]
+
+
+def test_extract_dimension_data_frame_matches_records():
+    records = [
+        {"indicator_id": 375, "name": "NO2", "measure": "Mean"},
+        {"indicator_id": 365, "name": "PM2.5", "measure": "Mean"},
+        {"indicator_id": 375, "name": "NO2 (later)", "measure": "Mean"},
+        {"indicator_id": 0, "name": "no id", "measure": None},
+    ]
+    key_map = {"indicator_id": "indicator_id", "name": "name"}
+
+    from_frame = extract_dimension_data(pd.DataFrame(records), key_map, "indicator_id")
+
+    assert from_frame == extract_dimension_data(records, key_map, "indicator_id")
+    assert [type(r["indicator_id"]) for r in from_frame] == [int, int]
+
+
+def test_partition_rows_keeps_replace_ids_with_their_rows():
+    rows = [{"unique_id": i} for i in range(1, 101)]
+
+    for method in ("hash", "range"):
+        parts = partition_rows(rows, [5, 60], 4, partition_by=method)
+
+        assert sorted(r["unique_id"] for p, _ in parts for r in p) == list(range(1, 101))
+        for p, ids in parts:
+            keys = {r["unique_id"] for r in p}
+            assert set(ids) <= keys
+
+    ranges = partition_rows(rows, None, 4, partition_by="range")
+    assert [len(p) for p, _ in ranges] == [25, 25, 25, 25]
+    assert max(r["unique_id"] for r in ranges[0][0]) < min(r["unique_id"] for r in ranges[1][0])
+
+
+def test_frame_to_measurements_matches_record_mapping():
+    df = pd.DataFrame(
+        {
+            "unique_id": [1, 2],
+            "indicator_id": [375, 365],
+            "geo_join_id": [101.0, float("nan")],
+            "time_period": pd.Series(["2019", None], dtype="category"),
+            "start_date": pd.to_datetime(["2019-01-01", "2019-01-01"]),
+            "data_value": [1.5, float("nan")],
+        }
+    )
+
+    rows = frame_to_measurements(df, run_id=7)
+
+    assert rows == [map_measurement(r, 7) for r in frame_to_records(df)]
+    assert rows[1] == (2, 365, None, None, datetime.date(2019, 1, 1), None, None, 7)
+    assert rows[0].start_date is rows[1].start_date
+
+
+def test_copy_rows_and_partition_rows_take_measurement_tuples():
+    rows = frame_to_measurements(
+        pd.DataFrame({"unique_id": [1, 2], "indicator_id": [375, 375], "data_value": [1.5, None]}),
+        run_id=3,
+    )
+    cur = FakeCursor()
+
+    copy_rows(cur, "stage_measurements", ["unique_id", "data_value", "run_id"], rows)
+    parts = partition_rows(rows, [2], 2, partition_by="range")
+
+    assert cur.data.splitlines() == ["1,1.5,3", "2,,3"]
+    assert [([r.unique_id for r in p], ids) for p, ids in parts] == [([1], []), ([2], [2])]
+
+
+def test_reject_rows_from_frame_match_record_serialization():
+    import json
+
+    rejected_df = pd.DataFrame(
+        {
+            "unique_id": pd.Series([1, "x"], dtype=object),
+            "name": pd.Series([None, "O3"], dtype="category"),
+            "data_value": [float("nan"), 2.5],
+            "start_date": ["12/01/2014", None],
+            "error_reason": ["Missing required field: name", "Invalid integer field"],
+        }
+    )
+
+    from_frame = build_reject_rows(rejected_df, run_id=4, source_file="a.csv")
+    from_records = build_reject_rows(frame_to_records(rejected_df), run_id=4, source_file="a.csv")
+
+    assert [r._replace(raw_record=json.loads(r.raw_record)) for r in from_frame] == [
+        r._replace(raw_record=json.loads(r.raw_record)) for r in from_records
+    ]
+    assert json.loads(from_frame[0].raw_record) == {
+        "unique_id": 1, "name": None, "data_value": None, "start_date": "12/01/2014"
+    }
+
+
+
+def test_copy_reject_rows_escapes_text_format():
+    rows = build_reject_rows(
+        pd.DataFrame({"name": ["a\tb\\c"], "error_reason": ["Missing required field: x"]}),
+        run_id=4,
+        source_file="a.csv",
+    )
+    cur = FakeCursor()
+
+    sent = loader.copy_reject_rows(cur, "ingestion_rejects", rows)
+
+    assert sent == 1
+    assert cur.sql == (
+        "COPY ingestion_rejects (run_id, raw_record, error_reason, source_file) FROM STDIN"
+    )
+    # JSON escapes the tab and backslash; COPY doubles the backslashes again
+    assert cur.data == '4\t{"name":"a\\\\tb\\\\\\\\c"}\tMissing required field: x\ta.csv\n'
+
+
+def test_cap_rejects_keeps_first_rows_per_reason_across_chunks():
+    stored = {}
+    chunk = pd.DataFrame({"unique_id": range(5), "error_reason": ["a", "b", "a", "a", "b"]})
+
+    first = cap_rejects(chunk, 2, stored)
+    second = cap_rejects(chunk, 2, stored)
+
+    assert first["unique_id"].tolist() == [0, 1, 2, 4]
+    assert second.empty
+    assert stored == {"a": 2, "b": 2}
+    assert cap_rejects(chunk, None, stored) is chunk
+
+
+class FakeConn:
+    def __init__(self, log, fail_commit=False):
+        self.log = log
+        self.fail_commit = fail_commit
+
+    def cursor(self):
+        return FakeWriteCursor(self.log)
+
+    def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("commit failed")
+        self.log.append("commit")
+
+
+class FakeWriteCursor:
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = 0
+        self.params = None
+
+    def execute(self, sql, params=None):
+        self.log.append(sql.split()[0])
+        self.params = params
+
+    def close(self):
+        pass
+
+
+def test_load_measurement_partitions_compensates_committed_partitions(monkeypatch):
+    log = []
+    compensation = FakeConn(log)
+    compensation_cur = FakeWriteCursor(log)
+    compensation.cursor = lambda: compensation_cur
+    conns = iter([FakeConn(log), FakeConn(log, fail_commit=True), compensation])
+    xids = iter([101, 102])
+
+    @contextmanager
+    def fake_connection():
+        yield next(conns)
+
+    monkeypatch.setattr(loader, "get_connection", fake_connection)
+    monkeypatch.setattr(loader, "execute_batch", lambda cur, sql, rows, page_size: None)
+    monkeypatch.setattr(loader.aggregates, "current_xid", lambda cur: next(xids))
+    rows = [{"unique_id": i, "run_id": 7} for i in range(1, 11)]
+
+    with pytest.raises(RuntimeError, match="commit failed"):
+        loader.load_measurement_partitions(7, rows, None, 2, partition_by="range")
+
+    # first partition committed, second failed, third connection undoes the first
+    assert log == ["commit", "DELETE", "commit"]
+    # matched by the committed transaction, so earlier chunks of run 7 stay
+    assert compensation_cur.params[1] == [101]
+
+
+def test_load_measurement_partitions_aggregates_after_commits(monkeypatch):
+    log = []
+    conns = iter([FakeConn(log), FakeConn(log)])
+
+    @contextmanager
+    def fake_connection():
+        yield next(conns)
+
+    def record_xid(cur):
+        log.append("xid")
+        return 1
+
+    monkeypatch.setattr(loader, "get_connection", fake_connection)
+    monkeypatch.setattr(loader, "execute_batch", lambda cur, sql, rows, page_size: None)
+    monkeypatch.setattr(loader.aggregates, "current_xid", record_xid)
+    monkeypatch.setattr(loader.aggregates, "_enabled", True)
+    rows = [{"unique_id": i, "run_id": 7} for i in range(1, 11)]
+
+    loader.load_measurement_partitions(7, rows, None, 2, partition_by="range")
+
+    # aggregate rows are only locked once both partitions committed
+    assert log == ["xid", "xid", "commit", "commit", "INSERT", "commit"]
+
+
+class TransactionConn:
+    """Keeps statements pending until commit, like a real transaction."""
+
+    def __init__(self, committed, fail_commit=False):
+        self.committed = committed
+        self.pending = []
+        self.fail_commit = fail_commit
+
+    def cursor(self):
+        return TransactionCursor(self.pending)
+
+    def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("commit failed")
+        self.committed.extend(self.pending)
+        self.pending.clear()
+
+    def rollback(self):
+        self.pending.clear()
+
+
+class TransactionCursor:
+    def __init__(self, pending):
+        self.pending = pending
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.pending.append(" ".join(sql.split()[:3]))
+
+    def close(self):
+        pass
+
+
+def test_failed_partitioned_load_leaves_no_rejects(monkeypatch):
+    committed = []
+    conns = iter([
+        TransactionConn(committed),  # dimensions and rejects
+        TransactionConn(committed),  # partition 1
+        TransactionConn(committed, fail_commit=True),  # partition 2
+        TransactionConn(committed),  # compensation
+    ])
+
+    @contextmanager
+    def fake_connection():
+        yield next(conns)
+
+    def fake_execute_batch(cur, sql, rows, page_size):
+        cur.execute(sql)
+
+    monkeypatch.setattr(loader, "get_connection", fake_connection)
+    monkeypatch.setattr(loader, "get_pool", lambda: type("Pool", (), {"maxconn": 4}))
+    monkeypatch.setattr(loader, "execute_batch", fake_execute_batch)
+    monkeypatch.setattr(loader.aggregates, "current_xid", lambda cur: 101)
+    valid = [
+        {"unique_id": i, "indicator_id": 365, "name": "PM2.5", "geo_join_id": 101, "start_date": "2014-12-01"}
+        for i in range(1, 11)
+    ]
+    rejected = [{"unique_id": 11, "error_reason": "Missing required field: name"}]
+
+    with pytest.raises(RuntimeError, match="commit failed"):
+        loader.load_records(7, valid, rejected, "a.csv", partitions=2, partition_by="range")
+
+    assert not any("ingestion_rejects" in sql for sql in committed)
+    assert "INSERT INTO indicators" in committed
+    # the partition that committed was taken back out
+    assert committed[-1] == "DELETE FROM measurements"
@@ -0,0 +1,31 @@
+import hashlib
+
+import pandas as pd
+
+from ingestion.manifest import compute_content_hash, compute_row_hashes
+
+
+def test_compute_content_hash_matches_sha256(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_bytes(b"unique_id\n1\n2\n")
+
+    assert compute_content_hash(str(path), block_size=4) == hashlib.sha256(b"unique_id\n1\n2\n").hexdigest()
+
+
+def test_compute_row_hashes_detects_changed_rows_only():
+    before = pd.DataFrame({"unique_id": [1, 2], "data_value": [1.5, 2.5], "message": [None, None]})
+    after = pd.DataFrame({"unique_id": [1, 2], "data_value": [1.5, 3.0], "message": [None, None]})
+
+    h1 = compute_row_hashes(before)
+    h2 = compute_row_hashes(after)
+
+    assert h1.dtype == "int64"
+    assert h1[0] == h2[0]
+    assert h1[1] != h2[1]
+
+
+def test_compute_row_hashes_ignores_dtype_and_column_order():
+    as_float = pd.DataFrame({"unique_id": [1], "message": [float("nan")]})
+    as_object = pd.DataFrame({"message": pd.Series([None], dtype=object), "unique_id": [1]})
+
+    assert compute_row_hashes(as_float)[0] == compute_row_hashes(as_object)[0]
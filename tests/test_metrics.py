@@ -0,0 +1,54 @@
+import threading
+
+from ingestion import metrics
+from ingestion.parallel import iter_validated_chunks, read_and_validate_file
+from tests.test_parallel import VALIDATION, write_csv
+
+
+def test_timed_sums_calls_across_threads():
+    metrics.reset()
+
+    def work():
+        for _ in range(50):
+            with metrics.timed("dedup", 2):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = metrics.snapshot()["dedup"]
+    assert stats["calls"] == 200
+    assert stats["rows"] == 400
+    assert stats["process_peak_rss_mb"] > 0
+
+
+def test_reading_and_validation_are_recorded(tmp_path):
+    path = tmp_path / "a.csv"
+    write_csv(path, list(range(1, 11)))
+    metrics.reset()
+
+    list(iter_validated_chunks(str(path), VALIDATION, chunk_size=4))
+
+    stages = metrics.snapshot()
+    assert list(stages) == ["read", "validate"]
+    assert stages["read"]["rows"] == stages["validate"]["rows"] == 10
+    assert stages["read"]["calls"] == 3
+
+
+def test_worker_snapshot_merges_into_run(tmp_path):
+    path = tmp_path / "a.csv"
+    write_csv(path, list(range(1, 11)))
+
+    _, worker_stages = read_and_validate_file(str(path), VALIDATION, chunk_size=5)
+    metrics.reset()
+    metrics.record("dedup", 0.5, 10)
+    metrics.merge(worker_stages)
+    metrics.merge(worker_stages)
+
+    stages = metrics.snapshot()
+    assert list(stages) == ["read", "validate", "dedup"]
+    assert stages["validate"]["rows"] == 20
+    assert stages["dedup"]["rows_per_sec"] == 20
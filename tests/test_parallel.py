@@ -0,0 +1,68 @@
+import pandas as pd
+
+from ingestion.parallel import iter_validated_chunks, map_files
+
+VALIDATION = {
+    "required_fields": ["unique_id", "indicator_id", "name", "geo_place_name", "start_date"],
+    "numeric_fields": ["data_value"],
+    "date_fields": ["start_date"],
+}
+
+
+def write_csv(path, ids):
+    pd.DataFrame(
+        {
+            "Unique ID": ids,
+            "Indicator ID": [365] * len(ids),
+            "Name": ["PM2.5"] * len(ids),
+            "Geo Type Name": ["UHF42"] * len(ids),
+            "Geo Place Name": ["Bronx"] * len(ids),
+            "Start_Date": ["12/01/2014"] * len(ids),
+            "Data Value": [1.5] * len(ids),
+        }
+    ).to_csv(path, index=False)
+
+
+def test_iter_validated_chunks_force_reject(tmp_path):
+    path = tmp_path / "a.csv"
+    write_csv(path, [1, 2, 3])
+
+    chunks = list(iter_validated_chunks(str(path), VALIDATION, chunk_size=2, force_reject=True))
+
+    assert [c[0] for c in chunks] == [3, 1]
+    assert list(chunks[0][2]["error_reason"]) == ["Missing required field: name"]
+
+
+def test_map_files_returns_every_file(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"f{i}.csv"
+        write_csv(path, [i * 10 + 1, i * 10 + 2])
+        paths.append(str(path))
+
+    results = {path: future.result() for path, future in map_files(paths, VALIDATION, workers=2)}
+
+    assert sorted(results) == paths
+    for chunks, worker_metrics in results.values():
+        read_count, valid_df, rejected_df = chunks[0]
+        assert worker_metrics["validate"]["rows"] == 2
+        assert read_count == 2
+        assert len(valid_df) == 2
+        assert rejected_df.empty
+
+
+def test_iter_sharded_chunks_matches_single_process(tmp_path):
+    from ingestion.parallel import iter_sharded_chunks
+    from ingestion.read import read_csv_frame
+    from ingestion.validate import validate_dataframe
+
+    path = tmp_path / "big.csv"
+    write_csv(path, list(range(1, 201)))
+
+    shards = list(iter_sharded_chunks(str(path), VALIDATION, shard_bytes=1000, workers=2))
+    merged = pd.concat([valid_df for _, valid_df, _ in shards], ignore_index=True)
+    expected, _ = validate_dataframe(read_csv_frame(str(path)), **VALIDATION)
+
+    assert len(shards) > 1
+    assert sum(read_count for read_count, _, _ in shards) == 200
+    pd.testing.assert_frame_equal(merged, expected.reset_index(drop=True))
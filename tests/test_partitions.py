@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+
+from db import partitions
+
+
+class FakeCursor:
+    def __init__(self, existing, log):
+        self.existing = existing
+        self.log = log
+        self._result = None
+
+    def execute(self, sql, params=None):
+        if sql.startswith("SELECT to_regclass"):
+            self._result = (params[0] in self.existing,)
+        else:
+            self.log.append(sql)
+
+    def fetchone(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, existing, log):
+        self.existing = existing
+        self.log = log
+
+    def cursor(self):
+        return FakeCursor(self.existing, self.log)
+
+    def commit(self):
+        self.log.append("commit")
+
+    def rollback(self):
+        self.log.append("rollback")
+
+
+def test_partition_bounds_and_names():
+    assert partitions.partition_bounds(date(2014, 6, 1)) == (date(2014, 1, 1), date(2015, 1, 1))
+    assert partitions.partition_bounds(date(2014, 12, 31), "month") == (
+        date(2014, 12, 1),
+        date(2015, 1, 1),
+    )
+    assert partitions.partition_name("measurements", date(2014, 1, 1)) == "measurements_2014"
+    assert partitions.partition_name("measurements", date(2014, 3, 1), "month") == "measurements_2014_03"
+    assert partitions.create_partition_sql(
+        "measurements", date(2014, 1, 1), date(2015, 1, 1), "measurements_2014"
+    ) == (
+        "CREATE TABLE IF NOT EXISTS measurements_2014 PARTITION OF measurements "
+        "FOR VALUES FROM ('2014-01-01') TO ('2015-01-01');"
+    )
+    with pytest.raises(ValueError):
+        partitions.partition_bounds(date(2014, 1, 1), "week")
+
+
+def test_ensure_partitions_creates_missing_once(monkeypatch):
+    log = []
+    conn = FakeConn({"measurements_2013"}, log)
+
+    @contextmanager
+    def fake_connection():
+        yield conn
+
+    monkeypatch.setattr(partitions, "get_connection", fake_connection)
+    partitions.reset()
+    days = [date(2013, 5, 1), date(2014, 1, 1), date(2014, 7, 1), None]
+
+    created = partitions.ensure_partitions("measurements", days)
+    again = partitions.ensure_partitions("measurements", days)
+
+    assert created == ["measurements_2014"]
+    assert again == []  # known partitions are not checked again
+    assert log == [
+        "CREATE TABLE IF NOT EXISTS measurements_2014 PARTITION OF measurements "
+        "FOR VALUES FROM ('2014-01-01') TO ('2015-01-01');",
+        "commit",
+    ]
+    partitions.reset()
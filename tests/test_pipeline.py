@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from ingestion import pipeline
+from ingestion.parallel import iter_validated_chunks
+from ingestion.pipeline import iter_pipelined_chunks
+from tests.test_parallel import VALIDATION, write_csv
+
+
+def reader_running():
+    return any(t.name == "pipeline-reader" for t in threading.enumerate())
+
+
+def test_pipelined_chunks_match_sequential_order(tmp_path):
+    path = tmp_path / "a.csv"
+    write_csv(path, list(range(1, 101)))
+
+    piped = list(
+        iter_pipelined_chunks(str(path), VALIDATION, chunk_size=7, validate_workers=3, queue_size=1)
+    )
+    serial = list(iter_validated_chunks(str(path), VALIDATION, chunk_size=7))
+
+    assert [c[1]["unique_id"].tolist() for c in piped] == [
+        c[1]["unique_id"].tolist() for c in serial
+    ]
+    assert not reader_running()
+
+
+def test_pipelined_chunks_raise_reader_errors(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_pipelined_chunks(str(tmp_path / "missing.csv"), VALIDATION, chunk_size=5))
+    assert not reader_running()
+
+
+def test_pipelined_chunks_raise_validation_errors(tmp_path, monkeypatch):
+    path = tmp_path / "a.csv"
+    write_csv(path, list(range(1, 21)))
+
+    def broken(raw_df, validation, force_reject):
+        raise ValueError("bad chunk")
+
+    monkeypatch.setattr(pipeline, "validate_frame", broken)
+
+    with pytest.raises(ValueError, match="bad chunk"):
+        list(iter_pipelined_chunks(str(path), VALIDATION, chunk_size=5))
+    assert not reader_running()
+
+
+def test_closing_pipelined_chunks_stops_reader(tmp_path):
+    path = tmp_path / "a.csv"
+    write_csv(path, list(range(1, 101)))
+
+    chunks = iter_pipelined_chunks(str(path), VALIDATION, chunk_size=2, queue_size=1)
+    next(chunks)
+    chunks.close()
+
+    assert not reader_running()
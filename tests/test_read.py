@@ -57,4 +57,293 @@ def test_read_csv_file_not_found():
     """
 
     with pytest.raises(Exception):
-        read_csv("non_existent_file.csv")
\ No newline at end of file
+        read_csv("non_existent_file.csv")
+
+def test_iter_csv_chunks_yields_bounded_chunks(tmp_path):
+    """
+    Verify iter_csv_chunks streams the file in normalized chunks.
+    """
+    from ingestion.read import iter_csv_chunks
+
+    test_file = tmp_path / "test_chunks.csv"
+    pd.DataFrame({"Unique ID": range(5), "Geo Place Name": ["NY"] * 5}).to_csv(
+        test_file, index=False
+    )
+
+    chunks = list(iter_csv_chunks(str(test_file), chunk_size=2))
+
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert list(chunks[0].columns) == ["unique_id", "geo_place_name"]
+
+
+def test_iter_csv_chunks_without_chunk_size_reads_whole_file(tmp_path):
+    from ingestion.read import iter_csv_chunks
+
+    test_file = tmp_path / "test_whole.csv"
+    pd.DataFrame({"Unique ID": range(5)}).to_csv(test_file, index=False)
+
+    chunks = list(iter_csv_chunks(str(test_file)))
+
+    assert len(chunks) == 1
+    assert len(chunks[0]) == 5
+
+
+def test_resolve_source_files_accepts_dir_glob_and_file(tmp_path):
+    from ingestion.read import resolve_source_files
+
+    for name in ("b.csv", "a.csv", "notes.txt"):
+        (tmp_path / name).write_text("x\n1\n", encoding="utf-8")
+
+    expected = [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+
+    assert resolve_source_files(str(tmp_path)) == expected
+    assert resolve_source_files(str(tmp_path / "*.csv")) == expected
+    assert resolve_source_files(str(tmp_path / "a.csv")) == expected[:1]
+
+    with pytest.raises(FileNotFoundError):
+        resolve_source_files(str(tmp_path / "*.json"))
+
+
+def test_csv_shards_match_single_read(tmp_path):
+    """
+    Verify byte-range shards cover every row exactly once, header handled once.
+    """
+    from ingestion.read import plan_csv_shards, read_csv_shard, read_csv_frame
+
+    test_file = tmp_path / "test_shards.csv"
+    pd.DataFrame(
+        {
+            "Unique ID": range(100),
+            "Measure Info": ["per 100,000 adults"] * 100,
+            "Data Value": [i / 3 for i in range(100)],
+        }
+    ).to_csv(test_file, index=False)
+
+    header, ranges = plan_csv_shards(str(test_file), shard_bytes=200)
+    shards = [read_csv_shard(str(test_file), start, end, header) for start, end in ranges]
+
+    assert len(ranges) > 1
+    assert pd.concat(shards, ignore_index=True).equals(read_csv_frame(str(test_file)))
+
+
+def test_json_and_ndjson_chunks_match_csv_columns(tmp_path):
+    """
+    Verify JSON arrays and NDJSON stream in chunks with read_csv's column names.
+    """
+    import json
+
+    from ingestion.read import iter_json_records, iter_source_chunks
+
+    records = [
+        {"Unique ID": i, "Geo Place Name": f"Place [{i}], \"q\"", "Data Value": i / 2}
+        for i in range(7)
+    ]
+    json_file = tmp_path / "dump.json"
+    json_file.write_text(json.dumps(records, indent=2), encoding="utf-8")
+    ndjson_file = tmp_path / "dump.ndjson"
+    ndjson_file.write_text("\n".join(json.dumps(r) for r in records) + "\n\n", encoding="utf-8")
+
+    # Blocks smaller than one record force elements to span reads
+    assert list(iter_json_records(str(json_file), block_size=5)) == records
+
+    for path, fmt in ((json_file, "json"), (ndjson_file, "ndjson")):
+        chunks = list(iter_source_chunks(str(path), chunk_size=3, fmt=fmt))
+
+        assert [len(c) for c in chunks] == [3, 3, 1]
+        assert list(chunks[0].columns) == ["unique_id", "geo_place_name", "data_value"]
+        assert pd.concat(chunks)["geo_place_name"].tolist() == [
+            r["Geo Place Name"] for r in records
+        ]
+
+
+def test_json_reader_rejects_malformed_input(tmp_path):
+    from ingestion.read import get_chunk_reader, iter_json_records
+
+    bad_file = tmp_path / "bad.json"
+    bad_file.write_text('[{"a": 1} {"a": 2}]', encoding="utf-8")
+    truncated_file = tmp_path / "truncated.json"
+    truncated_file.write_text('[{"a": 1}, {"a": ', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_json_records(str(bad_file)))
+    with pytest.raises(ValueError):
+        list(iter_json_records(str(truncated_file), block_size=4))
+    with pytest.raises(ValueError, match="Unknown data_source.format"):
+        get_chunk_reader("xml")
+
+
+@pytest.fixture
+def pyarrow_engine():
+    pytest.importorskip("pyarrow")
+    from ingestion.read import configure_csv_engine
+
+    configure_csv_engine("pyarrow")
+    yield
+    configure_csv_engine("c")
+
+
+def test_pyarrow_engine_matches_c_engine(tmp_path, pyarrow_engine):
+    """
+    Verify the pyarrow engine yields the same chunks, columns and row numbers.
+    """
+    from ingestion.read import configure_csv_engine, iter_csv_chunks, plan_csv_shards, read_csv_shard
+
+    test_file = tmp_path / "test_engine.csv"
+    test_file.write_text(
+        "Unique ID,Name,Measure Info,Data Value,Message\n"
+        '1,NO2,"per 100,000 adults",23.97,\n'
+        "2,,ppb,1.5,\n"
+        "3,O3,ppb,,note\n",
+        encoding="utf-8",
+    )
+
+    arrow_chunks = list(iter_csv_chunks(str(test_file), chunk_size=2))
+    header, ranges = plan_csv_shards(str(test_file), shard_bytes=20)
+    arrow_shards = [read_csv_shard(str(test_file), a, b, header) for a, b in ranges]
+    configure_csv_engine("c")
+    c_chunks = list(iter_csv_chunks(str(test_file), chunk_size=2))
+
+    assert [len(c) for c in arrow_chunks] == [2, 1]
+    assert list(arrow_chunks[1].index) == [2]
+    for arrow_df, c_df in zip(arrow_chunks, c_chunks):
+        assert list(arrow_df.columns) == list(c_df.columns)
+        assert arrow_df["unique_id"].tolist() == c_df["unique_id"].tolist()
+        assert arrow_df["measure_info"].tolist() == c_df["measure_info"].tolist()
+        assert arrow_df["name"].isna().tolist() == c_df["name"].isna().tolist()
+        assert arrow_df["data_value"].isna().tolist() == c_df["data_value"].isna().tolist()
+    assert pd.concat(arrow_shards)["unique_id"].tolist() == [1, 2, 3]
+
+
+def test_pyarrow_engine_falls_back_to_strings_on_dirty_values(tmp_path, pyarrow_engine):
+    """
+    Verify a value that does not fit its declared type is kept for validation.
+    """
+    from ingestion.read import iter_csv_chunks, read_csv_frame
+
+    test_file = tmp_path / "test_dirty.csv"
+    test_file.write_text(
+        "Unique ID,Data Value\n1,1.5\n2,abc\n3,2.5\n", encoding="utf-8"
+    )
+
+    df = pd.concat(iter_csv_chunks(str(test_file), chunk_size=2))
+
+    assert df["unique_id"].astype(str).tolist() == ["1", "2", "3"]
+    assert df["data_value"].tolist() == ["1.5", "abc", "2.5"]
+    assert read_csv_frame(str(test_file))["data_value"].tolist() == ["1.5", "abc", "2.5"]
+
+
+def test_pyarrow_chunks_span_byte_ranges(tmp_path, pyarrow_engine, monkeypatch):
+    """
+    Verify chunks cut across byte ranges and a dirty value in a later range.
+    """
+    from ingestion import read
+
+    def single_threaded(*args, **kwargs):
+        raise AssertionError("open_csv is single-threaded")
+
+    monkeypatch.setattr(read.pa_csv, "open_csv", single_threaded)
+    rows = [f"{i},{i}.5" for i in range(1, 41)]
+    rows[30] = "31,abc"
+    test_file = tmp_path / "test_ranges.csv"
+    test_file.write_text("Unique ID,Data Value\n" + "\n".join(rows) + "\n", encoding="utf-8")
+
+    chunks = list(read._iter_arrow_csv_chunks(str(test_file), chunk_size=12, block_bytes=50))
+
+    # typed rows before the dirty range come out as a shorter chunk
+    assert [len(c) for c in chunks][:2] == [12, 12]
+    assert sum(len(c) for c in chunks) == 40
+    df = pd.concat(chunks)
+    assert list(df.index) == list(range(40))
+    assert df["data_value"].astype(str).tolist()[29:32] == ["30.5", "abc", "32.5"]
+    assert chunks[0]["data_value"].dtype == "float64"
+
+
+def test_pyarrow_chunks_keep_quoted_newlines_whole(tmp_path, pyarrow_engine):
+    """
+    Verify a quoted field with newlines across a byte range boundary is one value.
+    """
+    from ingestion import read
+
+    rows = [f'{i},"note {i}",{i}.5' for i in range(1, 21)]
+    rows[4] = '5,"line one\nline two\n""quoted"" line three",5.5'
+    test_file = tmp_path / "test_quoted.csv"
+    test_file.write_text("Unique ID,Message,Data Value\n" + "\n".join(rows) + "\n", encoding="utf-8")
+
+    chunks = list(read._iter_arrow_csv_chunks(str(test_file), chunk_size=7, block_bytes=30))
+
+    df = pd.concat(chunks)
+    assert df["unique_id"].tolist() == list(range(1, 21))
+    assert df["message"].tolist()[4] == 'line one\nline two\n"quoted" line three'
+    assert df["data_value"].tolist()[4] == 5.5
+
+
+def test_configure_csv_engine_rejects_unknown_engine():
+    from ingestion.read import configure_csv_engine, get_csv_engine
+
+    with pytest.raises(ValueError):
+        configure_csv_engine("fastest")
+    assert get_csv_engine() == "c"
+
+
+@pytest.fixture
+def schema_mapping():
+    from ingestion.read import configure_schema_mapping
+
+    configure_schema_mapping(
+        {
+            "unique_id": {"target": "unique_id", "dtype": "int64"},
+            "name": {"target": "name", "dtype": "category"},
+            "data_value": {"target": "value", "dtype": "float64"},
+        }
+    )
+    yield
+    configure_schema_mapping(None)
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_schema_mapping_projects_types_and_renames_columns(tmp_path, schema_mapping, engine):
+    """
+    Verify schema_mapping keeps only mapped columns, under their target names and dtypes.
+    """
+    from ingestion.read import configure_csv_engine, iter_csv_chunks, read_csv_frame
+
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    configure_csv_engine(engine)
+
+    test_file = tmp_path / "test_schema.csv"
+    test_file.write_text(
+        "Unique ID,Name,Geo Place Name,Data Value\n"
+        "1,NO2,Bronx,1.5\n"
+        "2,NO2,Queens,abc\n"
+        "3,O3,Bronx,\n",
+        encoding="utf-8",
+    )
+
+    try:
+        frame = read_csv_frame(str(test_file))
+        chunks = list(iter_csv_chunks(str(test_file), chunk_size=2))
+    finally:
+        configure_csv_engine("c")
+
+    for df in [frame, *chunks]:
+        assert list(df.columns) == ["unique_id", "name", "value"]
+        assert isinstance(df["name"].dtype, pd.CategoricalDtype)
+    for df in [frame, pd.concat(chunks)]:
+        assert df["name"].astype(str).tolist() == ["NO2", "NO2", "O3"]
+        # The dirty value is kept for validation to reject
+        assert df["value"].astype(str).tolist()[1] == "abc"
+    assert frame["unique_id"].dtype == "int64"
+
+
+def test_configure_schema_mapping_accepts_plain_targets_and_rejects_unknown_dtypes():
+    from ingestion.read import configure_schema_mapping
+
+    try:
+        assert configure_schema_mapping({"Unique ID": "id"}) == {
+            "unique_id": {"target": "id", "dtype": None}
+        }
+        with pytest.raises(ValueError):
+            configure_schema_mapping({"unique_id": {"dtype": "decimal"}})
+    finally:
+        configure_schema_mapping(None)
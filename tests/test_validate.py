@@ -69,4 +69,79 @@ def test_validate_records_empty_input():
     valid, rejected = validate_records(records)
 
     assert valid == []
-    assert rejected == []
\ No newline at end of file
+    assert rejected == []
+
+def test_validate_dataframe_matches_validate_records():
+    import pandas as pd
+    from ingestion.validate import validate_dataframe
+
+    records = [
+        {"unique_id": "1", "indicator_id": "101", "name": " PM2.5 ", "geo_type_name": "City",
+         "geo_place_name": "New York", "start_date": "2020-01-01", "data_value": "12.5"},
+        {"unique_id": "2", "indicator_id": "101", "name": "  ", "geo_type_name": "City",
+         "geo_place_name": "New York", "start_date": "2020-01-01", "data_value": "1"},
+        {"unique_id": "3.5", "indicator_id": "101", "name": "PM2.5", "geo_type_name": "City",
+         "geo_place_name": "New York", "start_date": "2020-01-01", "data_value": "1"},
+        {"unique_id": "4", "indicator_id": "101", "name": "PM2.5", "geo_type_name": "City",
+         "geo_place_name": "New York", "start_date": "2020-01-01", "data_value": "abc"},
+        {"unique_id": "5", "indicator_id": "101", "name": "PM2.5", "geo_type_name": "City",
+         "geo_place_name": "New York", "start_date": "bad-date", "data_value": "1"},
+        {"unique_id": "6", "indicator_id": "101", "name": "PM2.5", "geo_type_name": "City",
+         "geo_place_name": "New York", "start_date": "03/04/2021", "data_value": None},
+    ]
+
+    valid, rejected = validate_records([dict(r) for r in records])
+    valid_df, rejected_df = validate_dataframe(pd.DataFrame(records))
+
+    assert list(valid_df["unique_id"]) == [r["unique_id"] for r in valid]
+    assert list(rejected_df["error_reason"]) == [r["error_reason"] for r in rejected]
+    assert list(rejected_df["error_reason"]) == [
+        "Missing required field: name",
+        "Invalid integer field",
+        "Invalid numeric value for data_value",
+        "Invalid date format for start_date",
+    ]
+
+
+def test_frame_to_records_converts_types():
+    import datetime
+    import pandas as pd
+    from ingestion.validate import validate_dataframe, frame_to_records
+
+    df = pd.DataFrame(
+        [
+            {"unique_id": 1, "indicator_id": 101, "name": "PM2.5", "geo_type_name": "City",
+             "geo_place_name": "New York", "start_date": "2020-01-01", "data_value": float("nan")},
+        ]
+    )
+
+    valid_df, _ = validate_dataframe(df)
+    records = frame_to_records(valid_df)
+
+    assert records[0]["start_date"] == datetime.date(2020, 1, 1)
+    assert records[0]["data_value"] is None
+    assert records[0]["unique_id"] == 1
+
+
+def test_validate_dataframe_keeps_categorical_text_columns():
+    import pandas as pd
+    from ingestion.validate import validate_dataframe
+
+    df = pd.DataFrame(
+        {
+            "unique_id": [1, 2, 3],
+            "indicator_id": [101, 101, 101],
+            "name": ["PM2.5", "PM2.5", " "],
+            "geo_type_name": ["City", "City", "City"],
+            "geo_place_name": ["New York ", "New York", "Bronx"],
+            "start_date": ["2020-01-01"] * 3,
+            "data_value": [1.0, 2.0, 3.0],
+        }
+    ).astype({"name": "category", "geo_place_name": "category"})
+
+    valid_df, rejected_df = validate_dataframe(df)
+
+    assert isinstance(valid_df["geo_place_name"].dtype, pd.CategoricalDtype)
+    assert valid_df["geo_place_name"].tolist() == ["New York", "New York"]
+    assert sorted(valid_df["geo_place_name"].cat.categories) == ["Bronx", "New York"]
+    assert rejected_df["error_reason"].tolist() == ["Missing required field: name"]
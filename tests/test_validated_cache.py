@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from ingestion import validated_cache
+from ingestion.parallel import iter_validated_chunks
+from tests.test_parallel import VALIDATION, write_csv
+
+
+def make_chunks(tmp_path, ids, chunk_size=4):
+    path = tmp_path / "a.csv"
+    write_csv(path, ids)
+    return str(path), list(iter_validated_chunks(str(path), VALIDATION, chunk_size, force_reject=True))
+
+
+def test_cached_chunks_round_trip_with_dtypes(tmp_path):
+    src, chunks = make_chunks(tmp_path, list(range(1, 11)))
+    # rejected rows mix raw strings and numbers in one column
+    rejected = chunks[0][2]
+    rejected["data_value"] = ["abc"] + rejected["data_value"].tolist()[1:]
+    cache_dir = str(tmp_path / "cache")
+    key = validated_cache.cache_key(src, VALIDATION, chunk_size=4, force_reject=True)
+
+    assert list(validated_cache.write_through(cache_dir, key, chunks)) == chunks
+    assert validated_cache.has_entry(cache_dir, key)
+
+    cached = list(validated_cache.iter_cached_chunks(cache_dir, key))
+    assert len(cached) == len(chunks)
+    for (n, valid, rejected), (cn, cvalid, crejected) in zip(chunks, cached):
+        assert cn == n
+        pd.testing.assert_frame_equal(cvalid, valid)
+        pd.testing.assert_frame_equal(crejected, rejected)
+
+
+def test_cache_key_changes_with_validation_settings(tmp_path):
+    src, _ = make_chunks(tmp_path, [1, 2])
+
+    key = validated_cache.cache_key(src, VALIDATION)
+    stricter = dict(VALIDATION, required_fields=VALIDATION["required_fields"] + ["measure"])
+
+    assert validated_cache.cache_key(src, VALIDATION) == key
+    assert validated_cache.cache_key(src, stricter) != key
+    assert validated_cache.cache_key(src, VALIDATION, engine="c") != validated_cache.cache_key(
+        src, VALIDATION, engine="pyarrow"
+    )
+
+
+def test_consumer_stopping_early_discards_entry_without_reading_on(tmp_path):
+    _, chunks = make_chunks(tmp_path, list(range(1, 11)))
+    cache_dir = str(tmp_path / "cache")
+    produced = []
+
+    def source():
+        for chunk in chunks:
+            produced.append(chunk)
+            yield chunk
+
+    stream = validated_cache.write_through(cache_dir, "k", source())
+    next(stream)
+    stream.close()
+
+    assert len(produced) == 1
+    assert not validated_cache.has_entry(cache_dir, "k")
+    assert os.listdir(cache_dir) == []
+
+
+def test_failed_source_leaves_no_entry(tmp_path):
+    _, chunks = make_chunks(tmp_path, [1, 2])
+    cache_dir = str(tmp_path / "cache")
+
+    def broken():
+        yield chunks[0]
+        raise ValueError("bad chunk")
+
+    with pytest.raises(ValueError):
+        list(validated_cache.write_through(cache_dir, "k", broken()))
+    assert not validated_cache.has_entry(cache_dir, "k")
+    assert os.listdir(cache_dir) == []
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    _, chunks = make_chunks(tmp_path, list(range(1, 11)))
+    cache_dir = str(tmp_path / "cache")
+    for i, key in enumerate(("old", "used", "new")):
+        list(validated_cache.write_through(cache_dir, key, chunks))
+        meta = os.path.join(cache_dir, key, validated_cache.META_FILE)
+        os.utime(meta, (1000 + i, 1000 + i))
+    list(validated_cache.iter_cached_chunks(cache_dir, "used"))  # touch
+
+    entry_mb = validated_cache._dir_size(os.path.join(cache_dir, "old")) / 2**20
+    removed = validated_cache.evict(cache_dir, max_size_mb=entry_mb * 2.5)
+
+    assert removed == ["old"]
+    assert sorted(os.listdir(cache_dir)) == ["new", "used"]